@@ -4,7 +4,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 import crud
 import schemas
+from core.config import settings
 from dependencies.database import get_session
+from dependencies.district import get_hang_jeong_gu
+from helpers.cursor import decode_cursor, encode_cursor, split_page
 from helpers.response import ErrorJSONResponse
 
 router = APIRouter(prefix="/route", tags=["Routes"])
@@ -22,15 +25,23 @@ router = APIRouter(prefix="/route", tags=["Routes"])
 async def get_route_search_api(
     *,
     destination: str = Query(None, alias="dest"),
+    district: tuple[str, str | None] = Depends(get_hang_jeong_gu),
+    limit: int = Query(
+        settings.page_size, ge=1, le=settings.max_page_size, description="페이지 크기"
+    ),
+    cursor: str = Query(None, description="다음 페이지 cursor"),
     session: AsyncSession = Depends(get_session)
 ):
     """
     목적지를 통한 버스 노선을 조회한다
 
-    목적지는 '성동구'에 한정한다.
+    목적지는 시/구(gu)에 한정한다. 시/구를 지정하지 않으면 사용자 위치(lat, lon)의 시/구, 위치도 없으면 '성동구'에서 검색한다
     목적지가 서울에 한정하므로 bus_station이 아니라 bus_route에서 목적지(정류장)를 검색하고, 해당 정류장의 버스 노선 정보를 반환하도록 한다
 
     목적지 검색 시에, 해당 정류장을 지나가는 모든 버스 노선을 조회하므로 반환 값의 양이 엄청 커질 수 있다
+    이를 제한하기 위해 (목적지, 노선명, 노선 순서) 단위로 limit 개씩 keyset pagination 한다
+    - 응답의 next_cursor를 cursor로 전달하면 다음 페이지를 조회한다
+    - 노선의 경로는 페이지 경계에서 나뉠 수 있으므로, 같은 목적지/노선명은 이어서 사용한다
     """
 
     if not destination:
@@ -40,13 +51,31 @@ async def get_route_search_api(
             error_code=status.HTTP_400_BAD_REQUEST,
         )
 
+    try:
+        # (목적지 이름, 목적지 ARS ID, 노선명, 노선 순서, 노선 ID)
+        after = decode_cursor(cursor, size=5) if cursor else None
+    except ValueError:
+        return ErrorJSONResponse(
+            message="올바르지 않은 cursor 입니다",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    hang_jeong_gu, sido = district
     bus_dal = crud.BusDAL(session=session)
 
     try:
-        # '성동구'의 목적지를 지나가는 버스 노선 정보를 조회한다
+        # 시/구의 목적지를 지나가는 버스 노선 정보를 조회한다
         routes = await bus_dal.get_bus_routes_by_destination_filter_hang_jeong_gu(
-            dest=destination, hang_jeong_gu="성동구"
+            dest=destination,
+            hang_jeong_gu=hang_jeong_gu,
+            sido=sido,
+            limit=limit,
+            after=after,
         )
+    except crud.QueryTimeoutError:
+        # app의 exception handler(set_custom_exception)에서 503으로 응답한다
+        raise
     except Exception as e:
         logger.exception(e)
         return ErrorJSONResponse(
@@ -57,6 +86,18 @@ async def get_route_search_api(
     finally:
         await session.close()
 
+    routes, next_after = split_page(
+        routes,
+        limit,
+        lambda x: [
+            x.dest_station_name,
+            x.dest_ars_id,
+            x.route_name,
+            x.route_order,
+            x.route_id,
+        ],
+    )
+
     # 노선 정보를 (목적지, 노선명, 노선 순서)로 다시 정렬한다
     sorted_routes = sorted(
         routes, key=lambda x: (x.dest_station_name, x.route_name, x.route_order)
@@ -89,5 +130,9 @@ async def get_route_search_api(
             )
         )
 
-    response = schemas.BusRoutesSearchResponse(message="ok", data=result)
+    response = schemas.BusRoutesSearchResponse(
+        message="ok",
+        data=result,
+        next_cursor=encode_cursor(next_after) if next_after else None,
+    )
     return response
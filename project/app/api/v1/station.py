@@ -4,11 +4,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 import crud
 import schemas
+from core.config import settings
 from dependencies.database import get_session
+from helpers.cursor import check_keyset, decode_cursor, encode_cursor, split_page
 from helpers.response import ErrorJSONResponse
 
 router = APIRouter(prefix="/station", tags=["Station"])
 
+# 정류장 검색 cursor의 검색별 정렬 key 개수
+# station: (정류장 이름, ID), route_station: (정류장 이름, ARS ID), route: (노선명, 노선 순서, ID)
+SEARCH_KEYSETS = {"station": 2, "route_station": 2, "route": 3}
+
 
 @router.get(
     "/location",
@@ -26,7 +32,7 @@ async def get_station_location_api(
         ..., ge=-180, le=180, alias="lon", description="사용자 위치(경도)"
     ),
     extend: bool = Query(False, alias="extend", description="확장 검색 여부"),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
 ):
     """
     사용자 위치 반경 150M 이내에 존재하는 정류장을 검색한다
@@ -57,6 +63,9 @@ async def get_station_location_api(
             extend_result = await bus_dal.get_bus_routes_by_location(
                 latitude=latitude, longitude=longitude
             )
+    except crud.QueryTimeoutError:
+        # app의 exception handler(set_custom_exception)에서 503으로 응답한다
+        raise
     except Exception as e:
         logger.exception(e)
         return ErrorJSONResponse(
@@ -106,10 +115,21 @@ async def get_station_location_api(
     },
 )
 async def get_station_search_api(
-    *, query: str = Query(None), session: AsyncSession = Depends(get_session)
+    *,
+    query: str = Query(None),
+    limit: int = Query(
+        settings.page_size, ge=1, le=settings.max_page_size, description="페이지 크기"
+    ),
+    cursor: str = Query(None, description="다음 페이지 cursor"),
+    session: AsyncSession = Depends(get_session),
 ):
     """
     버스 정류장 이름 및 버스 노선 정보로 버스 정류장을 검색한다
+
+    버스 정류장, 버스 노선의 정류장, 버스 노선 검색 결과를 각각 limit 개씩 keyset pagination 한다
+    - 응답의 next_cursor를 cursor로 전달하면 다음 페이지를 조회한다
+    - 이미 모든 결과를 조회한 검색은 다음 페이지에서 다시 조회하지 않는다
+    - 버스 노선의 정류장 목록은 페이지 경계에서 나뉠 수 있으므로, 같은 노선명은 이어서 사용한다
     """
 
     if not query:
@@ -119,26 +139,53 @@ async def get_station_search_api(
             error_code=status.HTTP_400_BAD_REQUEST,
         )
 
+    # 검색별 조회 위치. [] 이면 처음부터 조회하고, None 이면 모두 조회한 검색이다
+    try:
+        position = decode_cursor(cursor) if cursor else {}
+        if not isinstance(position, dict):
+            raise ValueError(f"invalid cursor: {cursor}")
+        for name, size in SEARCH_KEYSETS.items():
+            if position.get(name) is not None:
+                check_keyset(position[name], size)
+    except ValueError:
+        return ErrorJSONResponse(
+            message="올바르지 않은 cursor 입니다",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=status.HTTP_400_BAD_REQUEST,
+        )
+    station_after = position.get("station", [])
+    route_station_after = position.get("route_station", [])
+    route_after = position.get("route", [])
+
     bus_dal = crud.BusDAL(session=session)
 
+    bus_station_result, route_station_result, route_result = [], [], []
     try:
         #################
         # 버스정류장 조회   #
         #################
         # 버스 정류장에서 정류장 이름으로 검색한다
-        bus_station_result = await bus_dal.get_bus_stations_by_node_name(
-            node_name=query
-        )
+        if station_after is not None:
+            bus_station_result = await bus_dal.get_bus_stations_by_node_name(
+                node_name=query, limit=limit, after=station_after
+            )
         # 버스 노선에서 정류장 이름으로 검색한다
-        route_station_result = await bus_dal.get_bus_routes_by_station_name(
-            station_name=query
-        )
+        if route_station_after is not None:
+            route_station_result = await bus_dal.get_bus_routes_by_station_name(
+                station_name=query, limit=limit, after=route_station_after
+            )
 
         #################
         # 버스 노선 조회   #
         #################
         # 버스 노선 정보에서 노선명으로 검색한다
-        route_result = await bus_dal.get_bus_routes_by_route_name(route_name=query)
+        if route_after is not None:
+            route_result = await bus_dal.get_bus_routes_by_route_name(
+                route_name=query, limit=limit, after=route_after
+            )
+    except crud.QueryTimeoutError:
+        # app의 exception handler(set_custom_exception)에서 503으로 응답한다
+        raise
     except Exception as e:
         logger.exception(e)
         return ErrorJSONResponse(
@@ -148,6 +195,27 @@ async def get_station_search_api(
     finally:
         await session.close()
 
+    # 다음 페이지의 조회 위치를 계산한다
+    bus_station_result, station_after = split_page(
+        bus_station_result, limit, lambda x: [x.node_name, x.id]
+    )
+    route_station_result, route_station_after = split_page(
+        route_station_result, limit, lambda x: [x.station_name, x.ars_id]
+    )
+    route_result, route_after = split_page(
+        route_result, limit, lambda x: [x.route_name, x.route_order, x.id]
+    )
+    next_position = {
+        "station": station_after,
+        "route_station": route_station_after,
+        "route": route_after,
+    }
+    next_cursor = (
+        encode_cursor(next_position)
+        if any(i is not None for i in next_position.values())
+        else None
+    )
+
     # 버스 정류장 정보를 합친다
     bus_station = [
         schemas.BusStationLocation(
@@ -192,6 +260,7 @@ async def get_station_search_api(
     response = schemas.BusSearchResponse(
         message="ok",
         data=schemas.BusSearch(bus_station=bus_station, bus_route=bus_routes),
+        next_cursor=next_cursor,
     )
 
     return response
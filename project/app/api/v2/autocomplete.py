@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Query, status
+
+import schemas
+import store
+from helpers.response import ErrorJSONResponse
+
+router = APIRouter(prefix="/autocomplete", tags=["Autocomplete"])
+
+
+@router.get(
+    "",
+    response_model=schemas.AutocompleteResponse,
+    responses={
+        422: {"model": schemas.ErrorValidationResponse},
+        503: {"model": schemas.ErrorResponse},
+    },
+    description="검색어로 시작하는 정류장명, 노선명을 조회한다(검색창 자동완성)",
+)
+async def get_autocomplete_api(
+    *,
+    query: str = Query(..., min_length=1, max_length=50, alias="q"),
+    limit: int = Query(10, ge=1, le=50, description="종류별 최대 개수"),
+):
+    """
+    검색어로 시작하는 정류장명, 노선명을 조회한다(검색창 자동완성)
+
+    snapshot으로 만든 in-memory index에서 조회하므로 Database를 조회하지 않는다
+    - 공백과 대소문자는 구분하지 않는다
+    - 정류장명은 지나가는 노선 수, 노선명은 정류장 수가 많은 순서로 반환한다
+    """
+
+    if not store.autocomplete.ready:
+        return ErrorJSONResponse(
+            message="자동완성 데이터를 준비하고 있습니다",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    station_names, route_names = store.autocomplete.search(query, limit)
+
+    response = schemas.AutocompleteResponse(
+        message="ok",
+        data=schemas.Autocomplete(station_names=station_names, route_names=route_names),
+    )
+    return response
@@ -0,0 +1,93 @@
+import numpy as np
+from fastapi import APIRouter, Query, status
+
+import schemas
+import store
+from helpers.response import ErrorJSONResponse
+from store.district import District
+
+router = APIRouter(prefix="/geo", tags=["Geo"])
+
+
+def to_schema(district: District | None) -> schemas.District | None:
+    if district is None:
+        return None
+
+    return schemas.District(
+        sig_code=district.sig_code,
+        sido=district.sido,
+        sig_kor_name=district.sig_kor_name,
+        sig_eng_name=district.sig_eng_name,
+    )
+
+
+def not_ready_response() -> ErrorJSONResponse:
+    return ErrorJSONResponse(
+        message="시/구 데이터를 준비하고 있습니다",
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+@router.get(
+    "/district",
+    response_model=schemas.DistrictResponse,
+    responses={
+        422: {"model": schemas.ErrorValidationResponse},
+        503: {"model": schemas.ErrorResponse},
+    },
+    description="위치가 포함되는 시/구를 조회한다",
+)
+async def get_district_api(
+    *,
+    latitude: float = Query(..., ge=-90, le=90, alias="lat", description="위도"),
+    longitude: float = Query(..., ge=-180, le=180, alias="lon", description="경도"),
+):
+    """
+    위치가 포함되는 시/구를 조회한다
+
+    시/구 polygon의 in-memory STR-tree에서 조회하므로 Database를 조회하지 않는다
+    위치가 load 된 시/구에 포함되지 않으면 data는 null 이다
+    """
+
+    if not store.district.ready:
+        return not_ready_response()
+
+    district = store.district.district_of(latitude, longitude)
+
+    response = schemas.DistrictResponse(message="ok", data=to_schema(district))
+    return response
+
+
+@router.post(
+    "/district",
+    response_model=schemas.DistrictBatchResponse,
+    responses={
+        422: {"model": schemas.ErrorValidationResponse},
+        503: {"model": schemas.ErrorResponse},
+    },
+    description="여러 위치가 포함되는 시/구를 한 번에 조회한다",
+)
+async def get_district_batch_api(*, body: schemas.DistrictBatchRequest):
+    """
+    여러 위치가 포함되는 시/구를 한 번에 조회한다
+
+    모든 위치를 한 번의 STR-tree bulk query로 처리하며, 요청한 위치 순서대로 시/구를 반환한다
+    """
+
+    if not store.district.ready:
+        return not_ready_response()
+
+    indexes = store.district.locate(
+        np.array([i.latitude for i in body.locations]),
+        np.array([i.longitude for i in body.locations]),
+    )
+
+    response = schemas.DistrictBatchResponse(
+        message="ok",
+        data=[
+            to_schema(store.district.districts[i]) if i >= 0 else None
+            for i in indexes.tolist()
+        ],
+    )
+    return response
@@ -1,15 +1,43 @@
 from fastapi import APIRouter, Query, Depends, status
+from fastapi.responses import Response
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import crud
 import schemas
+import store
+from core.config import settings
 from dependencies.database import get_session
+from dependencies.district import get_hang_jeong_gu
+from helpers.cursor import decode_cursor, encode_cursor, split_page
 from helpers.response import ErrorJSONResponse
 
 router = APIRouter(prefix="/route", tags=["Routes"])
 
 
+def _summary(row) -> schemas.RouteSummary | None:
+    # 요약 정보가 아직 계산되지 않은 노선(bus_route_summary에 없는 노선)은 summary가 없다
+    if row.stop_count is None:
+        return None
+
+    return schemas.RouteSummary(
+        stop_count=row.stop_count,
+        first_station=schemas.RouteStation(
+            ars_id=row.first_ars_id, station_name=row.first_station_name
+        ),
+        last_station=schemas.RouteStation(
+            ars_id=row.last_ars_id, station_name=row.last_station_name
+        ),
+        length=row.length,
+        bounds=schemas.RouteBounds(
+            min_latitude=row.min_latitude,
+            min_longitude=row.min_longitude,
+            max_latitude=row.max_latitude,
+            max_longitude=row.max_longitude,
+        ),
+    )
+
+
 @router.get(
     "/search",
     response_model=schemas.BusRouteNameResponse,
@@ -22,13 +50,21 @@ router = APIRouter(prefix="/route", tags=["Routes"])
 async def get_route_name_search_api(
     *,
     destination: str = Query(None, alias="dest"),
+    district: tuple[str, str | None] = Depends(get_hang_jeong_gu),
+    limit: int = Query(
+        settings.page_size, ge=1, le=settings.max_page_size, description="페이지 크기"
+    ),
+    cursor: str = Query(None, description="다음 페이지 cursor"),
     session: AsyncSession = Depends(get_session)
 ):
     """
     목적지를 통한 버스 노선명을 조회한다
 
-    목적지는 '성동구'에 한정한다.
+    목적지는 시/구(gu)에 한정한다. 시/구를 지정하지 않으면 사용자 위치(lat, lon)의 시/구, 위치도 없으면 '성동구'에서 검색한다
     목적지가 서울에 한정하므로 bus_station이 아니라 bus_route에서 목적지(정류장)를 검색하고, 해당 정류장의 버스 노선명을 반환하도록 한다
+
+    (노선명, 노선 ID) 순서로 limit 개씩 keyset pagination 하며, 응답의 next_cursor를 cursor로 전달하면 다음 페이지를 조회한다
+    노선마다 정류장 수, 기점/종점, 노선 길이, 영역(summary)을 함께 반환하므로 노선 정보를 다시 조회하지 않아도 된다
     """
 
     if not destination:
@@ -38,12 +74,30 @@ async def get_route_name_search_api(
             error_code=status.HTTP_400_BAD_REQUEST,
         )
 
+    try:
+        # (노선명, 노선 ID)
+        after = decode_cursor(cursor, size=2) if cursor else None
+    except ValueError:
+        return ErrorJSONResponse(
+            message="올바르지 않은 cursor 입니다",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    hang_jeong_gu, sido = district
     bus_dal = crud.BusDAL(session=session)
 
     try:
         routes = await bus_dal.get_bus_route_name_by_destination_filter_hang_jeong_gu(
-            dest=destination, hang_jeong_gu="성동구"
+            dest=destination,
+            hang_jeong_gu=hang_jeong_gu,
+            sido=sido,
+            limit=limit,
+            after=after,
         )
+    except crud.QueryTimeoutError:
+        # app의 exception handler(set_custom_exception)에서 503으로 응답한다
+        raise
     except Exception as e:
         logger.exception(e)
         return ErrorJSONResponse(
@@ -54,12 +108,17 @@ async def get_route_name_search_api(
     finally:
         await session.close()
 
+    routes, next_after = split_page(routes, limit, lambda x: [x.route_name, x.route_id])
+
     response = schemas.BusRouteNameResponse(
         message="ok",
         data=[
-            schemas.BusRouteName(route_id=i.route_id, route_name=i.route_name)
+            schemas.BusRouteName(
+                route_id=i.route_id, route_name=i.route_name, summary=_summary(i)
+            )
             for i in routes
         ],
+        next_cursor=encode_cursor(next_after) if next_after else None,
     )
     return response
 
@@ -73,12 +132,18 @@ async def get_route_name_search_api(
     },
 )
 async def get_route_node_search_api(
-    *, node: str = Query(None), session: AsyncSession = Depends(get_session)
+    *,
+    node: str = Query(None),
+    district: tuple[str, str | None] = Depends(get_hang_jeong_gu),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     버스 노선명의 노선 정보를 조회한다
 
-    '성동구'에 한정하여 조회하므로 버스 노선 중에 정류장이 '성동구'가 포함되어 있어야 한다
+    시/구(gu, sido)에 한정하여 조회하므로 버스 노선 중에 정류장이 시/구에 포함되어 있어야 한다
+    시/구를 지정하지 않으면 사용자 위치(lat, lon)의 시/구, 위치도 없으면 '성동구'에서 검색한다
+
+    snapshot으로 만든 in-memory 노선 index(store.route)가 준비되어 있으면 Database를 조회하지 않고 미리 encode 한 응답을 반환한다
     """
 
     if not node:
@@ -88,12 +153,25 @@ async def get_route_node_search_api(
             error_code=status.HTTP_400_BAD_REQUEST,
         )
 
+    hang_jeong_gu, sido = district
+
+    index = store.route.index
+    if index is not None:
+        await session.close()
+        records = index.find(node, hang_jeong_gu, sido)
+        return Response(
+            content=index.render(node, records), media_type="application/json"
+        )
+
     bus_dal = crud.BusDAL(session=session)
 
     try:
         routes = await bus_dal.get_bus_route_by_route_name_filter_hang_jeong_gu(
-            route_name=node, hang_jeong_gu="성동구"
+            route_name=node, hang_jeong_gu=hang_jeong_gu, sido=sido
         )
+    except crud.QueryTimeoutError:
+        # app의 exception handler(set_custom_exception)에서 503으로 응답한다
+        raise
     except Exception as e:
         logger.exception(e)
         return ErrorJSONResponse(
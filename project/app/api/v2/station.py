@@ -0,0 +1,329 @@
+from fastapi import (
+    APIRouter,
+    Depends,
+    Path,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+import schemas
+import store
+from core.config import settings
+from dependencies.database import get_session
+from helpers import tile
+from helpers.response import ErrorJSONResponse
+from store.fuzzy import MAX_EDIT_DISTANCE
+from store.nearby import NearbySubscription
+
+router = APIRouter(prefix="/station", tags=["Station"])
+
+
+@router.get(
+    "/bbox",
+    response_model=schemas.BusStationClusterResponse,
+    responses={
+        400: {"model": schemas.ErrorResponse},
+        422: {"model": schemas.ErrorValidationResponse},
+        500: {"model": schemas.ErrorResponse},
+    },
+    description="지도 영역(bounding box)에 포함되는 정류장을 zoom level별 cluster로 조회한다",
+)
+async def get_station_bbox_api(
+    *,
+    min_latitude: float = Query(..., ge=-90, le=90, alias="min_lat"),
+    min_longitude: float = Query(..., ge=-180, le=180, alias="min_lon"),
+    max_latitude: float = Query(..., ge=-90, le=90, alias="max_lat"),
+    max_longitude: float = Query(..., ge=-180, le=180, alias="max_lon"),
+    zoom: int = Query(..., ge=0, le=22, description="지도 zoom level"),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    지도 영역(bounding box)에 포함되는 정류장을 zoom level별 cluster로 조회한다
+
+    loader가 zoom level별로 미리 계산한 cluster(bus_station_cluster)를 반환한다
+    - 화면의 일정 크기(cell) 안에 있는 정류장은 하나의 cluster로 묶어 정류장 수와 평균 위치만 반환한다
+    - 정류장이 하나뿐인 cluster는 정류장 정보(ars_id, station_name)를 함께 반환한다
+    - 지도 영역의 cell 개수가 너무 많으면 더 낮은 zoom level의 cluster를 반환하므로, 반환 값의 크기는 zoom level과 관계없이 일정하다
+    """
+
+    if min_latitude > max_latitude or min_longitude > max_longitude:
+        return ErrorJSONResponse(
+            message="지도 영역이 올바르지 않습니다",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    zoom = tile.cluster_zoom(
+        min_latitude, min_longitude, max_latitude, max_longitude, zoom
+    )
+    min_x, max_x, min_y, max_y = tile.cell_range(
+        min_latitude, min_longitude, max_latitude, max_longitude, zoom
+    )
+
+    bus_dal = crud.BusDAL(session=session)
+
+    try:
+        clusters = await bus_dal.get_bus_station_clusters(
+            zoom=zoom, min_x=min_x, max_x=max_x, min_y=min_y, max_y=max_y
+        )
+    except crud.QueryTimeoutError:
+        # app의 exception handler(set_custom_exception)에서 503으로 응답한다
+        raise
+    except Exception as e:
+        logger.exception(e)
+        return ErrorJSONResponse(
+            message="정류장을 조회하는 도중에 문제가 발생하였습니다",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    finally:
+        await session.close()
+
+    response = schemas.BusStationClusterResponse(
+        message="ok",
+        data=schemas.StationClusters(
+            zoom=zoom,
+            clusters=[
+                schemas.StationCluster(
+                    location=schemas.Location(
+                        latitude=i.latitude, longitude=i.longitude
+                    ),
+                    count=i.station_count,
+                    ars_id=i.ars_id,
+                    station_name=i.station_name,
+                )
+                for i in clusters
+            ],
+        ),
+    )
+    return response
+
+
+@router.get(
+    "/search",
+    response_model=schemas.FuzzyStationSearchResponse,
+    responses={
+        422: {"model": schemas.ErrorValidationResponse},
+        503: {"model": schemas.ErrorResponse},
+    },
+    description="오타를 허용하여 정류장명을 검색한다",
+)
+async def get_station_fuzzy_search_api(
+    *,
+    query: str = Query(..., min_length=1, max_length=50, alias="q"),
+    distance: int = Query(
+        MAX_EDIT_DISTANCE,
+        ge=0,
+        le=MAX_EDIT_DISTANCE,
+        description="허용하는 최대 편집 거리(자모 단위)",
+    ),
+    limit: int = Query(10, ge=1, le=50, description="최대 정류장명 개수"),
+):
+    """
+    오타를 허용하여 정류장명을 검색한다
+
+    정류장명을 자모 단위로 분해한 삭제 변형(SymSpell) index에서 편집 거리가 distance 이하인 정류장명을 찾는다
+    - 공백과 대소문자는 구분하지 않는다. 받침 하나, 모음 하나가 틀리면 편집 거리는 1이다
+    - 편집 거리가 가까운 순서, 지나가는 노선 수가 많은 순서로 정렬하여 정류장명별 정류장 목록과 함께 반환한다
+    - snapshot으로 만든 in-memory index에서 조회하므로 Database를 조회하지 않는다
+    """
+
+    index = store.fuzzy_station.index
+    if index is None:
+        return ErrorJSONResponse(
+            message="정류장 검색 데이터를 준비하고 있습니다",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    matches = index.search(query, max_distance=distance, limit=limit)
+
+    result = []
+    for i, match_distance in matches:
+        name = index.names[i]
+        stations = index.stations(i)
+        result.append(
+            schemas.FuzzyStation(
+                station_name=name,
+                distance=match_distance,
+                stations=[
+                    schemas.BusStationLocation(
+                        location=schemas.Location(latitude=lat, longitude=lon),
+                        station_name=name,
+                        ars_id=ars_id,
+                    )
+                    for ars_id, lat, lon in zip(
+                        index.ars_id[stations].tolist(),
+                        index.latitude[stations].tolist(),
+                        index.longitude[stations].tolist(),
+                    )
+                ],
+            )
+        )
+
+    response = schemas.FuzzyStationSearchResponse(message="ok", data=result)
+    return response
+
+
+def _remaining(seconds: int | None, elapsed: float) -> int | None:
+    # upstream에서 조회한 뒤 지난 시간만큼 도착 예정 시간을 줄인다
+    if seconds is None:
+        return None
+    return max(0, seconds - int(elapsed))
+
+
+@router.get(
+    "/{ars_id}/arrivals",
+    response_model=schemas.StationArrivalsResponse,
+    responses={
+        404: {"model": schemas.ErrorResponse},
+        422: {"model": schemas.ErrorValidationResponse},
+        503: {"model": schemas.ErrorResponse},
+    },
+    description="정류장의 실시간 버스 도착 정보를 조회한다",
+)
+async def get_station_arrivals_api(
+    *,
+    ars_id: int = Path(..., ge=1, description="정류장 ARS ID"),
+):
+    """
+    정류장의 실시간 버스 도착 정보를 조회한다
+
+    background에서 갱신하여 worker들이 공유하는 도착 정보(store.arrival)만 조회하며, 요청 처리 중에 upstream API를 호출하지 않는다
+    - 처음 요청된 정류장은 다음 갱신 주기부터 도착 정보를 조회하므로, 그 전까지는 data가 null이다
+    - 도착 정보가 ttl보다 오래되었으면(upstream 장애 등) data가 null이다
+    - 도착 예정 시간은 조회 시각 이후 지난 시간을 뺀 값이다
+    - 최근에 요청되지 않은 정류장은 갱신을 멈추므로, 도착 정보가 필요한 동안 주기적으로 요청한다
+    """
+
+    arrival = store.arrival
+    if not arrival.running:
+        return ErrorJSONResponse(
+            message="도착 정보를 제공하지 않습니다",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    if not arrival.is_known(ars_id):
+        return ErrorJSONResponse(
+            message="정류장을 찾을 수 없습니다",
+            status_code=status.HTTP_404_NOT_FOUND,
+            error_code=status.HTTP_404_NOT_FOUND,
+        )
+
+    arrival.touch(ars_id)
+    record = arrival.latest(ars_id)
+    if record is None:
+        return schemas.StationArrivalsResponse(message="ok", data=None)
+
+    elapsed = record.age
+    response = schemas.StationArrivalsResponse(
+        message="ok",
+        data=schemas.StationArrivals(
+            ars_id=ars_id,
+            updated_at=record.updated_at,
+            arrivals=[
+                schemas.BusArrival(
+                    route_id=i.route_id,
+                    route_name=i.route_name,
+                    first_message=i.first_message,
+                    first_seconds=_remaining(i.first_seconds, elapsed),
+                    second_message=i.second_message,
+                    second_seconds=_remaining(i.second_seconds, elapsed),
+                )
+                for i in record.arrivals
+            ],
+        ),
+    )
+    return response
+
+
+@router.websocket("/nearby")
+async def station_nearby_websocket(websocket: WebSocket):
+    """
+    이동하는 client의 위치를 받아 주변 정류장의 변경 사항(delta)을 보낸다
+
+    위치가 바뀔 때마다 위치 검색 API(/v1/station/location)를 다시 호출하는 대신, 하나의 WebSocket 연결로 위치를 보내고
+    반경에 새로 들어온 정류장과 반경을 벗어난 정류장만 받는다
+    - client -> server: {"latitude": 37.5446, "longitude": 127.0559, "radius": 150}. radius는 생략할 수 있다
+    - server -> client: {"type": "delta", "entered": [정류장], "left": [ARS ID]}. 첫 번째 delta는 반경 안의 모든 정류장이다
+      (반경 안에 정류장이 없으면 빈 delta)
+    - 잘못된 위치를 보내면 {"type": "error", "message": ...}를 보내고 연결을 유지한다
+    - 첫 번째 delta 이후에 변경된 정류장이 없거나, 마지막으로 계산한 위치에서 nearby_min_move(M) 미만으로 이동했다면 아무것도 보내지 않는다
+    - 확장 검색(extend)과 같이 bus_station, bus_route의 정류장을 함께 사용하며, snapshot으로 만든 in-memory grid index에서
+      계산하므로 Database를 조회하지 않는다
+    - 정류장 데이터를 준비하고 있거나 구독 수가 nearby_max_subscribers를 넘으면 1013(try again later)으로 연결을 닫는다
+    """
+
+    nearby = store.nearby_station
+
+    await websocket.accept()
+    if not nearby.ready or nearby.subscribers >= settings.nearby_max_subscribers:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    nearby.subscribers += 1
+    subscription = NearbySubscription()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                position = schemas.NearbyPosition.model_validate_json(message)
+            except ValidationError as e:
+                error = schemas.NearbyError(
+                    message=[
+                        {
+                            "field": error["loc"][-1] if error["loc"] else None,
+                            "message": error["msg"],
+                        }
+                        for error in e.errors()
+                    ]
+                )
+                await websocket.send_text(error.model_dump_json())
+                continue
+
+            if not subscription.moved(
+                position.latitude,
+                position.longitude,
+                position.radius,
+                settings.nearby_min_move,
+            ):
+                continue
+
+            # snapshot이 다시 load 되어도 ARS ID로 비교하므로 변경된 정류장만 보낸다
+            index = nearby.index
+            # 첫 번째 delta는 반경 안에 정류장이 없어도 보내서, client가 처리된 것을 알 수 있게 한다
+            first = subscription.latitude is None
+            entered, left = subscription.update(
+                index, position.latitude, position.longitude, position.radius
+            )
+            if not first and not len(entered) and not len(left):
+                continue
+
+            delta = schemas.NearbyDelta(
+                entered=[
+                    schemas.BusStationLocation(
+                        location=schemas.Location(latitude=lat, longitude=lon),
+                        station_name=name,
+                        ars_id=ars_id,
+                    )
+                    for ars_id, name, lat, lon in zip(
+                        index.ars_id[entered].tolist(),
+                        index.station_name[entered].tolist(),
+                        index.latitude[entered].tolist(),
+                        index.longitude[entered].tolist(),
+                    )
+                ],
+                left=left.tolist(),
+            )
+            await websocket.send_text(delta.model_dump_json())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        nearby.subscribers -= 1
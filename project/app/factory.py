@@ -1,13 +1,53 @@
+import asyncio
+
 from fastapi import FastAPI, status, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
+import store
+from middleware import (
+    AdmissionClass,
+    AdmissionControlMiddleware,
+    CancelOnDisconnectMiddleware,
+    CompressionCacheMiddleware,
+    ConditionalGetMiddleware,
+)
 from app.api.v1 import station, route
-from app.api.v2 import route as route_v2
-from connection.database import engine
+from app.warmup import Warmup
+from store.arrival import ArrivalPoller
+from app.api.v2 import (
+    autocomplete as autocomplete_v2,
+    geo as geo_v2,
+    route as route_v2,
+    station as station_v2,
+)
+from connection.bis import create_arrival_client
+from connection.database import engine, pool_status
+from core.config import settings
+from crud import QueryTimeoutError
 from helpers.response import ErrorJSONResponse, DefaultJSONResponse
 
+# 응답을 snapshot으로 만든 in-memory index에서 만드는 API
+# snapshot은 Database load가 끝난 뒤에 생성되고 worker마다 따로 다시 load 되므로,
+# Database 데이터 버전만으로는 응답이 같은지 알 수 없다
+SNAPSHOT_PATHS = ("/v2/autocomplete", "/v2/station/search", "/v2/route/node/search")
+
+
+def response_version(path: str) -> str | None:
+    """
+    요청 path의 응답이 의존하는 데이터 버전을 반환한다. ETag와 압축된 응답 cache의 key로 사용한다
+
+    :param path: 요청 path
+    :return: 데이터 버전. 알 수 없으면 None
+    """
+
+    version = store.dataset_version.version
+    if version and path.startswith(SNAPSHOT_PATHS):
+        return f"{version}:{store.snapshot_store.version or ''}"
+
+    return version
+
 
 def create_app() -> FastAPI:
     """Create FastAPI Application"""
@@ -18,6 +58,13 @@ def create_app() -> FastAPI:
         version="0.0.1",
     )
 
+    # worker별 warmup 상태(/ready)
+    app.state.warmup = Warmup()
+
+    # 읽기 전용 데이터를 미리 적재한다
+    # gunicorn preload_app 설정 시에는 master에서 한 번만 적재되어 worker들이 공유한다
+    store.preload()
+
     initial_route(app)
     initial_middleware(app)
     set_custom_exception(app)
@@ -35,8 +82,48 @@ def set_event_handler(app: FastAPI) -> None:
         async with engine.begin():
             pass
 
+        # 데이터 버전을 주기적으로 갱신한다
+        app.state.dataset_version_watcher = asyncio.create_task(
+            store.dataset_version.watch(settings.dataset_version_refresh_interval)
+        )
+
+        # snapshot 버전이 변경되면 다시 load 한다
+        app.state.snapshot_watcher = asyncio.create_task(
+            store.snapshot_store.watch(settings.snapshot_reload_interval)
+        )
+
+        # connection pool, 조회 query를 미리 준비한다. 끝나면 /ready가 성공을 반환한다
+        app.state.warmup_task = asyncio.create_task(app.state.warmup.run(app))
+
+        # 최근에 요청된 정류장의 실시간 도착 정보를 갱신한다. host lock을 얻은 하나의 worker만 조회한다
+        app.state.arrival_poller_task = None
+        if settings.arrival_enabled:
+            app.state.arrival_client = create_arrival_client()
+            poller = ArrivalPoller(
+                store.arrival,
+                app.state.arrival_client,
+                interval=settings.arrival_poll_interval,
+                active_window=settings.arrival_active_window,
+                concurrency=settings.arrival_concurrency,
+                rate=settings.arrival_rate_limit,
+                backoff_base=settings.arrival_backoff_base,
+                backoff_max=settings.arrival_backoff_max,
+            )
+            app.state.arrival_poller_task = asyncio.create_task(poller.run())
+
     @app.on_event("shutdown")
     async def shutdown():
+        app.state.warmup_task.cancel()
+        app.state.warmup.ready = False
+
+        app.state.dataset_version_watcher.cancel()
+        app.state.snapshot_watcher.cancel()
+
+        if app.state.arrival_poller_task:
+            app.state.arrival_poller_task.cancel()
+            await asyncio.wait({app.state.arrival_poller_task})
+            await app.state.arrival_client.close()
+
         # Database
         if engine:
             await engine.dispose()
@@ -51,16 +138,93 @@ def initial_route(app: FastAPI) -> None:
 
     @app.get("/health")
     async def health_check():
+        # liveness: process가 요청을 처리할 수 있는지만 확인한다
         return DefaultJSONResponse(message="ok")
 
+    @app.get("/ready")
+    async def ready_check(request: Request):
+        # readiness: warmup이 끝난 worker만 요청을 받는다
+        if not request.app.state.warmup.ready:
+            return DefaultJSONResponse(
+                message="warming up", status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return DefaultJSONResponse(message="ready")
+
+    @app.get("/health/pool")
+    async def pool_health_check():
+        # 요청을 처리한 worker의 connection pool 사용 현황(부하 테스트에서 pool 포화도 확인에 사용)
+        return DefaultJSONResponse(message=pool_status())
+
     app.include_router(station.router, prefix="/v1")
     app.include_router(route.router, prefix="/v1")
     app.include_router(route_v2.router, prefix="/v2")
+    app.include_router(station_v2.router, prefix="/v2")
+    app.include_router(autocomplete_v2.router, prefix="/v2")
+    app.include_router(geo_v2.router, prefix="/v2")
 
 
 def initial_middleware(app: FastAPI) -> None:
     """Middleware Initializing"""
 
+    # endpoint 그룹별 동시 처리 수 제한(load shedding)
+    # ETag, 압축 응답 cache로 처리되는 요청은 제한하지 않도록 가장 안쪽에 둔다
+    if settings.admission_enabled:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            classes=[
+                AdmissionClass(
+                    name="location",
+                    paths=("/v1/station/location", "/v2/station/bbox"),
+                    limit=settings.admission_location_limit,
+                    queue_size=settings.admission_location_queue,
+                    max_wait=settings.admission_location_wait,
+                ),
+                AdmissionClass(
+                    name="search",
+                    paths=("/v1/station/search",),
+                    limit=settings.admission_search_limit,
+                    queue_size=settings.admission_search_queue,
+                    max_wait=settings.admission_search_wait,
+                ),
+                AdmissionClass(
+                    name="route",
+                    paths=("/v1/route/", "/v2/route/"),
+                    limit=settings.admission_route_limit,
+                    queue_size=settings.admission_route_queue,
+                    max_wait=settings.admission_route_wait,
+                    # 노선 정보 API는 노선 index가 준비되어 있으면 Database를 조회하지 않는다
+                    bypass=lambda path: (
+                        path.startswith("/v2/route/node/search") and store.route.ready
+                    ),
+                ),
+            ],
+            retry_after=settings.admission_retry_after,
+        )
+
+    # client 연결이 끊어지면 처리 중인 요청(대기 중인 요청, 실행 중인 query)을 취소한다
+    app.add_middleware(CancelOnDisconnectMiddleware)
+
+    # 응답 압축(gzip/brotli) 및 압축된 응답 cache
+    # 실시간 도착 정보는 데이터 버전과 관계없이 변경되므로 cache 하지 않는다
+    app.add_middleware(
+        CompressionCacheMiddleware,
+        version_getter=response_version,
+        exclude_suffixes=("/arrivals",),
+        min_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        max_workers=settings.compression_max_workers,
+        cache_max_bytes=settings.compression_cache_max_bytes,
+    )
+
+    # 데이터 버전 기준 ETag / conditional GET
+    app.add_middleware(
+        ConditionalGetMiddleware,
+        version_getter=response_version,
+        exclude_suffixes=("/arrivals",),
+        max_age=settings.cache_max_age,
+    )
+
     origins = ["*"]
 
     app.add_middleware(
@@ -109,3 +273,20 @@ def set_custom_exception(app: FastAPI) -> None:
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             error_code=422,
         )
+
+    @app.exception_handler(QueryTimeoutError)
+    async def query_timeout_exception_handler(request: Request, exc: QueryTimeoutError):
+        """
+        QueryTimeout Handler
+
+        조회 query가 최대 실행 시간 안에 끝나지 않으면 Database가 느리거나 부하가 많은 상태이므로,
+        500이 아니라 503(Retry-After)으로 응답하여 client가 잠시 후에 다시 시도하게 한다
+        """
+
+        logger.warning(f"query timeout: {request.url.path}, {exc}")
+        return ErrorJSONResponse(
+            message="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(settings.query_timeout_retry_after)},
+        )
@@ -0,0 +1,245 @@
+import asyncio
+import collections
+import pathlib
+import re
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from loguru import logger
+
+import crud
+import store
+from connection.database import async_session, engine
+from core.config import settings
+from helpers import tile
+
+# snapshot이 없을 때 사용하는 위치(서울시청)
+DEFAULT_LOCATION = (37.5663, 126.9779)
+# access log에서 요청 path를 찾는다
+ACCESS_LOG_PATTERN = re.compile(r'"GET (/\S+) HTTP/[\d.]+"')
+
+
+async def fill_pool(size: int) -> int:
+    """
+    connection pool에 size 개의 connection을 미리 연결한다
+
+    connection을 동시에 열어야 pool이 서로 다른 connection을 만들고, 닫으면 pool에 반환되어 재사용된다
+
+    :param size: 연결할 connection 수
+    :return: 연결한 connection 수
+    """
+
+    connections = [engine.connect() for _ in range(size)]
+    results = await asyncio.gather(
+        *(connection.start() for connection in connections), return_exceptions=True
+    )
+
+    opened = 0
+    for connection, result in zip(connections, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"warmup connection failed: {result}")
+            continue
+        opened += 1
+        await connection.close()
+
+    return opened
+
+
+def sample_parameters() -> dict:
+    """
+    조회 query를 실행할 parameter를 snapshot에서 고른다
+
+    정류장이 가장 많은 노선의 첫 번째 정류장을 사용한다. snapshot이 없으면 기본 위치와 시/구를 사용한다
+
+    :return:
+    """
+
+    latitude, longitude = DEFAULT_LOCATION
+    station_name, route_name = "역", "1"
+
+    snapshot = store.snapshot_store.snapshot
+    if snapshot is not None and snapshot.route_count:
+        i = int(np.argmax(np.diff(snapshot.route_offsets)))
+        stop = snapshot.route_stops(i).start
+        route_name = snapshot.route_name[i]
+        station_name = snapshot.stop_station_name[stop]
+        latitude = float(snapshot.stop_latitude[stop])
+        longitude = float(snapshot.stop_longitude[stop])
+
+    hang_jeong_gu, sido = settings.default_hang_jeong_gu, None
+    if store.district.ready:
+        district = store.district.district_of(latitude, longitude)
+        if district:
+            hang_jeong_gu, sido = district.sig_kor_name, district.sido
+
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "station_name": station_name,
+        "route_name": route_name,
+        "hang_jeong_gu": hang_jeong_gu,
+        "sido": sido,
+    }
+
+
+def query_shapes(p: dict) -> dict[str, tuple[tuple, dict]]:
+    """
+    API에서 사용하는 BusDAL 조회 query와 parameter를 반환한다
+
+    :param p: sample_parameters()
+    :return: {BusDAL method 이름: (args, kwargs)}
+    """
+
+    limit = settings.page_size + 1
+    location = (p["latitude"], p["longitude"])
+    district = (p["hang_jeong_gu"], p["sido"])
+    zoom = tile.CLUSTER_MAX_ZOOM
+    # 위치 주변 약 1km 영역의 cluster
+    min_x, max_x, min_y, max_y = tile.cell_range(
+        location[0] - 0.005,
+        location[1] - 0.005,
+        location[0] + 0.005,
+        location[1] + 0.005,
+        zoom,
+    )
+
+    return {
+        "get_bus_stations_by_location": (location, {}),
+        "get_bus_routes_by_location": (location, {}),
+        "get_bus_stations_by_node_name": ((p["station_name"],), {"limit": limit}),
+        "get_bus_routes_by_station_name": ((p["station_name"],), {"limit": limit}),
+        "get_bus_routes_by_route_name": ((p["route_name"],), {"limit": limit}),
+        "get_bus_routes_by_destination_filter_hang_jeong_gu": (
+            (p["station_name"], *district),
+            {"limit": limit},
+        ),
+        "get_bus_route_name_by_destination_filter_hang_jeong_gu": (
+            (p["station_name"], *district),
+            {"limit": limit},
+        ),
+        "get_bus_route_by_route_name_filter_hang_jeong_gu": (
+            (p["route_name"], *district),
+            {},
+        ),
+        "get_bus_station_clusters": ((zoom, min_x, max_x, min_y, max_y), {}),
+    }
+
+
+async def warm_queries() -> int:
+    """
+    BusDAL의 조회 query를 한 번씩 실행한다
+
+    statement를 compile 하고, Database의 buffer pool에 index page(공간 index 포함)를 적재한다
+
+    :return: 성공한 query 수
+    """
+
+    succeeded = 0
+    for name, (args, kwargs) in query_shapes(sample_parameters()).items():
+        async with async_session() as session:
+            try:
+                await getattr(crud.BusDAL(session=session), name)(*args, **kwargs)
+                succeeded += 1
+            except Exception as e:
+                logger.warning(f"warmup query failed. query: {name}, error: {e}")
+
+    return succeeded
+
+
+def load_replay_paths(path: pathlib.Path, top: int) -> list[str]:
+    """
+    요청 기록 파일에서 자주 요청된 순서로 상위 top 개의 path를 반환한다
+
+    파일은 access log이거나, 한 줄에 하나의 path(?query)가 있는 목록이다
+
+    :param path: 요청 기록 파일 경로
+    :param top: 반환할 path 수
+    :return:
+    """
+
+    counts = collections.Counter()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = ACCESS_LOG_PATTERN.search(line)
+            if match:
+                counts[match.group(1)] += 1
+            elif line.startswith("/"):
+                counts[line.split()[0]] += 1
+
+    return [path for path, _ in counts.most_common(top)]
+
+
+async def replay(app: FastAPI, paths: list[str]) -> int:
+    """
+    기록된 요청을 application에 직접(ASGI) 보낸다
+
+    middleware를 거치므로 Database와 함께 압축 응답 cache도 채워진다
+
+    :param app: FastAPI application
+    :param paths: 요청 path 목록
+    :return: 성공(2xx)한 요청 수
+    """
+
+    succeeded = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://warmup"
+    ) as client:
+        for path in paths:
+            try:
+                response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+                succeeded += response.is_success
+            except Exception as e:
+                logger.warning(f"warmup replay failed. path: {path}, error: {e}")
+
+    return succeeded
+
+
+class Warmup:
+    """
+    worker 시작 시의 warmup 상태
+
+    warmup이 끝나기 전에는 /ready가 503을 반환하므로, load balancer는 warmup이 끝난 worker에만 요청을 보낸다
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+
+    async def _run(self, app: FastAPI) -> None:
+        size = min(settings.warmup_pool_size, settings.db_pool_size)
+        opened = await fill_pool(size)
+        logger.info(f"warmup pool filled. connections: {opened}/{size}")
+
+        succeeded = await warm_queries()
+        logger.info(f"warmup queries executed. succeeded: {succeeded}")
+
+        if settings.warmup_replay_path:
+            paths = load_replay_paths(
+                pathlib.Path(settings.warmup_replay_path), settings.warmup_replay_top
+            )
+            succeeded = await replay(app, paths)
+            logger.info(f"warmup replayed. succeeded: {succeeded}/{len(paths)}")
+
+    async def run(self, app: FastAPI) -> None:
+        """
+        warmup을 실행하고 ready로 전환한다
+
+        warmup이 실패하거나 warmup_timeout을 넘어도 요청은 처리할 수 있으므로 ready로 전환한다
+
+        :param app: FastAPI application
+        :return:
+        """
+
+        try:
+            if settings.warmup_enabled:
+                await asyncio.wait_for(self._run(app), settings.warmup_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"warmup timed out after {settings.warmup_timeout} seconds")
+        except Exception as e:
+            logger.exception(e)
+            logger.warning("warmup failed")
+
+        # 종료 중에 취소(CancelledError)되면 ready로 전환하지 않는다
+        self.ready = True
+        logger.info("worker is ready")
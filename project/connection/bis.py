@@ -0,0 +1,162 @@
+import dataclasses
+import datetime
+import email.utils
+from abc import ABCMeta, abstractmethod
+
+import httpx
+
+from core.config import settings
+
+
+@dataclasses.dataclass(frozen=True)
+class Arrival:
+    """
+    정류장에 도착 예정인 노선 하나의 도착 정보
+    """
+
+    route_id: str
+    route_name: str
+    # 첫 번째, 두 번째 도착 예정 버스의 도착 안내 문구와 도착 예정 시간(초)
+    first_message: str
+    first_seconds: int | None
+    second_message: str
+    second_seconds: int | None
+
+
+class UpstreamError(Exception):
+    """
+    도착 정보 API 호출 실패
+
+    :param retry_after: upstream이 요청한 재시도 대기 시간(초). 요청 제한(429) 응답 등
+    """
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ArrivalClientABC(metaclass=ABCMeta):
+    """
+    정류장 도착 정보를 조회하는 upstream(BIS API) client
+    """
+
+    @abstractmethod
+    async def fetch(self, ars_id: int) -> list[Arrival]:
+        """
+        정류장의 도착 정보를 조회한다
+
+        :param ars_id: 정류장 ARS ID
+        :return:
+        :raise UpstreamError: 조회에 실패한 경우
+        """
+
+    async def close(self) -> None:
+        pass
+
+
+def _seconds(value) -> int | None:
+    try:
+        seconds = int(value)
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds >= 0 else None
+
+
+def _retry_after(value: str | None) -> float | None:
+    """
+    Retry-After header의 재시도 대기 시간(초)
+
+    delay-seconds와 HTTP-date 형식을 모두 허용하며, 형식이 잘못되었으면 None을 반환한다
+
+    :param value: Retry-After header 값
+    :return:
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class SeoulBisClient(ArrivalClientABC):
+    """
+    서울시 버스 도착 정보 API(stationinfo/getStationByUid) client
+
+    local 환경에서는 script/mock_bis.py로 같은 형식의 응답을 반환하는 mock server를 실행하여 사용한다
+    """
+
+    def __init__(self, url: str, service_key: str | None, timeout: float) -> None:
+        self.url = url
+        self.service_key = service_key
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def fetch(self, ars_id: int) -> list[Arrival]:
+        params = {"arsId": f"{ars_id:05d}", "resultType": "json"}
+        if self.service_key:
+            params["serviceKey"] = self.service_key
+
+        try:
+            response = await self.client.get(self.url, params=params)
+        except httpx.HTTPError as e:
+            raise UpstreamError(f"request failed: {e!r}")
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise UpstreamError(
+                f"status: {response.status_code}",
+                retry_after=_retry_after(response.headers.get("retry-after")),
+            )
+        if response.status_code != 200:
+            raise UpstreamError(f"status: {response.status_code}")
+
+        try:
+            body = response.json()
+            header = body["msgHeader"]
+            items = (body.get("msgBody") or {}).get("itemList") or []
+        except (ValueError, KeyError, AttributeError) as e:
+            raise UpstreamError(f"invalid response: {e!r}")
+
+        # headerCd 0: 정상, 4: 결과 없음
+        if str(header.get("headerCd")) not in ("0", "4"):
+            raise UpstreamError(f"error response: {header.get('headerMsg')}")
+
+        return [
+            Arrival(
+                route_id=str(item.get("busRouteId", "")),
+                route_name=str(item.get("rtNm", "")),
+                first_message=str(item.get("arrmsg1", "")),
+                first_seconds=_seconds(item.get("traTime1")),
+                second_message=str(item.get("arrmsg2", "")),
+                second_seconds=_seconds(item.get("traTime2")),
+            )
+            for item in items
+        ]
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_arrival_client() -> ArrivalClientABC:
+    """
+    설정(settings.arrival_*)으로 도착 정보 API client를 생성한다
+
+    :return:
+    """
+
+    return SeoulBisClient(
+        settings.arrival_api_url,
+        settings.arrival_service_key,
+        settings.arrival_request_timeout,
+    )
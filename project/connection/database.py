@@ -1,3 +1,6 @@
+import os
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
@@ -12,7 +15,12 @@ SQLALCHEMY_DATABASE_URL = (
 )
 
 engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL, pool_recycle=300, pool_size=40, pool_pre_ping=True
+    SQLALCHEMY_DATABASE_URL,
+    pool_recycle=300,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
 )
 async_session = sessionmaker(
     bind=engine,
@@ -24,6 +32,60 @@ async_session = sessionmaker(
 
 Base = declarative_base()
 
+# 실행 중인 query를 중단(KILL QUERY)하기 위한 engine
+# API 서버의 connection pool이 모두 사용 중이어도 중단할 수 있도록 별도의 pool을 사용한다
+kill_engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL, pool_recycle=300, pool_size=1, max_overflow=2
+)
+
+
+async def kill_query(thread_id: int) -> None:
+    """
+    connection(thread_id)에서 실행 중인 query를 중단한다. connection은 유지되어 pool에서 다시 사용한다
+
+    :param thread_id: 중단할 connection의 thread id(CONNECTION_ID())
+    :return:
+    """
+
+    async with kill_engine.connect() as connection:
+        await connection.execute(text(f"KILL QUERY {int(thread_id)}"))
+
+
+def create_load_data_engine():
+    """
+    LOAD DATA LOCAL INFILE을 사용할 수 있는 engine을 생성한다
+
+    API 서버의 engine에서는 local_infile을 허용하지 않고, loader에서만 사용한다
+    Database 서버에서도 local_infile 설정이 켜져 있어야 한다
+
+    :return:
+    """
+
+    return create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=1,
+        pool_pre_ping=True,
+        connect_args={"local_infile": True},
+    )
+
+
+def pool_status() -> dict:
+    """
+    현재 worker의 connection pool 사용 현황을 반환한다
+
+    :return:
+    """
+
+    pool = engine.pool
+    return {
+        "pid": os.getpid(),
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.db_max_overflow,
+    }
+
 
 def show_raw_query(query):
     print(query.compile(engine, compile_kwargs={"literal_binds": True}))
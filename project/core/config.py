@@ -3,6 +3,7 @@ import os
 import pathlib
 from functools import lru_cache
 
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 log = logging.getLogger("uvicorn")
@@ -12,6 +13,15 @@ BASE_DIR = pathlib.Path(__file__).parent.parent
 class Settings(BaseSettings):
     env: str = os.environ.get("ENV", "production")
     log_level: str = os.environ.get("LOG_LEVEL", "INFO")
+    # log를 queue에 쌓고 background thread에서 모아서 기록한다
+    log_async: bool = False
+    # log를 한 줄의 JSON 형식으로 기록한다
+    log_json: bool = False
+    # access log를 기록할 비율(0.0 ~ 1.0)
+    log_access_sample_rate: float = 1.0
+    log_batch_size: int = 512
+    log_flush_interval: float = 0.5
+    log_queue_size: int = 100_000
 
     ####################
     # Database info
@@ -21,6 +31,156 @@ class Settings(BaseSettings):
     db_name: str
     db_user: str
     db_password: str
+    # worker별 connection pool 크기. script/loadtest.py로 pool 포화도를 확인하여 조정한다
+    db_pool_size: int = 40
+    db_max_overflow: int = 10
+    # connection pool에서 connection을 기다리는 최대 시간(초)
+    db_pool_timeout: float = 5
+
+    ####################
+    # Server(gunicorn)
+    ####################
+    server_bind: str = "0.0.0.0:8000"
+    # uvicorn worker 수. 비동기 worker이므로 CPU core 수 만큼만 띄운다
+    server_workers: int = os.cpu_count() or 1
+    # 요청 수가 max_requests(+jitter)에 도달한 worker는 재시작하여 메모리 누수를 방지한다
+    server_max_requests: int = 10000
+    server_max_requests_jitter: int = 1000
+    server_timeout: int = 30
+    server_graceful_timeout: int = 30
+    server_keepalive: int = 5
+
+    ####################
+    # Query timeout
+    ####################
+    # BusDAL 조회 query의 최대 실행 시간(초). method 이름별로 query_timeouts에서 다르게 설정할 수 있다
+    query_timeout: float = 2.0
+    query_timeouts: dict[str, float] = {
+        "get_bus_stations_by_location": 1.0,
+        "get_bus_routes_by_location": 1.0,
+        "get_bus_station_clusters": 1.0,
+        "get_bus_routes_by_destination_filter_hang_jeong_gu": 3.0,
+        "get_bus_route_name_by_destination_filter_hang_jeong_gu": 3.0,
+        "get_bus_route_by_route_name_filter_hang_jeong_gu": 3.0,
+    }
+    # Database(MAX_EXECUTION_TIME)에서 중단되지 않은 query를 client에서 중단하기까지 추가로 기다리는 시간(초)
+    query_timeout_grace: float = 0.5
+    # query가 timeout으로 중단되어 503을 반환할 때 Retry-After 값(초)
+    query_timeout_retry_after: int = 1
+
+    ####################
+    # Admission control
+    ####################
+    # endpoint 그룹별 동시 처리 수(limit), 대기열 크기(queue), 최대 대기 시간(wait, 초)
+    # limit 합계를 db_pool_size 이하로 두어 위치 검색이 노선 검색의 connection 대기 뒤에 밀리지 않도록 한다
+    admission_enabled: bool = True
+    admission_retry_after: int = 1
+    # 위치 검색, 지도 영역 조회(우선 처리)
+    admission_location_limit: int = 24
+    admission_location_queue: int = 256
+    admission_location_wait: float = 2.0
+    # 정류장 이름 검색
+    admission_search_limit: int = 8
+    admission_search_queue: int = 64
+    admission_search_wait: float = 1.0
+    # 노선 검색(self join 하는 무거운 query)
+    admission_route_limit: int = 8
+    admission_route_queue: int = 32
+    admission_route_wait: float = 0.5
+
+    ####################
+    # Warmup
+    ####################
+    # worker 시작 시에 connection pool을 채우고 조회 query를 미리 실행한 뒤 /ready가 성공을 반환한다
+    warmup_enabled: bool = True
+    # 시작 시에 미리 연결할 connection 수(db_pool_size 이하)
+    warmup_pool_size: int = 10
+    # warmup이 끝나지 않아도 이 시간(초)이 지나면 ready로 전환한다
+    warmup_timeout: float = 60
+    # 다시 실행할 요청 기록 파일(access log 또는 한 줄에 하나의 path?query). 자주 요청된 순서로 상위 N개를 실행한다
+    warmup_replay_path: str | None = None
+    warmup_replay_top: int = 100
+
+    ####################
+    # Arrival
+    ####################
+    # 정류장 실시간 도착 정보를 background에서 upstream(BIS API)으로 갱신한다. 꺼져 있으면 도착 정보 API는 503을 반환한다
+    arrival_enabled: bool = False
+    # 서울시 버스 도착 정보 API(stationinfo/getStationByUid). local 환경에서는 script/mock_bis.py의 주소를 사용한다
+    arrival_api_url: str = "http://ws.bus.go.kr/api/rest/stationinfo/getStationByUid"
+    arrival_service_key: str | None = None
+    # 정류장별 갱신 주기(초)와 조회 결과의 유효 시간(초)
+    arrival_poll_interval: float = 15
+    arrival_ttl: float = 60
+    # 정류장별로 보관하는 최근 조회 결과 수
+    arrival_history_size: int = Field(4, ge=1)
+    # 최근 이 시간(초) 안에 요청된 정류장만 갱신한다
+    arrival_active_window: float = 300
+    # 갱신하는 최대 정류장 수
+    arrival_max_stations: int = 2000
+    # upstream 동시 요청 수와 초당 요청 수. host에서 하나의 worker만 조회하므로 host별 한도이다
+    arrival_concurrency: int = 8
+    arrival_rate_limit: float = 20
+    arrival_request_timeout: float = 3
+    # 조회에 실패한 정류장을 다시 조회하기까지 기다리는 시간(초). 실패할 때마다 두 배로 늘어난다
+    arrival_backoff_base: float = 1
+    arrival_backoff_max: float = 60
+    # worker들이 도착 정보와 정류장 요청 기록을 공유하는 디렉터리. 요청마다 파일을 읽고 쓰므로 tmpfs를 사용한다
+    arrival_shared_dir: str = "/dev/shm/cn-bis-arrival"
+
+    ####################
+    # Nearby
+    ####################
+    # 주변 정류장 구독(WebSocket)의 기본 반경과 최대 반경(M)
+    nearby_default_radius: int = 150
+    nearby_max_radius: int = 1000
+    # 마지막으로 계산한 위치에서 이 거리(M) 이상 이동해야 주변 정류장을 다시 계산한다
+    nearby_min_move: float = 10
+    # worker별 최대 구독 수
+    nearby_max_subscribers: int = 10000
+
+    ####################
+    # District
+    ####################
+    # 노선 검색 API에서 시/구를 지정하지 않았을 때 사용하는 시/구
+    default_hang_jeong_gu: str = "성동구"
+    # 위치로 시/구를 찾을 때 사용하는 시/구 polygon 파일
+    district_geojson_path: str = f"{BASE_DIR}/data/geo/hang_jeong_gu.geojson"
+
+    ####################
+    # Pagination
+    ####################
+    # 검색 API의 기본 페이지 크기와 최대 페이지 크기
+    page_size: int = 50
+    max_page_size: int = 200
+
+    ####################
+    # Cache
+    ####################
+    # 데이터 버전(dataset_version)을 갱신하는 주기(초)
+    dataset_version_refresh_interval: float = 10
+    # 조회 API 응답의 Cache-Control max-age(초)
+    cache_max_age: int = 60
+
+    ####################
+    # Compression
+    ####################
+    # 압축할 최소 응답 크기(byte)
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    # 동시에 압축을 처리하는 thread 수
+    compression_max_workers: int = 2
+    # worker별 압축된 응답 cache의 최대 크기(byte)
+    compression_cache_max_bytes: int = 64 * 1024 * 1024
+
+    ####################
+    # Snapshot
+    ####################
+    # loader가 생성하는 정류장/노선 snapshot 저장 디렉터리
+    snapshot_dir: str = f"{BASE_DIR}/data/snapshot"
+    # snapshot 버전 변경을 확인하는 주기(초)
+    snapshot_reload_interval: float = 10
 
 
 class LocalSettings(Settings):
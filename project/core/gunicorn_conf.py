@@ -0,0 +1,51 @@
+"""
+운영 환경에서 사용하는 gunicorn 설정
+
+$ gunicorn -c python:core.gunicorn_conf app.main:app
+
+- uvicorn worker(uvloop, httptools)를 사용한다
+- preload_app으로 master에서 application을 한 번만 load 하고, worker를 fork 한다
+  master에서 적재한 읽기 전용 데이터(store)는 worker들이 copy-on-write로 공유한다
+- worker 수, 재시작 주기 등은 Settings에서 설정한다
+"""
+import gc
+
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+from core.config import settings
+
+
+class UvicornWorker(BaseUvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "proxy_headers": True,
+        "forwarded_allow_ips": "*",
+    }
+
+
+bind = settings.server_bind
+workers = settings.server_workers
+worker_class = "core.gunicorn_conf.UvicornWorker"
+preload_app = True
+
+max_requests = settings.server_max_requests
+max_requests_jitter = settings.server_max_requests_jitter
+timeout = settings.server_timeout
+graceful_timeout = settings.server_graceful_timeout
+keepalive = settings.server_keepalive
+
+logger_class = "core.logging.GunicornLogger"
+accesslog = "-"
+loglevel = settings.log_level.lower()
+
+
+def when_ready(server):
+    """
+    worker를 fork 하기 직전에 master가 가진 객체들을 GC 추적 대상에서 제외한다
+
+    GC가 객체의 header를 수정하면서 공유 중인 메모리 페이지가 worker마다 복사되는 것을 막는다
+    """
+
+    gc.freeze()
+    server.log.info(f"preloaded objects frozen: {gc.get_freeze_count()}")
@@ -1,5 +1,15 @@
-import sys
+import atexit
+import datetime
+import functools
+import json
 import logging
+import os
+import pathlib
+import queue
+import random
+import sys
+import threading
+import traceback
 
 from loguru import logger
 from gunicorn.glogging import Logger
@@ -8,10 +18,34 @@ from core.config import settings
 
 LOG_LEVEL = logging.getLevelName(settings.log_level)
 LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} {level} {name}:{function}:{line} {message}"
+LOG_FILE = "logs/apps_{time:YYYY-MM-DD}.log"
+
+# 요청마다 기록되는 access log의 logger 이름
+ACCESS_LOGGERS = frozenset({"uvicorn.access", "gunicorn.access"})
+
+# 현재 사용 중인 BatchingSink
+_batching_sink = None
+
+
+def _patch_origin(log_record: logging.LogRecord, record: dict) -> None:
+    record.update(
+        name=log_record.name, function=log_record.funcName, line=log_record.lineno
+    )
 
 
 class InterceptHandler(logging.Handler):
     def emit(self, record):
+        # access log는 설정된 비율만큼만 기록한다
+        if record.name in ACCESS_LOGGERS:
+            if random.random() >= settings.log_access_sample_rate:
+                return
+
+            # access log는 호출 위치를 LogRecord에서 가져오고, frame을 탐색하지 않는다
+            logger.patch(functools.partial(_patch_origin, record)).log(
+                record.levelname, record.getMessage()
+            )
+            return
+
         # Get corresponding Loguru level if it exists
         try:
             level = logger.level(record.levelname).name
@@ -19,8 +53,8 @@ class InterceptHandler(logging.Handler):
             level = record.levelno
 
         # Find caller from where originated the logged message
-        frame, depth = logging.currentframe(), 2
-        while frame.f_code.co_filename == logging.__file__:
+        frame, depth = logging.currentframe(), 0
+        while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
             frame = frame.f_back
             depth += 1
 
@@ -29,29 +63,252 @@ class InterceptHandler(logging.Handler):
         )
 
 
-class GunicornLogger(Logger):
-    def setup(self, cfg) -> None:
-        handler = InterceptHandler()
+def format_text(record: dict) -> str:
+    """
+    LOG_FORMAT과 같은 형식으로 log record를 변환한다
 
-        # Add log handler to logger and set log level
-        self.error_log.addHandler(handler)
-        self.error_log.setLevel(LOG_LEVEL)
-        self.access_log.addHandler(handler)
-        self.access_log.setLevel(LOG_LEVEL)
+    :param record: loguru log record
+    :return:
+    """
 
-        # Configure logger before gunicorn starts logging
+    text = (
+        f"{record['time']:%Y-%m-%d %H:%M:%S}.{record['time'].microsecond // 1000:03d} "
+        f"{record['level'].name} {record['name']}:{record['function']}:{record['line']} "
+        f"{record['message']}\n"
+    )
+    if record["exception"]:
+        text += "".join(traceback.format_exception(*record["exception"]))
+
+    return text
+
+
+def format_json(record: dict) -> str:
+    """
+    log record를 한 줄의 JSON으로 변환한다
+
+    :param record: loguru log record
+    :return:
+    """
+
+    data = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    if record["extra"]:
+        data["extra"] = record["extra"]
+    if record["exception"]:
+        data["exception"] = "".join(traceback.format_exception(*record["exception"]))
+
+    return json.dumps(data, ensure_ascii=False, default=str) + "\n"
+
+
+class DailyFileWriter:
+    """
+    날짜별로 log 파일을 나누어 기록한다
+
+    LOG_FILE과 같은 이름(logs/apps_YYYY-MM-DD.log)을 사용하며, 날짜가 바뀌면 새로운 파일을 연다
+    """
+
+    def __init__(self, directory: str = "logs", prefix: str = "apps_") -> None:
+        self.directory = pathlib.Path(directory)
+        self.prefix = prefix
+        self._date = None
+        self._file = None
+
+    def write(self, text: str) -> None:
+        today = datetime.date.today()
+        if today != self._date:
+            self.close()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{self.prefix}{today:%Y-%m-%d}.log"
+            self._file = open(path, "a", encoding="utf-8")
+            self._date = today
+
+        self._file.write(text)
+
+    def flush(self) -> None:
+        if self._file:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class BatchingSink:
+    """
+    log를 queue에 쌓고, background thread에서 모아서(batch) 기록하는 loguru sink
+
+    - log를 남기는 thread(event loop)는 queue에 record를 넣기만 하므로 disk I/O에 막히지 않는다
+    - 문자열 변환(format)과 파일 쓰기, flush는 모두 background thread에서 처리한다
+    - queue가 가득 차면 log를 버리고(drop) 개수만 기록한다. 요청 처리가 log 때문에 지연되지 않도록 한다
+    """
+
+    def __init__(
+        self,
+        writers: list,
+        formatter=format_text,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+        max_queue_size: int = 100_000,
+    ) -> None:
+        self.writers = writers
+        self.formatter = formatter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.dropped = 0
+        self.stopped = False
+        self._stop = object()
+
+        self._start()
+        # fork 된 process(gunicorn worker)에는 thread가 복제되지 않으므로 다시 시작한다
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self) -> None:
+        if self.stopped:
+            return
+
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, message) -> None:
+        try:
+            self._queue.put_nowait(message.record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            try:
+                records = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            # queue에 쌓여있는 log를 batch_size 만큼 한번에 가져온다
+            while len(records) < self.batch_size and records[-1] is not self._stop:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if records[-1] is self._stop:
+                records.pop()
+                stop = True
+
+            if records:
+                self._write(records)
+
+    def _write(self, records: list) -> None:
+        text = "".join(self.formatter(r) for r in records)
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            text += f"{dropped} log records dropped\n"
+
+        for writer in self.writers:
+            try:
+                writer.write(text)
+                writer.flush()
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+
+    def stop(self) -> None:
+        """
+        queue에 남아있는 log를 모두 기록하고 background thread를 종료한다
+
+        :return:
+        """
+
+        if self.stopped:
+            return
+
+        self.stopped = True
+        self._queue.put(self._stop)
+        self._thread.join()
+
+        for writer in self.writers:
+            if isinstance(writer, DailyFileWriter):
+                writer.close()
+
+
+def configure_sinks() -> None:
+    """
+    loguru sink를 설정한다
+
+    - LOG_ASYNC: stdout, 파일 sink를 BatchingSink로 대체하여 background thread에서 기록한다
+    - LOG_JSON: 한 줄의 JSON 형식으로 기록한다
+    """
+
+    global _batching_sink
+
+    previous_sink, _batching_sink = _batching_sink, None
+
+    if settings.log_async:
+        _batching_sink = BatchingSink(
+            writers=[sys.stdout, DailyFileWriter()],
+            formatter=format_json if settings.log_json else format_text,
+            batch_size=settings.log_batch_size,
+            flush_interval=settings.log_flush_interval,
+            max_queue_size=settings.log_queue_size,
+        )
+        atexit.register(_batching_sink.stop)
+
+        # 문자열 변환은 background thread에서 처리하므로 format은 사용하지 않는다
         logger.configure(
             handlers=[
-                {"sink": sys.stdout, "level": settings.log_level, "format": LOG_FORMAT}
+                {
+                    "sink": _batching_sink,
+                    "level": settings.log_level,
+                    "format": "{message}",
+                }
+            ]
+        )
+    else:
+        logger.configure(
+            handlers=[
+                {
+                    "sink": sys.stdout,
+                    "level": settings.log_level,
+                    "format": LOG_FORMAT,
+                    "serialize": settings.log_json,
+                }
             ]
         )
         logger.add(
-            "logs/apps_{time:YYYY-MM-DD}.log",
+            LOG_FILE,
             rotation="00:00",
             format=LOG_FORMAT,
             level=settings.log_level,
+            serialize=settings.log_json,
         )
 
+    # 이전에 설정된 BatchingSink는 남은 log를 기록하고 종료한다
+    if previous_sink:
+        previous_sink.stop()
+
+
+class GunicornLogger(Logger):
+    def setup(self, cfg) -> None:
+        handler = InterceptHandler()
+
+        # Add log handler to logger and set log level
+        self.error_log.addHandler(handler)
+        self.error_log.setLevel(LOG_LEVEL)
+        self.access_log.addHandler(handler)
+        self.access_log.setLevel(LOG_LEVEL)
+
+        # Configure logger before gunicorn starts logging
+        configure_sinks()
+
 
 def configure_logger() -> None:
     # intercept everything at the root logger
@@ -65,14 +322,4 @@ def configure_logger() -> None:
         logging.getLogger(name).propagate = True
 
     # Configure logger (again) if gunicorn is not used
-    logger.configure(
-        handlers=[
-            {"sink": sys.stdout, "level": settings.log_level, "format": LOG_FORMAT}
-        ]
-    )
-    logger.add(
-        "logs/apps_{time:YYYY-MM-DD}.log",
-        rotation="00:00",
-        format=LOG_FORMAT,
-        level=settings.log_level,
-    )
+    configure_sinks()
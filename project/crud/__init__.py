@@ -1,2 +1,5 @@
+from .abstract import QueryTimeoutError
 from .crud_bus import LoaderDAL, BusDAL
 from .crud_address import AddressDAL
+from .crud_dataset import DatasetDAL
+from .crud_load_data import LoadDataDAL
@@ -1,7 +1,76 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 from abc import ABCMeta
 
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from connection.database import kill_query
+
+# MySQL error: Query execution was interrupted, maximum statement execution time exceeded
+ER_QUERY_TIMEOUT = 3024
+
+
+class QueryTimeoutError(TimeoutError):
+    """
+    조회 query가 최대 실행 시간 안에 끝나지 않아 중단되었다
+
+    Database가 느리거나 부하가 많은 상태이므로, API는 500이 아니라 503(Retry-After)으로 응답한다
+    """
+
 
 class DalABC(metaclass=ABCMeta):
     def __init__(self, session: AsyncSession):
         self.session = session
+
+    async def _execute(self, q, timeout: float, grace: float = 0.5):
+        """
+        실행 시간을 제한하여 조회 query를 실행한다
+
+        - MAX_EXECUTION_TIME optimizer hint로 Database에서 timeout 이후에 query를 중단한다
+        - hint로 중단되지 않거나(lock 대기 등) 요청이 취소되면(client 연결 종료) KILL QUERY로 query를 중단하고,
+          query가 끝날 때까지 기다린 뒤 connection을 pool에 반환한다
+
+        :param q: 조회 query(select)
+        :param timeout: 최대 실행 시간(초)
+        :param grace: hint로 중단되지 않은 query를 client에서 중단하기까지 추가로 기다리는 시간(초)
+        :return:
+        :raises QueryTimeoutError: query가 timeout 안에 끝나지 않은 경우
+        """
+
+        q = q.prefix_with(
+            f"/*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */", dialect="mysql"
+        )
+
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        thread_id = raw_connection.driver_connection.thread_id()
+
+        task = asyncio.ensure_future(self.session.execute(q))
+        try:
+            # 요청이 취소되어도 query를 중단할 때까지 실행 중인 task는 취소하지 않는다
+            return await asyncio.wait_for(asyncio.shield(task), timeout + grace)
+        except DBAPIError as e:
+            # MAX_EXECUTION_TIME hint로 Database에서 중단되었다
+            if e.orig is not None and e.orig.args[:1] == (ER_QUERY_TIMEOUT,):
+                raise QueryTimeoutError(
+                    f"query timed out after {timeout} seconds"
+                ) from e
+            raise
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            logger.warning(f"kill query. thread_id: {thread_id}")
+            try:
+                await kill_query(thread_id)
+            except Exception as e:
+                logger.warning(f"failed to kill query. thread_id: {thread_id}, {e}")
+            # 중단된 query의 결과(error)를 받아 connection을 다시 사용할 수 있는 상태로 만든다
+            done, _ = await asyncio.wait({task}, timeout=grace)
+            if not done:
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
+            if isinstance(e, asyncio.TimeoutError):
+                raise QueryTimeoutError(
+                    f"query timed out after {timeout + grace} seconds"
+                ) from e
+            raise
@@ -1,10 +1,30 @@
 import pandas as pd
-from sqlalchemy import select, delete, insert, func, case, distinct, and_
+from sqlalchemy import (
+    select,
+    delete,
+    insert,
+    func,
+    case,
+    distinct,
+    and_,
+    or_,
+    tuple_,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
+from core.config import settings
 from crud.abstract import DalABC
-from models import BusRoute, BusStation, HangJeongGu
+from helpers import geohash
+from helpers.singleflight import singleflight
+from models import (
+    BusRoute,
+    BusRouteDistrict,
+    BusRouteSummary,
+    BusStation,
+    BusStationCluster,
+    HangJeongGu,
+)
 
 
 class LoaderDAL(DalABC):
@@ -28,7 +48,63 @@ class LoaderDAL(DalABC):
                     "node_id": row["node_id"],
                     "ars_id": row["ars_id"],
                     "station_name": row["station_name"],
-                    "location": f"POINT({row['latitude']} {row['longitude']})",
+                    "location": row["location"],
+                    "geohash": row["geohash"],
+                    "sig_code": None if pd.isna(row["sig_code"]) else row["sig_code"],
+                }
+                for row in df.to_dict(orient="records")
+            ],
+        )
+
+    async def bulk_insert_route_district(self, df: pd.DataFrame) -> None:
+        """
+        bus_route_district 데이터를 bulk insert 한다
+
+        :param df: 시/구별 버스 노선 정보를 가지고 있는 DataFrame
+        :return:
+        """
+
+        q = insert(BusRouteDistrict)
+
+        await self.session.execute(
+            q,
+            [
+                {
+                    "sig_code": row["sig_code"],
+                    "route_id": row["route_id"],
+                    "route_name": row["route_name"],
+                    "stop_count": row["stop_count"],
+                }
+                for row in df.to_dict(orient="records")
+            ],
+        )
+
+    async def bulk_insert_route_summary(self, df: pd.DataFrame) -> None:
+        """
+        bus_route_summary 데이터를 bulk insert 한다
+
+        :param df: 노선별 요약 정보를 가지고 있는 DataFrame
+        :return:
+        """
+
+        q = insert(BusRouteSummary)
+
+        await self.session.execute(
+            q,
+            [
+                {
+                    "route_id": row["route_id"],
+                    "route_name": row["route_name"],
+                    "stop_count": row["stop_count"],
+                    "first_ars_id": row["first_ars_id"],
+                    "first_station_name": row["first_station_name"],
+                    "last_ars_id": row["last_ars_id"],
+                    "last_station_name": row["last_station_name"],
+                    "length": row["length"],
+                    "min_latitude": row["min_latitude"],
+                    "min_longitude": row["min_longitude"],
+                    "max_latitude": row["max_latitude"],
+                    "max_longitude": row["max_longitude"],
                 }
                 for row in df.to_dict(orient="records")
             ],
@@ -50,7 +126,8 @@ class LoaderDAL(DalABC):
                 {
                     "node_id": row["node_id"],
                     "node_name": row["node_name"],
-                    "location": f"POINT({row['latitude']} {row['longitude']})",
+                    "location": row["location"],
+                    "geohash": row["geohash"],
                     "collectd_time": row["collectd_time"],
                     "mobile_id": row["mobile_id"],
                     "city_code": row["city_code"],
@@ -61,6 +138,35 @@ class LoaderDAL(DalABC):
             ],
         )
 
+    async def bulk_insert_station_cluster(self, df: pd.DataFrame) -> None:
+        """
+        bus_station_cluster 데이터를 bulk insert 한다
+
+        :param df: zoom level별 정류장 cluster 정보를 가지고 있는 DataFrame
+        :return:
+        """
+
+        q = insert(BusStationCluster)
+
+        await self.session.execute(
+            q,
+            [
+                {
+                    "zoom": row["zoom"],
+                    "cell_x": row["cell_x"],
+                    "cell_y": row["cell_y"],
+                    "count": row["count"],
+                    "latitude": row["latitude"],
+                    "longitude": row["longitude"],
+                    "ars_id": None if pd.isna(row["ars_id"]) else row["ars_id"],
+                    "station_name": None
+                    if pd.isna(row["station_name"])
+                    else row["station_name"],
+                }
+                for row in df.to_dict(orient="records")
+            ],
+        )
+
     async def delete_route(self) -> None:
         """
         bus_route table 데이터를 삭제한다
@@ -72,6 +178,28 @@ class LoaderDAL(DalABC):
 
         await self.session.execute(q)
 
+    async def delete_route_district(self) -> None:
+        """
+        bus_route_district table 데이터를 삭제한다
+
+        :return:
+        """
+
+        q = delete(BusRouteDistrict).execution_options(synchronize_session="fetch")
+
+        await self.session.execute(q)
+
+    async def delete_route_summary(self) -> None:
+        """
+        bus_route_summary table 데이터를 삭제한다
+
+        :return:
+        """
+
+        q = delete(BusRouteSummary).execution_options(synchronize_session="fetch")
+
+        await self.session.execute(q)
+
     async def delete_station(self) -> None:
         """
         bus_station table 데이터를 삭제한다
@@ -83,12 +211,115 @@ class LoaderDAL(DalABC):
 
         await self.session.execute(q)
 
+    async def delete_station_cluster(self) -> None:
+        """
+        bus_station_cluster table 데이터를 삭제한다
+
+        :return:
+        """
+
+        q = delete(BusStationCluster).execution_options(synchronize_session="fetch")
+
+        await self.session.execute(q)
+
 
 class BusDAL(DalABC):
+    """
+    버스 정류장/노선 조회 DAL
+
+    조회 method는 @singleflight로 같은 인자의 동시 호출을 하나의 query로 합친다
+    """
+
     def __init__(self, session: AsyncSession) -> None:
         self.SRID = 4326
         super().__init__(session=session)
 
+    @staticmethod
+    def _timeout(name: str) -> tuple[float, float]:
+        """
+        조회 method의 (최대 실행 시간, 추가 대기 시간)을 반환한다
+
+        :param name: method 이름
+        :return:
+        """
+
+        return (
+            settings.query_timeouts.get(name, settings.query_timeout),
+            settings.query_timeout_grace,
+        )
+
+    @staticmethod
+    def _paginate(q, keys: list, limit: int | None, after: list | None):
+        """
+        keyset pagination을 적용한다
+
+        - keys 순서로 정렬하고, 이전 페이지의 마지막 key(after) 다음부터 조회한다
+        - 다음 페이지가 있는지 확인할 수 있도록 limit 보다 하나 더 조회한다
+
+        :param q: 조회 query
+        :param keys: 정렬 key column 목록(index 순서와 같아야 한다)
+        :param limit: 페이지 크기. 없으면 모두 조회한다
+        :param after: 이전 페이지의 마지막 key 값
+        :return:
+        """
+
+        q = q.order_by(*keys)
+        if after:
+            q = q.where(tuple_(*keys) > tuple_(*after))
+        if limit:
+            q = q.limit(limit + 1)
+
+        return q
+
+    @staticmethod
+    def _filter_by_hang_jeong_gu(hjg, hang_jeong_gu: str, sido: str | None) -> list:
+        """
+        시/구 이름(과 시/도)으로 hang_jeong_gu를 조회하는 조건을 반환한다
+
+        다른 시/도에 같은 이름의 '구'가 있을 수 있으므로(예: 중구) sido를 함께 지정할 수 있다
+
+        :param hjg: hang_jeong_gu table
+        :param hang_jeong_gu: 지역 '구'의 이름
+        :param sido: 시/도 이름
+        :return:
+        """
+
+        conditions = [hjg.sig_kor_name == hang_jeong_gu]
+        if sido:
+            conditions.append(hjg.sido == sido)
+
+        return conditions
+
+    def _filter_by_distance(
+        self, column, geohash_column, latitude: float, longitude: float, distance: int
+    ):
+        """
+        사용자 위치 기준으로 반경 거리 안에 있는 위치를 찾는 조건을 반환한다
+
+        - 반경 거리를 포함하는 geohash cell을 구하여 geohash index로 후보를 먼저 찾는다
+        - 후보 중에서 실제 거리가 반경 거리 이내인 위치만 남긴다
+
+        :param column: 위치(POINT) column
+        :param geohash_column: 위치의 geohash column
+        :param latitude: 사용자 위치(위도)
+        :param longitude: 사용자 위치(경도)
+        :param distance: 사용자 기준 반경 거리(단위 M)
+        :return:
+        """
+
+        cells, precision = geohash.covering_cells(latitude, longitude, distance)
+
+        # 저장된 geohash보다 큰 cell은 prefix로 검색한다
+        if precision == geohash.GEOHASH_PRECISION:
+            cell_filter = geohash_column.in_(cells)
+        else:
+            cell_filter = or_(*[geohash_column.like(f"{cell}%") for cell in cells])
+
+        point = func.ST_PointFromText(f"POINT({latitude} {longitude})", self.SRID)
+
+        return and_(cell_filter, func.ST_Distance(column, point) <= distance)
+
+    @singleflight
     async def get_bus_stations_by_location(
         self, latitude: float, longitude: float, distance: int = 150
     ):
@@ -101,21 +332,21 @@ class BusDAL(DalABC):
         :return:
         """
 
-        # 사용자 위치 기준으로 반경 거리만큼 원을 그린다
-        buffer_circle = func.ST_Buffer(
-            func.ST_PointFromText(f"POINT({latitude} {longitude})", self.SRID), distance
-        )
-
         q = select(
             BusStation.node_name,
             func.ST_X(BusStation.location).label("latitude"),
             func.ST_Y(BusStation.location).label("longitude"),
             BusStation.mobile_id,
-        ).where(func.ST_Contains(buffer_circle, BusStation.location))
+        ).where(
+            self._filter_by_distance(
+                BusStation.location, BusStation.geohash, latitude, longitude, distance
+            )
+        )
 
-        result = await self.session.execute(q)
+        result = await self._execute(q, *self._timeout("get_bus_stations_by_location"))
         return result.all()
 
+    @singleflight
     async def get_bus_routes_by_location(
         self, latitude: float, longitude: float, distance: int = 150
     ):
@@ -128,11 +359,6 @@ class BusDAL(DalABC):
         :return:
         """
 
-        # 사용자 위치 기준으로 반경 거리만큼 원을 그린다
-        buffer_circle = func.ST_Buffer(
-            func.ST_PointFromText(f"POINT({latitude} {longitude})", self.SRID), distance
-        )
-
         q = (
             select(
                 BusRoute.station_name,
@@ -140,39 +366,82 @@ class BusDAL(DalABC):
                 func.ST_Y(BusRoute.location).label("longitude"),
                 BusRoute.ars_id,
             )
-            .where(func.ST_Contains(buffer_circle, BusRoute.location))
+            .where(
+                self._filter_by_distance(
+                    BusRoute.location, BusRoute.geohash, latitude, longitude, distance
+                )
+            )
             .group_by(BusRoute.ars_id, BusRoute.station_name, BusRoute.location)
         )
 
-        result = await self.session.execute(q)
+        result = await self._execute(q, *self._timeout("get_bus_routes_by_location"))
         return result.all()
 
-    async def get_bus_stations_by_node_name(self, node_name: str):
+    @singleflight
+    async def get_bus_stations_by_node_name(
+        self, node_name: str, limit: int | None = None, after: list | None = None
+    ):
         """
         버스 정류장 이름으로 정류장을 조회한다
 
+        (node_name, id) 순서로 정렬하여 keyset pagination 한다
+        정류장명 index(idx_node_name)만 읽어 페이지의 id를 찾은 뒤(covering) 페이지의 행만 table에서 읽는다(deferred join)
+
         :param node_name: 버스 정류장 이름
+        :param limit: 페이지 크기
+        :param after: 이전 페이지의 마지막 (node_name, id)
         :return:
         """
 
-        q = select(
-            BusStation.node_name,
-            func.ST_X(BusStation.location).label("latitude"),
-            func.ST_Y(BusStation.location).label("longitude"),
-            BusStation.mobile_id,
-        ).where(BusStation.node_name.like(f"%{node_name}%"))
+        keys = [BusStation.node_name, BusStation.id]
+        page = self._paginate(
+            select(BusStation.id).where(BusStation.node_name.like(f"%{node_name}%")),
+            keys,
+            limit,
+            after,
+        ).subquery("page")
 
-        result = await self.session.execute(q)
+        q = (
+            select(
+                BusStation.id,
+                BusStation.node_name,
+                func.ST_X(BusStation.location).label("latitude"),
+                func.ST_Y(BusStation.location).label("longitude"),
+                BusStation.mobile_id,
+            )
+            .join(page, BusStation.id == page.c.id)
+            .order_by(*keys)
+        )
+
+        result = await self._execute(q, *self._timeout("get_bus_stations_by_node_name"))
         return result.all()
 
-    async def get_bus_routes_by_station_name(self, station_name: str):
+    @singleflight
+    async def get_bus_routes_by_station_name(
+        self, station_name: str, limit: int | None = None, after: list | None = None
+    ):
         """
         버스 정류장 이름으로 정류장을 조회한다
 
+        (station_name, ars_id) 순서로 정렬하여 keyset pagination 한다
+        정류장명 index(idx_station_name_ars_id)만 읽어 페이지의 정류장을 찾은 뒤(covering) 페이지의 행만 table에서 읽는다(deferred join)
+
         :param station_name: 버스 정류장 이름
+        :param limit: 페이지 크기
+        :param after: 이전 페이지의 마지막 (station_name, ars_id)
         :return:
         """
 
+        keys = [BusRoute.station_name, BusRoute.ars_id]
+        page = self._paginate(
+            select(*keys)
+            .where(BusRoute.station_name.like(f"%{station_name}%"))
+            .group_by(*keys),
+            keys,
+            limit,
+            after,
+        ).subquery("page")
+
         q = (
             select(
                 BusRoute.station_name,
@@ -180,23 +449,49 @@ class BusDAL(DalABC):
                 func.ST_Y(BusRoute.location).label("longitude"),
                 BusRoute.ars_id,
             )
-            .where(BusRoute.station_name.like(f"%{station_name}%"))
+            .join(
+                page,
+                and_(
+                    BusRoute.station_name == page.c.station_name,
+                    BusRoute.ars_id == page.c.ars_id,
+                ),
+            )
             .group_by(BusRoute.ars_id, BusRoute.station_name, BusRoute.location)
+            .order_by(*keys)
         )
 
-        result = await self.session.execute(q)
+        result = await self._execute(
+            q, *self._timeout("get_bus_routes_by_station_name")
+        )
         return result.all()
 
-    async def get_bus_routes_by_route_name(self, route_name: str):
+    @singleflight
+    async def get_bus_routes_by_route_name(
+        self, route_name: str, limit: int | None = None, after: list | None = None
+    ):
         """
         버스 노선명으로 버스 노선 정보를 조회한다
 
+        (route_name, route_order, id) 순서로 정렬하여 keyset pagination 한다
+        노선명 index(idx_route_name_order)만 읽어 페이지의 id를 찾은 뒤(covering) 페이지의 행만 table에서 읽는다(deferred join)
+
         :param route_name: 버스 노선명
+        :param limit: 페이지 크기
+        :param after: 이전 페이지의 마지막 (route_name, route_order, id)
         :return:
         """
 
+        keys = [BusRoute.route_name, BusRoute.route_order, BusRoute.id]
+        page = self._paginate(
+            select(BusRoute.id).where(BusRoute.route_name.like(f"%{route_name}%")),
+            keys,
+            limit,
+            after,
+        ).subquery("page")
+
         q = (
             select(
+                BusRoute.id,
                 BusRoute.route_name,
                 BusRoute.route_order,
                 BusRoute.ars_id,
@@ -204,21 +499,34 @@ class BusDAL(DalABC):
                 func.ST_X(BusRoute.location).label("latitude"),
                 func.ST_Y(BusRoute.location).label("longitude"),
             )
-            .where(BusRoute.route_name.like(f"%{route_name}%"))
-            .order_by(BusRoute.route_name, BusRoute.route_order)
+            .join(page, BusRoute.id == page.c.id)
+            .order_by(*keys)
         )
 
-        result = await self.session.execute(q)
+        result = await self._execute(q, *self._timeout("get_bus_routes_by_route_name"))
         return result.all()
 
+    @singleflight
     async def get_bus_routes_by_destination_filter_hang_jeong_gu(
-        self, dest: str, hang_jeong_gu: str
+        self,
+        dest: str,
+        hang_jeong_gu: str,
+        sido: str | None = None,
+        limit: int | None = None,
+        after: list | None = None,
     ):
         """
         특정 시/구의 목적지(정류장)를 지나가는 버스 노선을 조회한다
 
+        정류장이 포함되는 시/구(sig_code)는 loader에서 미리 계산하므로 공간 연산(ST_Within) 없이 조회한다
+        (목적지 이름, 목적지 ARS ID, 노선명, 노선 순번, 노선 ID) 순서로 정렬하여 keyset pagination 한다
+        노선명이 같은 노선이 여러 개 있을 수 있으므로 노선 ID까지 포함해야 정렬 key가 유일하다
+
         :param dest: 목적지(정류장) 이름
         :param hang_jeong_gu: 목적지가 포함되는 지역 '구'의 이름
+        :param sido: 목적지가 포함되는 시/도 이름
+        :param limit: 페이지 크기
+        :param after: 이전 페이지의 마지막 (목적지 이름, 목적지 ARS ID, 노선명, 노선 순번, 노선 ID)
         :return:
         """
 
@@ -228,6 +536,7 @@ class BusDAL(DalABC):
 
         q = (
             select(
+                brt.route_id,
                 brt.route_name,
                 brt.route_order,
                 func.ST_X(brt.location).label("latitude"),
@@ -240,11 +549,15 @@ class BusDAL(DalABC):
             )
             .select_from(br)
             .join(brt, br.route_name == brt.route_name)
-            .join(hjg, func.ST_Within(br.location, hjg.geometry))
-            .where(br.station_name.like(f"%{dest}%"), hjg.sig_kor_name == hang_jeong_gu)
+            .join(hjg, br.sig_code == hjg.sig_code)
+            .where(
+                br.station_name.like(f"%{dest}%"),
+                *self._filter_by_hang_jeong_gu(hjg, hang_jeong_gu, sido),
+            )
             .group_by(
                 brt.route_name,
                 brt.route_order,
+                brt.route_id,
                 brt.location,
                 brt.station_name,
                 brt.ars_id,
@@ -252,18 +565,39 @@ class BusDAL(DalABC):
                 br.station_name,
             )
         )
+        q = self._paginate(
+            q,
+            [br.station_name, br.ars_id, brt.route_name, brt.route_order, brt.route_id],
+            limit,
+            after,
+        )
 
-        result = await self.session.execute(q)
+        result = await self._execute(
+            q, *self._timeout("get_bus_routes_by_destination_filter_hang_jeong_gu")
+        )
         return result.all()
 
+    @singleflight
     async def get_bus_route_name_by_destination_filter_hang_jeong_gu(
-        self, dest: str, hang_jeong_gu: str
+        self,
+        dest: str,
+        hang_jeong_gu: str,
+        sido: str | None = None,
+        limit: int | None = None,
+        after: list | None = None,
     ):
         """
         특정 시/구의 목적지(정류장)를 지나가는 버스 노선명을 조회한다
 
+        정류장이 포함되는 시/구(sig_code)는 loader에서 미리 계산하므로 공간 연산(ST_Within) 없이 조회한다
+        (노선명, 노선 ID) 순서로 정렬하여 keyset pagination 한다
+        페이지의 노선만 loader에서 미리 계산한 노선 요약 정보(bus_route_summary)와 join 한다
+
         :param dest: 목적지(정류장) 이름
         :param hang_jeong_gu: 목적지가 포함되는 지역 '구'의 이름
+        :param sido: 목적지가 포함되는 시/도 이름
+        :param limit: 페이지 크기
+        :param after: 이전 페이지의 마지막 (노선명, 노선 ID)
         :return:
         """
 
@@ -278,36 +612,70 @@ class BusDAL(DalABC):
             )
             .select_from(br)
             .join(brt, br.route_name == brt.route_name)
-            .join(hjg, func.ST_Within(br.location, hjg.geometry))
-            .where(br.station_name.like(f"%{dest}%"), hjg.sig_kor_name == hang_jeong_gu)
-            .order_by(brt.route_name)
+            .join(hjg, br.sig_code == hjg.sig_code)
+            .where(
+                br.station_name.like(f"%{dest}%"),
+                *self._filter_by_hang_jeong_gu(hjg, hang_jeong_gu, sido),
+            )
+        )
+        page = self._paginate(q, [brt.route_name, brt.route_id], limit, after).subquery(
+            "page"
         )
 
-        result = await self.session.execute(q)
+        q = (
+            select(
+                page.c.route_id,
+                page.c.route_name,
+                BusRouteSummary.stop_count,
+                BusRouteSummary.first_ars_id,
+                BusRouteSummary.first_station_name,
+                BusRouteSummary.last_ars_id,
+                BusRouteSummary.last_station_name,
+                BusRouteSummary.length,
+                BusRouteSummary.min_latitude,
+                BusRouteSummary.min_longitude,
+                BusRouteSummary.max_latitude,
+                BusRouteSummary.max_longitude,
+            )
+            .select_from(page)
+            .outerjoin(BusRouteSummary, BusRouteSummary.route_id == page.c.route_id)
+            .order_by(page.c.route_name, page.c.route_id)
+        )
+
+        result = await self._execute(
+            q, *self._timeout("get_bus_route_name_by_destination_filter_hang_jeong_gu")
+        )
         return result.all()
 
+    @singleflight
     async def get_bus_route_by_route_name_filter_hang_jeong_gu(
-        self, route_name: str, hang_jeong_gu: str
+        self, route_name: str, hang_jeong_gu: str, sido: str | None = None
     ):
         """
         특정 시/구의 목적지를 지나가는 버스 노선의 노선 정보를 조회한다
 
+        시/구를 지나가는 노선은 loader에서 미리 계산한 bus_route_district에서 확인한다
+
         :param route_name: 버스 노선명
         :param hang_jeong_gu: 목적지가 포함되는 지역 '구'의 이름
+        :param sido: 목적지가 포함되는 시/도 이름
         :return:
         """
 
         br1 = aliased(BusRoute)
-        br2 = aliased(BusRoute)
+        brd = aliased(BusRouteDistrict)
         hjg = aliased(HangJeongGu)
 
         sub_query = (
-            select(br2.route_name)
-            .join(hjg, func.ST_Within(br2.location, hjg.geometry))
+            select(brd.route_name)
+            .join(hjg, brd.sig_code == hjg.sig_code)
             .where(
-                and_(br2.route_name == route_name, hjg.sig_kor_name == hang_jeong_gu)
+                and_(
+                    brd.route_name == route_name,
+                    *self._filter_by_hang_jeong_gu(hjg, hang_jeong_gu, sido),
+                )
             )
-            .group_by(br2.route_name)
+            .group_by(brd.route_name)
             .subquery()
         )
 
@@ -324,5 +692,38 @@ class BusDAL(DalABC):
             .join(br1, sub_query.c.route_name == br1.route_name)
         )
 
-        result = await self.session.execute(q)
+        result = await self._execute(
+            q, *self._timeout("get_bus_route_by_route_name_filter_hang_jeong_gu")
+        )
+        return result.all()
+
+    @singleflight
+    async def get_bus_station_clusters(
+        self, zoom: int, min_x: int, max_x: int, min_y: int, max_y: int
+    ):
+        """
+        zoom level의 cell 범위에 포함되는 정류장 cluster를 조회한다
+
+        :param zoom: zoom level
+        :param min_x: cell x 좌표 시작
+        :param max_x: cell x 좌표 끝
+        :param min_y: cell y 좌표 시작
+        :param max_y: cell y 좌표 끝
+        :return:
+        """
+
+        # Row의 count() 함수와 이름이 겹치지 않도록 label을 지정한다
+        q = select(
+            BusStationCluster.count.label("station_count"),
+            BusStationCluster.latitude,
+            BusStationCluster.longitude,
+            BusStationCluster.ars_id,
+            BusStationCluster.station_name,
+        ).where(
+            BusStationCluster.zoom == zoom,
+            BusStationCluster.cell_x.between(min_x, max_x),
+            BusStationCluster.cell_y.between(min_y, max_y),
+        )
+
+        result = await self._execute(q, *self._timeout("get_bus_station_clusters"))
         return result.all()
@@ -0,0 +1,46 @@
+import datetime
+
+from sqlalchemy import select, insert
+
+from crud.abstract import DalABC
+from models import DatasetVersion
+
+
+class DatasetDAL(DalABC):
+    async def insert_dataset_version(
+        self, version: str, content_hash: str, loaded_at: datetime.datetime
+    ) -> None:
+        """
+        load 된 데이터의 버전을 추가한다
+
+        :param version: 데이터 버전
+        :param content_hash: 원본 데이터 파일의 hash 값
+        :param loaded_at: load 시간
+        :return:
+        """
+
+        q = insert(DatasetVersion).values(
+            version=version, content_hash=content_hash, loaded_at=loaded_at
+        )
+
+        await self.session.execute(q)
+
+    async def get_latest_dataset_version(self):
+        """
+        가장 최근에 load 된 데이터의 버전을 조회한다
+
+        :return:
+        """
+
+        q = (
+            select(
+                DatasetVersion.version,
+                DatasetVersion.content_hash,
+                DatasetVersion.loaded_at,
+            )
+            .order_by(DatasetVersion.id.desc())
+            .limit(1)
+        )
+
+        result = await self.session.execute(q)
+        return result.first()
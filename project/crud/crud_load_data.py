@@ -0,0 +1,311 @@
+import csv
+import pathlib
+import tempfile
+
+import pandas as pd
+from geopandas import GeoDataFrame
+from sqlalchemy import text
+
+from crud.abstract import DalABC
+
+# LOAD DATA 할 데이터를 저장하는 table의 suffix
+STAGING_SUFFIX = "_staging"
+# 교체되어 삭제할 table의 suffix
+OLD_SUFFIX = "_old"
+
+# 생성일자, 변경일자는 행마다 계산하지 않고 LOAD DATA의 SET 절에서 채운다
+TIMESTAMP_SET = ["created_at = NOW(6)", "updated_at = NOW(6)"]
+# 좌표는 loader의 transform 단계에서 만든 WKT(location)를 geometry로 변환한다
+POINT_SET = "location = ST_GeomFromText(@location, 4326)"
+
+
+def write_tsv(df: pd.DataFrame, path: pathlib.Path) -> None:
+    """
+    DataFrame을 LOAD DATA의 기본 형식(tab 구분, backslash escape, NULL은 \\N)으로 저장한다
+
+    :param df: 저장할 DataFrame. column 순서대로 저장한다
+    :param path: 파일 경로
+    :return:
+    """
+
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        df[column] = (
+            df[column]
+            .str.replace("\\", "\\\\", regex=False)
+            .str.replace("\t", "\\t", regex=False)
+            .str.replace("\n", "\\n", regex=False)
+            .str.replace("\r", "\\r", regex=False)
+        )
+
+    df.to_csv(
+        path,
+        sep="\t",
+        header=False,
+        index=False,
+        na_rep="\\N",
+        lineterminator="\n",
+        # escape는 직접 처리했으므로 csv module에서는 quote, escape 하지 않는다
+        quoting=csv.QUOTE_NONE,
+        quotechar="\x00",
+        escapechar=None,
+        encoding="utf-8",
+    )
+
+
+class LoadDataDAL(DalABC):
+    """
+    LOAD DATA LOCAL INFILE로 table 데이터를 교체하는 DAL
+
+    LoaderDAL(insert executemany)보다 빠르게 전체 데이터를 load 하기 위해 사용한다
+    - DataFrame을 TSV 파일로 저장하고, 좌표(WKT)는 SET 절의 ST_GeomFromText로 서버에서 geometry로 변환한다
+    - 원본 table과 같은 구조의 staging table에서 secondary index를 삭제한 뒤 load 하고, load가 끝나면 index를 한 번에 생성한다
+    - 모든 staging table을 load 한 뒤 RENAME TABLE로 한 번에 교체하므로, API는 load 중인 데이터를 보지 않는다
+
+    DDL(CREATE, ALTER, RENAME)은 암묵적으로 commit 되므로, 이 DAL은 LoaderDAL과 같은 transaction에서 사용하지 않는다
+    connection은 local_infile 옵션을 사용해야 한다(connection.database.create_load_data_engine)
+    """
+
+    def __init__(self, session, tmp_dir: str | None = None) -> None:
+        super().__init__(session)
+        self.tmp_dir = pathlib.Path(tmp_dir or tempfile.gettempdir())
+        self.staged: list[str] = []
+
+    async def _secondary_indexes(self, table: str) -> dict[str, str]:
+        """
+        table의 secondary index 정의(ALTER TABLE ... ADD 절)를 조회한다
+
+        :param table: table 이름
+        :return: {index 이름: ADD 절}
+        """
+
+        q = text(
+            "SELECT INDEX_NAME, NON_UNIQUE, INDEX_TYPE, COLUMN_NAME, SUB_PART "
+            "FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "AND INDEX_NAME <> 'PRIMARY' "
+            "ORDER BY INDEX_NAME, SEQ_IN_INDEX"
+        )
+        result = await self.session.execute(q, {"table": table})
+
+        indexes: dict[str, dict] = {}
+        for name, non_unique, index_type, column, sub_part in result.all():
+            index = indexes.setdefault(
+                name, {"non_unique": non_unique, "type": index_type, "columns": []}
+            )
+            index["columns"].append(
+                f"`{column}`({sub_part})" if sub_part else f"`{column}`"
+            )
+
+        definitions = {}
+        for name, index in indexes.items():
+            if index["type"] == "SPATIAL":
+                kind = "SPATIAL INDEX"
+            elif index["type"] == "FULLTEXT":
+                kind = "FULLTEXT INDEX"
+            elif not index["non_unique"]:
+                kind = "UNIQUE INDEX"
+            else:
+                kind = "INDEX"
+            definitions[name] = f"ADD {kind} `{name}` ({', '.join(index['columns'])})"
+
+        return definitions
+
+    async def _stage(
+        self, table: str, df: pd.DataFrame, columns: list[str], set_clause: list[str]
+    ) -> None:
+        """
+        staging table을 만들고 LOAD DATA로 데이터를 load 한 뒤 secondary index를 생성한다
+
+        :param table: 원본 table 이름
+        :param df: load 할 DataFrame
+        :param columns: TSV column에 대응하는 table column 또는 사용자 변수(@name)
+        :param set_clause: LOAD DATA의 SET 절
+        :return:
+        """
+
+        staging = f"{table}{STAGING_SUFFIX}"
+        path = self.tmp_dir / f"{staging}.tsv"
+
+        await self.session.execute(text(f"DROP TABLE IF EXISTS `{staging}`"))
+        await self.session.execute(text(f"CREATE TABLE `{staging}` LIKE `{table}`"))
+
+        # index를 유지하면서 행마다 갱신하지 않도록 load 전에 secondary index를 삭제한다
+        indexes = await self._secondary_indexes(staging)
+        if indexes:
+            drop_clause = ", ".join(f"DROP INDEX `{name}`" for name in indexes)
+            await self.session.execute(text(f"ALTER TABLE `{staging}` {drop_clause}"))
+
+        write_tsv(df, path)
+        try:
+            await self.session.execute(
+                text(
+                    f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE `{staging}` "
+                    "CHARACTER SET utf8mb4 "
+                    "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                    "LINES TERMINATED BY '\\n' "
+                    f"({', '.join(columns)}) "
+                    f"SET {', '.join(set_clause + TIMESTAMP_SET)}"
+                )
+            )
+            await self.session.commit()
+        finally:
+            path.unlink(missing_ok=True)
+
+        # 모든 index를 한 번의 ALTER TABLE로 생성한다(sort 기반 index build)
+        if indexes:
+            await self.session.execute(
+                text(f"ALTER TABLE `{staging}` {', '.join(indexes.values())}")
+            )
+
+        self.staged.append(table)
+
+    async def stage_route(self, df: pd.DataFrame) -> None:
+        """
+        bus_route 데이터를 staging table에 load 한다
+
+        :param df: bus route 정보를 가지고 있는 DataFrame
+        :return:
+        """
+
+        columns = [
+            "route_id",
+            "route_name",
+            "route_order",
+            "node_id",
+            "ars_id",
+            "station_name",
+            "geohash",
+            "sig_code",
+            "location",
+        ]
+        df = df[columns].astype({"sig_code": "Int64"})
+
+        await self._stage("bus_route", df, columns[:-1] + ["@location"], [POINT_SET])
+
+    async def stage_station(self, df: pd.DataFrame) -> None:
+        """
+        bus_station 데이터를 staging table에 load 한다
+
+        :param df: bus station 정보를 가지고 있는 DataFrame
+        :return:
+        """
+
+        columns = [
+            "node_id",
+            "node_name",
+            "geohash",
+            "collectd_time",
+            "mobile_id",
+            "city_code",
+            "city_name",
+            "admin_name",
+            "location",
+        ]
+
+        await self._stage(
+            "bus_station", df[columns], columns[:-1] + ["@location"], [POINT_SET]
+        )
+
+    async def stage_station_cluster(self, df: pd.DataFrame) -> None:
+        """
+        bus_station_cluster 데이터를 staging table에 load 한다
+
+        :param df: zoom level별 정류장 cluster 정보를 가지고 있는 DataFrame
+        :return:
+        """
+
+        columns = [
+            "zoom",
+            "cell_x",
+            "cell_y",
+            "count",
+            "latitude",
+            "longitude",
+            "ars_id",
+            "station_name",
+        ]
+
+        await self._stage("bus_station_cluster", df[columns], columns, [])
+
+    async def stage_route_district(self, df: pd.DataFrame) -> None:
+        """
+        bus_route_district 데이터를 staging table에 load 한다
+
+        :param df: 시/구별 버스 노선 정보를 가지고 있는 DataFrame
+        :return:
+        """
+
+        columns = ["sig_code", "route_id", "route_name", "stop_count"]
+
+        await self._stage("bus_route_district", df[columns], columns, [])
+
+    async def stage_route_summary(self, df: pd.DataFrame) -> None:
+        """
+        bus_route_summary 데이터를 staging table에 load 한다
+
+        :param df: 노선별 요약 정보를 가지고 있는 DataFrame
+        :return:
+        """
+
+        columns = [
+            "route_id",
+            "route_name",
+            "stop_count",
+            "first_ars_id",
+            "first_station_name",
+            "last_ars_id",
+            "last_station_name",
+            "length",
+            "min_latitude",
+            "min_longitude",
+            "max_latitude",
+            "max_longitude",
+        ]
+
+        await self._stage("bus_route_summary", df[columns], columns, [])
+
+    async def stage_hang_jeong_gu(self, gdf: GeoDataFrame) -> None:
+        """
+        hang_jeong_gu 데이터를 staging table에 load 한다
+
+        :param gdf: 시/구 GeoDataFrame
+        :return:
+        """
+
+        columns = ["sig_code", "sido", "sig_eng_name", "sig_kor_name"]
+        df = pd.DataFrame(gdf[columns]).assign(geometry=gdf.geometry.to_wkt())
+
+        await self._stage(
+            "hang_jeong_gu",
+            df,
+            columns + ["@geometry"],
+            ["geometry = ST_GeomFromText(@geometry, 4326)"],
+        )
+
+    async def swap(self) -> None:
+        """
+        load 한 staging table들을 원본 table과 한 번에 교체하고 이전 table을 삭제한다
+
+        :return:
+        """
+
+        if not self.staged:
+            return
+
+        for table in self.staged:
+            await self.session.execute(
+                text(f"DROP TABLE IF EXISTS `{table}{OLD_SUFFIX}`")
+            )
+
+        # RENAME TABLE은 여러 table을 원자적으로 교체한다
+        renames = ", ".join(
+            f"`{table}` TO `{table}{OLD_SUFFIX}`, `{table}{STAGING_SUFFIX}` TO `{table}`"
+            for table in self.staged
+        )
+        await self.session.execute(text(f"RENAME TABLE {renames}"))
+
+        for table in self.staged:
+            await self.session.execute(text(f"DROP TABLE `{table}{OLD_SUFFIX}`"))
+
+        self.staged = []
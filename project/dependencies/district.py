@@ -0,0 +1,34 @@
+from fastapi import Query
+
+import store
+from core.config import settings
+
+
+def get_hang_jeong_gu(
+    hang_jeong_gu: str = Query(None, min_length=1, alias="gu", description="시/구 이름"),
+    sido: str = Query(None, description="시/도 이름"),
+    latitude: float = Query(None, ge=-90, le=90, alias="lat", description="사용자 위치(위도)"),
+    longitude: float = Query(
+        None, ge=-180, le=180, alias="lon", description="사용자 위치(경도)"
+    ),
+) -> tuple[str, str | None]:
+    """
+    요청의 시/구를 결정한다
+
+    1. 시/구(gu)를 지정하면 해당 시/구를 사용한다. 다른 시/도에 이름이 같은 '구'가 있으면 시/도(sido)를 함께 지정한다
+    2. 사용자 위치(lat, lon)를 지정하면 위치가 포함되는 시/구를 사용한다
+    3. 그 외에는 기본 시/구(settings.default_hang_jeong_gu)를 사용한다
+    시/도(sido)는 시/구(gu)와 함께 지정한 경우에만 사용한다. 기본 시/구와 다른 시/도를 짝지으면 어떤 시/구와도 일치하지 않는다
+
+    :return: (시/구 이름, 시/도 이름)
+    """
+
+    if hang_jeong_gu:
+        return hang_jeong_gu, sido
+
+    if latitude is not None and longitude is not None and store.district.ready:
+        district = store.district.district_of(latitude, longitude)
+        if district:
+            return district.sig_kor_name, district.sido
+
+    return settings.default_hang_jeong_gu, None
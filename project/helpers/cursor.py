@@ -0,0 +1,77 @@
+import base64
+import json
+from typing import Any, Callable, Sequence
+
+
+def encode_cursor(data: Any) -> str:
+    """
+    다음 페이지 조회 위치를 opaque cursor 문자열로 변환한다
+
+    :param data: JSON으로 변환할 수 있는 값
+    :return:
+    """
+
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def check_keyset(value: Any, size: int) -> list:
+    """
+    cursor의 조회 위치가 정렬 key 개수와 같은 길이의 key 값 목록인지 확인한다
+
+    :param value: cursor에서 변환한 조회 위치
+    :param size: 정렬 key 개수
+    :return:
+    :raises ValueError: 올바르지 않은 조회 위치
+    """
+
+    if (
+        not isinstance(value, list)
+        or len(value) != size
+        or not all(
+            isinstance(i, (str, int, float)) and not isinstance(i, bool) for i in value
+        )
+    ):
+        raise ValueError(f"invalid keyset: {value!r}")
+
+    return value
+
+
+def decode_cursor(cursor: str, size: int | None = None) -> Any:
+    """
+    cursor 문자열을 다음 페이지 조회 위치로 변환한다
+
+    :param cursor: encode_cursor()로 만든 문자열
+    :param size: 조회 위치가 key 값 목록이면 정렬 key 개수. 값 목록의 길이를 확인한다
+    :return:
+    :raises ValueError: 올바르지 않은 cursor
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+
+    if size is not None:
+        check_keyset(value, size)
+    return value
+
+
+def split_page(
+    rows: Sequence, limit: int, key: Callable[[Any], list]
+) -> tuple[Sequence, list | None]:
+    """
+    limit + 1개 조회한 결과를 현재 페이지와 다음 페이지의 시작 key로 나눈다
+
+    :param rows: limit + 1개까지 조회한 결과
+    :param limit: 페이지 크기
+    :param key: row의 정렬 key를 반환하는 함수
+    :return: (현재 페이지, 다음 페이지가 있다면 현재 페이지의 마지막 key)
+    """
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, key(rows[-1])
@@ -0,0 +1,34 @@
+import numpy as np
+
+# 지구 평균 반지름(M)
+EARTH_RADIUS = 6_371_008.8
+
+
+def haversine(
+    latitude1: np.ndarray,
+    longitude1: np.ndarray,
+    latitude2: np.ndarray,
+    longitude2: np.ndarray,
+) -> np.ndarray:
+    """
+    두 위치 배열 사이의 거리(M)를 haversine 공식으로 계산한다
+
+    배열은 서로 broadcast 되므로, 한 위치와 여러 위치 사이의 거리도 계산할 수 있다
+
+    :param latitude1: 위도 배열
+    :param longitude1: 경도 배열
+    :param latitude2: 위도 배열
+    :param longitude2: 경도 배열
+    :return:
+    """
+
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(v, dtype=np.float64))
+        for v in (latitude1, longitude1, latitude2, longitude2)
+    )
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
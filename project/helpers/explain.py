@@ -0,0 +1,45 @@
+# table 전체를 읽는 실행 계획(EXPLAIN type)
+FULL_SCAN = "ALL"
+# 정렬 key와 같은 순서의 index를 읽어 filesort 없이 페이지를 찾는 query(deferred join)
+INDEX_ORDERED = {
+    "get_bus_stations_by_node_name",
+    "get_bus_routes_by_station_name",
+    "get_bus_routes_by_route_name",
+}
+# EXPLAIN 결과에서 출력할 column
+PLAN_COLUMNS = ("id", "select_type", "table", "type", "key", "rows", "Extra")
+
+
+def check_plan(name: str, plan: list[dict]) -> list[str]:
+    """
+    실행 계획에서 문제를 찾는다
+
+    :param name: BusDAL method 이름
+    :param plan: EXPLAIN 결과
+    :return: 문제 목록
+    """
+
+    problems = []
+    for row in plan:
+        table = row["table"] or ""
+        extra = row["Extra"] or ""
+        if table.startswith("<"):
+            continue
+
+        if row["type"] == FULL_SCAN:
+            problems.append(f"full table scan: {table}")
+        if (
+            name in INDEX_ORDERED
+            and row["select_type"] == "DERIVED"
+            and "Using filesort" in extra
+        ):
+            problems.append(f"filesort in page query: {table}")
+
+    return problems
+
+
+def format_plan(plan: list[dict]) -> str:
+    lines = ["    " + " | ".join(PLAN_COLUMNS)]
+    for row in plan:
+        lines.append("    " + " | ".join(str(row[c]) for c in PLAN_COLUMNS))
+    return "\n".join(lines)
@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+
+BASE32 = np.frombuffer(b"0123456789bcdefghjkmnpqrstuvwxyz", dtype=np.uint8)
+
+# bus_station, bus_route 테이블에 저장하는 geohash 길이
+# 7자리 cell의 크기는 약 153m(위도) x 122m(경도, 서울 기준) 이다
+GEOHASH_PRECISION = 7
+
+# 위도 1도의 거리(M)
+METERS_PER_DEGREE = 111_320
+
+
+def _bits(precision: int) -> tuple[int, int]:
+    """
+    geohash 길이에 따른 (위도, 경도) bit 수를 반환한다. 경도 bit부터 번갈아 사용한다
+    """
+
+    bits = precision * 5
+    return bits // 2, bits - bits // 2
+
+
+def _cell_index(
+    latitude: np.ndarray, longitude: np.ndarray, precision: int
+) -> tuple[np.ndarray, np.ndarray]:
+    lat_bits, lon_bits = _bits(precision)
+    lat_i = np.floor((np.asarray(latitude) + 90) / 180 * (1 << lat_bits))
+    lon_i = np.floor((np.asarray(longitude) + 180) / 360 * (1 << lon_bits))
+
+    return (
+        np.clip(lat_i, 0, (1 << lat_bits) - 1).astype(np.int64),
+        np.clip(lon_i, 0, (1 << lon_bits) - 1).astype(np.int64),
+    )
+
+
+def _encode_index(lat_i: np.ndarray, lon_i: np.ndarray, precision: int) -> np.ndarray:
+    lat_bits, lon_bits = _bits(precision)
+
+    # 경도, 위도 bit를 번갈아 배치(interleave)한다
+    code = np.zeros(lat_i.shape, dtype=np.int64)
+    for i in range(precision * 5):
+        if i % 2 == 0:
+            bit = (lon_i >> (lon_bits - 1 - i // 2)) & 1
+        else:
+            bit = (lat_i >> (lat_bits - 1 - i // 2)) & 1
+        code = (code << 1) | bit
+
+    # 5 bit 씩 base32 문자로 변환한다
+    shifts = np.arange(precision - 1, -1, -1, dtype=np.int64) * 5
+    chars = BASE32[(code[:, None] >> shifts) & 31]
+
+    return chars.view(f"S{precision}").ravel().astype(f"U{precision}")
+
+
+def encode(
+    latitude: np.ndarray, longitude: np.ndarray, precision: int = GEOHASH_PRECISION
+) -> np.ndarray:
+    """
+    위도, 경도 배열을 geohash 배열로 변환한다
+
+    :param latitude: 위도 배열
+    :param longitude: 경도 배열
+    :param precision: geohash 길이
+    :return:
+    """
+
+    lat_i, lon_i = _cell_index(
+        np.atleast_1d(latitude), np.atleast_1d(longitude), precision
+    )
+    return _encode_index(lat_i, lon_i, precision)
+
+
+def covering_cells(
+    latitude: float,
+    longitude: float,
+    distance: float,
+    max_cells: int = 20,
+    precision: int = GEOHASH_PRECISION,
+) -> tuple[list[str], int]:
+    """
+    위치를 기준으로 반경 거리를 모두 포함하는 geohash cell 목록을 반환한다
+
+    - 반경이 커서 cell 개수가 max_cells를 넘으면 더 짧은(큰) geohash cell을 사용한다
+    - 반환한 cell의 길이가 precision보다 짧다면 prefix 검색을 해야 한다
+
+    :param latitude: 위도
+    :param longitude: 경도
+    :param distance: 반경 거리(M)
+    :param max_cells: 최대 cell 개수
+    :param precision: 저장된 geohash 길이
+    :return: (geohash cell 목록, cell 길이)
+    """
+
+    d_lat = distance / METERS_PER_DEGREE
+    d_lon = distance / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+
+    for p in range(precision, 0, -1):
+        lat_i, lon_i = _cell_index(
+            np.array([latitude - d_lat, latitude + d_lat]),
+            np.array([longitude - d_lon, longitude + d_lon]),
+            p,
+        )
+        lat_range = np.arange(lat_i[0], lat_i[1] + 1)
+        lon_range = np.arange(lon_i[0], lon_i[1] + 1)
+        if len(lat_range) * len(lon_range) <= max_cells or p == 1:
+            grid_lat, grid_lon = np.meshgrid(lat_range, lon_range)
+            cells = _encode_index(grid_lat.ravel(), grid_lon.ravel(), p)
+            return cells.tolist(), p
@@ -0,0 +1,104 @@
+import os
+import pathlib
+import shutil
+
+import geopandas as gpd
+import pandas as pd
+from loguru import logger
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pq = None
+
+# cache 형식(transform 단계의 결과)이 바뀌면 올려서 이전 cache를 사용하지 않도록 한다
+LOAD_CACHE_FORMAT_VERSION = 1
+
+
+def _suffix() -> str:
+    # pyarrow가 있으면 Parquet으로, 없으면 pickle로 저장한다
+    return ".parquet" if pq else ".pkl"
+
+
+def cache_path(base_dir: pathlib.Path, content_hash: str) -> pathlib.Path:
+    """
+    원본 데이터 hash 값에 해당하는 cache 디렉터리 경로를 반환한다
+
+    :param base_dir: cache 저장 디렉터리
+    :param content_hash: 원본 데이터 파일의 hash 값
+    :return:
+    """
+
+    return base_dir / f"v{LOAD_CACHE_FORMAT_VERSION}-{content_hash[:32]}"
+
+
+def read_load_cache(
+    base_dir: pathlib.Path, content_hash: str, names: tuple[str, ...]
+) -> dict[str, pd.DataFrame] | None:
+    """
+    원본 데이터를 변환한 DataFrame들을 cache에서 읽는다
+
+    :param base_dir: cache 저장 디렉터리
+    :param content_hash: 원본 데이터 파일의 hash 값
+    :param names: 읽을 DataFrame 이름
+    :return: {이름: DataFrame}. cache가 없거나 읽을 수 없으면 None
+    """
+
+    path = cache_path(base_dir, content_hash)
+    suffix = _suffix()
+    if not all((path / f"{name}{suffix}").exists() for name in names):
+        return None
+
+    try:
+        if pq:
+            frames = {}
+            for name in names:
+                file = path / f"{name}{suffix}"
+                # geometry column이 있는 Parquet은 GeoDataFrame으로 읽는다
+                if b"geo" in (pq.read_schema(file).metadata or {}):
+                    frames[name] = gpd.read_parquet(file)
+                else:
+                    frames[name] = pd.read_parquet(file)
+            return frames
+
+        return {name: pd.read_pickle(path / f"{name}{suffix}") for name in names}
+    except Exception as e:
+        logger.warning(f"load cache is ignored. path: {path}, error: {e}")
+        return None
+
+
+def write_load_cache(
+    base_dir: pathlib.Path, content_hash: str, frames: dict[str, pd.DataFrame]
+) -> pathlib.Path:
+    """
+    원본 데이터를 변환한 DataFrame들을 cache에 저장한다
+
+    - 임시 디렉터리에 모두 저장한 뒤 rename 하므로, 중간에 실패해도 일부만 저장된 cache를 읽지 않는다
+    - 현재 cache를 제외한 이전 cache는 삭제한다
+
+    :param base_dir: cache 저장 디렉터리
+    :param content_hash: 원본 데이터 파일의 hash 값
+    :param frames: {이름: DataFrame}
+    :return: cache 디렉터리 경로
+    """
+
+    path = cache_path(base_dir, content_hash)
+    tmp_path = base_dir / f".{path.name}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    suffix = _suffix()
+    for name, df in frames.items():
+        if pq:
+            df.to_parquet(tmp_path / f"{name}{suffix}", index=False)
+        else:
+            df.to_pickle(tmp_path / f"{name}{suffix}")
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp_path, path)
+
+    for old in base_dir.iterdir():
+        if old.is_dir() and old != path and not old.name.startswith("."):
+            shutil.rmtree(old, ignore_errors=True)
+
+    return path
@@ -0,0 +1,99 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+def make_key(*args, **kwargs) -> Hashable:
+    """
+    함수 인자로 single flight key를 만든다. list, dict 인자는 tuple로 변환한다
+
+    :return:
+    """
+
+    def freeze(value):
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(v) for v in value)
+        if isinstance(value, dict):
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        return value
+
+    return freeze(args), freeze(kwargs)
+
+
+class SingleFlight:
+    """
+    같은 key로 동시에 실행되는 호출을 하나로 합친다
+
+    - 처음 호출(leader)만 실제로 실행하고, 실행 중에 같은 key로 들어온 호출(follower)은 leader의 결과(또는 예외)를 함께 받는다
+    - 결과를 저장하지 않으므로(cache가 아님), leader가 끝난 뒤의 호출은 다시 실행한다
+    - follower가 취소되어도 leader는 계속 실행한다. leader가 취소되면 대기 중인 follower 중 하나가 다시 실행한다
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        key로 실행 중인 호출이 있으면 그 결과를 기다리고, 없으면 fn을 실행한다
+
+        :param key: 같은 호출을 구분하는 key
+        :param fn: 실행할 coroutine 함수
+        :return:
+        """
+
+        while key in self._calls:
+            future = self._calls[key]
+            try:
+                # follower가 취소되어도 공유하는 future는 취소하지 않는다
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # leader가 취소되었으므로 다시 실행한다
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # follower가 없어도 "exception was never retrieved" 경고를 남기지 않는다
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+def singleflight(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    DAL 조회 method의 동시 호출을 인자 기준으로 하나로 합치는 decorator
+
+    follower는 자신의 session으로 조회하지 않으므로(AsyncSession은 처음 조회할 때 connection을 가져온다),
+    같은 조회가 몰려도 connection pool은 leader의 connection 하나만 사용한다
+
+    :param method: DAL의 async method
+    :return:
+    """
+
+    group = SingleFlight()
+
+    @functools.wraps(method)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        return await group.do(
+            make_key(*args, **kwargs), lambda: method(self, *args, **kwargs)
+        )
+
+    wrapper.group = group
+    return wrapper
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+# 지도(Web Mercator)의 tile 크기(pixel)
+TILE_SIZE = 256
+# 하나의 cluster가 차지하는 화면 크기(pixel)
+CLUSTER_CELL_SIZE = 64
+# cluster를 미리 계산하는 zoom level 범위
+CLUSTER_MIN_ZOOM = 8
+CLUSTER_MAX_ZOOM = 16
+# 한 번의 요청에서 반환하는 최대 cell 개수
+# 화면 크기(1920 x 1080) 기준으로 30 x 17개의 cell이 필요하다
+MAX_CLUSTER_CELLS = 1024
+
+# Web Mercator에서 표현할 수 있는 최대 위도
+MAX_LATITUDE = 85.05112878
+
+
+def cell_index(
+    latitude: np.ndarray, longitude: np.ndarray, zoom: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    위도, 경도를 zoom level의 cluster cell 좌표(x, y)로 변환한다
+
+    y 좌표는 북쪽에서 남쪽으로 증가한다
+
+    :param latitude: 위도 배열
+    :param longitude: 경도 배열
+    :param zoom: zoom level
+    :return:
+    """
+
+    cells = (TILE_SIZE // CLUSTER_CELL_SIZE) << zoom
+
+    lat = np.radians(
+        np.clip(np.asarray(latitude, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+    )
+    x = (np.asarray(longitude, dtype=np.float64) + 180) / 360
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2
+
+    return (
+        np.clip(np.floor(x * cells), 0, cells - 1).astype(np.int64),
+        np.clip(np.floor(y * cells), 0, cells - 1).astype(np.int64),
+    )
+
+
+def cell_range(
+    min_latitude: float,
+    min_longitude: float,
+    max_latitude: float,
+    max_longitude: float,
+    zoom: int,
+) -> tuple[int, int, int, int]:
+    """
+    지도 영역(bounding box)에 포함되는 cell 좌표 범위를 반환한다
+
+    :return: (min x, max x, min y, max y)
+    """
+
+    x, y = cell_index(
+        np.array([max_latitude, min_latitude]),
+        np.array([min_longitude, max_longitude]),
+        zoom,
+    )
+
+    return int(x[0]), int(x[1]), int(y[0]), int(y[1])
+
+
+def cluster_zoom(
+    min_latitude: float,
+    min_longitude: float,
+    max_latitude: float,
+    max_longitude: float,
+    zoom: int,
+) -> int:
+    """
+    요청한 zoom level을 cluster가 계산된 zoom level로 변환한다
+
+    지도 영역의 cell 개수가 MAX_CLUSTER_CELLS를 넘지 않도록 필요하면 zoom level을 낮춘다
+
+    :return:
+    """
+
+    zoom = min(max(zoom, CLUSTER_MIN_ZOOM), CLUSTER_MAX_ZOOM)
+    while zoom > CLUSTER_MIN_ZOOM:
+        x0, x1, y0, y1 = cell_range(
+            min_latitude, min_longitude, max_latitude, max_longitude, zoom
+        )
+        if (x1 - x0 + 1) * (y1 - y0 + 1) <= MAX_CLUSTER_CELLS:
+            break
+        zoom -= 1
+
+    return zoom
+
+
+def build_cluster_pyramid(stops: pd.DataFrame) -> pd.DataFrame:
+    """
+    zoom level별로 정류장을 cell 단위로 묶은 cluster를 계산한다
+
+    - cluster 위치는 cell에 포함된 정류장들의 평균 위치이다
+    - 정류장이 하나뿐인 cluster만 정류장 정보(ars_id, station_name)를 가진다
+
+    :param stops: 정류장(ars_id, station_name, latitude, longitude) DataFrame
+    :return:
+    """
+
+    pyramids = []
+    for zoom in range(CLUSTER_MIN_ZOOM, CLUSTER_MAX_ZOOM + 1):
+        x, y = cell_index(stops["latitude"], stops["longitude"], zoom)
+        clusters = (
+            stops.assign(cell_x=x, cell_y=y)
+            .groupby(["cell_x", "cell_y"], sort=False)
+            .agg(
+                count=("latitude", "size"),
+                latitude=("latitude", "mean"),
+                longitude=("longitude", "mean"),
+                ars_id=("ars_id", "first"),
+                station_name=("station_name", "first"),
+            )
+            .reset_index()
+        )
+        clusters["zoom"] = zoom
+
+        multiple = clusters["count"] > 1
+        clusters["ars_id"] = clusters["ars_id"].astype("Int64").mask(multiple)
+        clusters["station_name"] = clusters["station_name"].mask(multiple)
+
+        pyramids.append(clusters)
+
+    return pd.concat(pyramids, ignore_index=True)
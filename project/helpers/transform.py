@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+# 정류장 좌표로 허용하는 범위(대한민국)
+MIN_LATITUDE, MAX_LATITUDE = 33.0, 39.0
+MIN_LONGITUDE, MAX_LONGITUDE = 124.0, 132.0
+
+# 원본 파일을 읽을 때 사용하는 column dtype
+# 노선명, 정류장 ID는 숫자처럼 보이더라도 문자열로 읽는다('0017', 'N62' 등)
+ROUTE_DTYPES = {
+    "route_id": "Int64",
+    "route_name": str,
+    "route_order": "Int64",
+    "node_id": "Int64",
+    "ars_id": "Int64",
+    "station_name": str,
+    "latitude": "float64",
+    "longitude": "float64",
+}
+STATION_DTYPES = {
+    "node_id": str,
+    "node_name": str,
+    "latitude": "float64",
+    "longitude": "float64",
+    "collectd_time": str,
+    "mobile_id": "Int64",
+    "city_code": "Int64",
+    "city_name": str,
+    "admin_name": str,
+}
+
+
+def read_route_csv(path: str) -> pd.DataFrame:
+    """
+    버스 경로 파일을 column dtype을 지정하여 읽는다
+
+    :param path: 파일 경로
+    :return:
+    """
+
+    return pd.read_csv(path, encoding="utf-8", dtype=ROUTE_DTYPES)
+
+
+def read_station_csv(path: str) -> pd.DataFrame:
+    """
+    버스 정류소 파일을 column dtype을 지정하여 읽는다
+
+    :param path: 파일 경로
+    :return:
+    """
+
+    return pd.read_csv(path, encoding="utf-8", dtype=STATION_DTYPES)
+
+
+def _reject(
+    df: pd.DataFrame, mask: pd.Series, reason: str, rejected: list[pd.DataFrame]
+) -> pd.DataFrame:
+    # mask에 해당하는 행을 사유와 함께 rejected에 추가하고, 나머지 행을 반환한다
+    if mask.any():
+        rejected.append(df[mask].assign(reject_reason=reason))
+    return df[~mask]
+
+
+def _validate_location(
+    df: pd.DataFrame, rejected: list[pd.DataFrame]
+) -> tuple[pd.DataFrame, int]:
+    """
+    좌표를 검증한다
+
+    - 위도, 경도가 바뀌어 저장된 행은 바로잡는다
+    - 좌표가 없거나 범위를 벗어난 행은 제외한다
+
+    :return: (검증된 DataFrame, 위도/경도를 바로잡은 행 수)
+    """
+
+    lat = df["latitude"].to_numpy()
+    lon = df["longitude"].to_numpy()
+
+    lat_valid = (lat >= MIN_LATITUDE) & (lat <= MAX_LATITUDE)
+    lon_valid = (lon >= MIN_LONGITUDE) & (lon <= MAX_LONGITUDE)
+    swapped = (
+        ~lat_valid
+        & ~lon_valid
+        & (lon >= MIN_LATITUDE)
+        & (lon <= MAX_LATITUDE)
+        & (lat >= MIN_LONGITUDE)
+        & (lat <= MAX_LONGITUDE)
+    )
+
+    df = df.assign(
+        latitude=np.where(swapped, lon, lat), longitude=np.where(swapped, lat, lon)
+    )
+
+    df = _reject(
+        df, df["latitude"].isna() | df["longitude"].isna(), "missing_location", rejected
+    )
+    df = _reject(
+        df,
+        ~df["latitude"].between(MIN_LATITUDE, MAX_LATITUDE)
+        | ~df["longitude"].between(MIN_LONGITUDE, MAX_LONGITUDE),
+        "location_out_of_range",
+        rejected,
+    )
+
+    return df, int(swapped.sum())
+
+
+def _point_wkt(df: pd.DataFrame) -> pd.Series:
+    # Database와 같이 POINT(위도 경도) 순서로 WKT를 만든다
+    return (
+        "POINT(" + df["latitude"].astype(str) + " " + df["longitude"].astype(str) + ")"
+    )
+
+
+def _report(rejected: list[pd.DataFrame], columns: pd.Index) -> pd.DataFrame:
+    if not rejected:
+        return pd.DataFrame(columns=[*columns, "reject_reason"])
+    return pd.concat(rejected, ignore_index=True)
+
+
+def transform_route(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, int]:
+    """
+    버스 경로 데이터를 검증하고 load 할 수 있는 형태로 변환한다
+
+    - 필수 값(노선 ID, 노선 순번, Node ID, ARS ID, 이름)이 없는 행을 제외한다
+    - 좌표를 검증한다(_validate_location)
+    - 같은 (노선 ID, 노선 순번)이 여러 번 있으면 처음 행만 남긴다
+    - location(WKT)을 한 번에 만든다
+
+    :param df: 버스 경로 DataFrame(read_route_csv)
+    :return: (변환된 DataFrame, 제외된 행과 사유, 위도/경도를 바로잡은 행 수)
+    """
+
+    rejected = []
+    columns = df.columns
+
+    df = _reject(df, df["route_id"].isna(), "missing_route_id", rejected)
+    df = _reject(df, df["route_order"].isna(), "missing_route_order", rejected)
+    df = _reject(df, df["node_id"].isna(), "missing_node_id", rejected)
+    df = _reject(df, df["ars_id"].isna(), "missing_ars_id", rejected)
+    df = _reject(
+        df,
+        df["route_name"].isna() | df["station_name"].isna(),
+        "missing_name",
+        rejected,
+    )
+    df, swapped = _validate_location(df, rejected)
+    df = _reject(
+        df,
+        df.duplicated(subset=["route_id", "route_order"], keep="first"),
+        "duplicated_route_order",
+        rejected,
+    )
+
+    df = df.astype(
+        {
+            "route_id": "int64",
+            "route_order": "int64",
+            "node_id": "int64",
+            "ars_id": "int64",
+        }
+    ).reset_index(drop=True)
+    df["location"] = _point_wkt(df)
+
+    return df, _report(rejected, columns), swapped
+
+
+def transform_station(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, int]:
+    """
+    버스 정류소 데이터를 검증하고 load 할 수 있는 형태로 변환한다
+
+    - 필수 값(정류장 ID, 정류장 이름, 모바일 단축번호, 도시 코드)이 없는 행을 제외한다
+    - 좌표를 검증한다(_validate_location)
+    - 같은 정류장 ID가 여러 번 있으면 처음 행만 남긴다
+    - location(WKT)을 한 번에 만든다
+
+    :param df: 버스 정류소 DataFrame(read_station_csv)
+    :return: (변환된 DataFrame, 제외된 행과 사유, 위도/경도를 바로잡은 행 수)
+    """
+
+    rejected = []
+    columns = df.columns
+
+    df = _reject(df, df["node_id"].isna(), "missing_node_id", rejected)
+    df = _reject(df, df["node_name"].isna(), "missing_name", rejected)
+    df = _reject(df, df["mobile_id"].isna(), "missing_mobile_id", rejected)
+    df = _reject(df, df["city_code"].isna(), "missing_city_code", rejected)
+    df, swapped = _validate_location(df, rejected)
+    df = _reject(
+        df,
+        df.duplicated(subset=["node_id"], keep="first"),
+        "duplicated_node_id",
+        rejected,
+    )
+
+    df = df.astype({"mobile_id": "int64", "city_code": "int64"}).reset_index(drop=True)
+    df["location"] = _point_wkt(df)
+
+    return df, _report(rejected, columns), swapped
@@ -0,0 +1,4 @@
+from .admission import AdmissionClass, AdmissionControlMiddleware
+from .compression import CompressionCacheMiddleware
+from .disconnect import CancelOnDisconnectMiddleware
+from .etag import ConditionalGetMiddleware
@@ -0,0 +1,134 @@
+import asyncio
+import collections
+import dataclasses
+from typing import Callable
+
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from helpers.response import ErrorJSONResponse
+
+
+@dataclasses.dataclass
+class AdmissionClass:
+    """
+    같은 동시 실행 제한을 공유하는 endpoint 그룹
+
+    - 동시에 limit 개까지 처리하고, 나머지는 최대 queue_size 개까지 최대 max_wait 초 동안 순서대로 기다린다
+    - 대기열이 가득 찼거나 max_wait 안에 처리를 시작하지 못하면 거절한다
+    - 처리가 끝나면 실행 슬롯을 대기 중인 요청에 바로 넘기므로, 새로 들어온 요청이 대기 중인 요청을 앞지르지 않는다
+    - bypass(path)가 True인 요청(in-memory 저장소로 처리하여 Database를 사용하지 않는 요청)은 제한하지 않는다
+    """
+
+    name: str
+    paths: tuple[str, ...]
+    limit: int
+    queue_size: int
+    max_wait: float
+    bypass: Callable[[str], bool] | None = None
+    in_flight: int = 0
+    waiters: collections.deque = dataclasses.field(default_factory=collections.deque)
+
+    async def acquire(self) -> bool:
+        """
+        실행 슬롯을 얻는다
+
+        :return: 슬롯을 얻었으면 True, 거절되었으면 False
+        """
+
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            return True
+
+        if len(self.waiters) >= self.queue_size:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            # 기다리는 중에 요청이 취소되었다. 이미 슬롯을 넘겨 받았다면 반환한다
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._remove(waiter)
+            raise
+
+        if waiter.done():
+            return True
+
+        self._remove(waiter)
+        return False
+
+    def release(self) -> None:
+        """
+        실행 슬롯을 반환한다. 대기 중인 요청이 있으면 슬롯을 넘긴다
+
+        :return:
+        """
+
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self.in_flight -= 1
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class AdmissionControlMiddleware:
+    """
+    endpoint 그룹별로 동시에 처리하는 요청 수를 제한하고, 초과한 요청은 바로 503으로 거절한다(load shedding)
+
+    - Database가 느려져도 요청이 connection pool을 기다리며 무한히 쌓이지 않고, 거절된 요청은 Retry-After 후에 다시 시도한다
+    - 그룹별 limit 합계를 connection pool 크기 이하로 설정하면, 가벼운 요청(위치 검색)이 무거운 요청(노선 검색)의
+      connection 대기 뒤에 밀리지 않는다
+    - 어느 그룹에도 포함되지 않는 요청(in-memory 조회, health check)은 제한하지 않는다
+    - ETag(304), 압축 응답 cache에서 처리되는 요청은 Database를 사용하지 않으므로, 이 middleware는 그 안쪽에 둔다
+    """
+
+    def __init__(
+        self, app: ASGIApp, classes: list[AdmissionClass], retry_after: int = 1
+    ) -> None:
+        self.app = app
+        self.classes = classes
+        self.retry_after = retry_after
+
+    def _match(self, scope: Scope) -> AdmissionClass | None:
+        if scope["type"] != "http":
+            return None
+
+        path = scope["path"]
+        admission = next((c for c in self.classes if path.startswith(c.paths)), None)
+        if admission and admission.bypass and admission.bypass(path):
+            return None
+        return admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        admission = self._match(scope)
+        if admission is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await admission.acquire():
+            response = ErrorJSONResponse(
+                message="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release()
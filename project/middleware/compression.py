@@ -0,0 +1,201 @@
+import gzip
+from collections import OrderedDict
+from typing import Callable
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """
+    서버에서 지원하는 압축 방식을 선호 순서대로 반환한다
+    """
+
+    return ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate_encoding(headers: Headers) -> str | None:
+    """
+    Accept-Encoding header로 응답의 압축 방식을 결정한다
+
+    :param headers: 요청 header
+    :return: 압축 방식. 지원하는 압축 방식이 없으면 None
+    """
+
+    accepted = set()
+    for value in headers.get("accept-encoding", "").split(","):
+        encoding, _, params = value.strip().partition(";")
+        # q=0 은 허용하지 않는다는 의미이다
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(encoding.strip().lower())
+
+    for encoding in supported_encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+
+    return None
+
+
+class CompressedResponseCache:
+    """
+    압축된 응답을 저장하는 LRU cache
+
+    저장된 응답의 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 응답부터 제거한다
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[tuple, tuple[list, bytes]] = OrderedDict()
+
+    def get(self, key: tuple) -> tuple[list, bytes] | None:
+        item = self._items.get(key)
+        if item:
+            self._items.move_to_end(key)
+        return item
+
+    def set(self, key: tuple, headers: list, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+
+        if key in self._items:
+            self.size -= len(self._items.pop(key)[1])
+
+        self._items[key] = (headers, body)
+        self.size += len(body)
+
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionCacheMiddleware:
+    """
+    조회 API 응답을 압축(gzip/brotli)하고, 압축된 응답을 데이터 버전 기준으로 cache 한다
+
+    - 같은 데이터 버전, 같은 URL, 같은 압축 방식의 요청은 API를 호출하지 않고 cache 된 응답을 그대로 반환한다
+    - min_size보다 작은 응답은 압축하지 않는다
+    - 압축은 thread에서 처리하며 동시에 압축하는 개수를 max_workers로 제한하여 CPU 사용량을 제한한다
+    - 데이터 버전은 version_getter(path)로 요청 path별로 구한다(Database 데이터 버전, snapshot 버전 등)
+    - 데이터 버전을 알 수 없으면 압축만 하고 cache 하지 않는다
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        version_getter: Callable[[str], str | None],
+        paths: tuple[str, ...] = ("/v1/", "/v2/"),
+        exclude_paths: tuple[str, ...] = (),
+        exclude_suffixes: tuple[str, ...] = (),
+        min_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        max_workers: int = 2,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.version_getter = version_getter
+        self.paths = paths
+        self.exclude_paths = exclude_paths
+        self.exclude_suffixes = exclude_suffixes
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.limiter = anyio.CapacityLimiter(max_workers)
+        self.cache = CompressedResponseCache(cache_max_bytes)
+
+    def _is_target(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return False
+
+        path = scope["path"]
+        return (
+            path.startswith(self.paths)
+            and not path.startswith(self.exclude_paths)
+            and not path.endswith(self.exclude_suffixes)
+        )
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = (
+            negotiate_encoding(Headers(scope=scope)) if self._is_target(scope) else None
+        )
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        version = self.version_getter(scope["path"])
+        key = (version, scope["path"], scope["query_string"], encoding)
+
+        cached = self.cache.get(key) if version else None
+        if cached:
+            headers, body = cached
+            await send(
+                {"type": "http.response.start", "status": 200, "headers": list(headers)}
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        start_message: Message = {}
+        chunks = []
+
+        async def buffered_send(message: Message) -> None:
+            nonlocal start_message
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            await self._send_response(
+                send, start_message, b"".join(chunks), encoding, key
+            )
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _send_response(
+        self, send: Send, start_message: Message, body: bytes, encoding: str, key: tuple
+    ) -> None:
+        headers = MutableHeaders(scope=start_message)
+
+        # 성공한 응답 중에서 min_size 이상이고 압축되지 않은 응답만 압축한다
+        if (
+            start_message["status"] != 200
+            or len(body) < self.min_size
+            or "content-encoding" in headers
+        ):
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        body = await anyio.to_thread.run_sync(
+            self.compress, body, encoding, limiter=self.limiter
+        )
+
+        headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(body))
+        headers.add_vary_header("Accept-Encoding")
+
+        if key[0]:
+            self.cache.set(key, list(start_message["headers"]), body)
+
+        await send(start_message)
+        await send({"type": "http.response.body", "body": body})
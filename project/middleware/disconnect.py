@@ -0,0 +1,52 @@
+import asyncio
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    client 연결이 끊어지면 처리 중인 요청을 취소한다
+
+    - 요청을 처리하는 동안 client의 http.disconnect를 함께 기다리고, 연결이 끊어지면 요청 처리 task를 취소한다
+    - 취소된 요청의 Database 조회는 KILL QUERY로 중단되므로(DalABC._execute), 응답을 받을 client가 없는 query가
+      connection을 계속 점유하지 않는다
+    """
+
+    def __init__(self, app: ASGIApp, paths: tuple[str, ...] = ("/v1/", "/v2/")) -> None:
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        # client의 message는 이 middleware가 받아서 application에 전달한다
+        queue: asyncio.Queue[Message] = asyncio.Queue()
+        app_task = asyncio.create_task(self.app(scope, queue.get, send))
+
+        try:
+            while True:
+                receive_task = asyncio.ensure_future(receive())
+                await asyncio.wait(
+                    {app_task, receive_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if app_task.done():
+                    receive_task.cancel()
+                    break
+
+                message = receive_task.result()
+                queue.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    app_task.cancel()
+                    break
+        except asyncio.CancelledError:
+            app_task.cancel()
+            raise
+        finally:
+            # 취소된 요청이 정리(query 중단, session 반환)를 마칠 때까지 기다린다
+            await asyncio.wait({app_task})
+
+        if not app_task.cancelled():
+            app_task.result()
@@ -0,0 +1,113 @@
+import hashlib
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from middleware.compression import negotiate_encoding
+
+
+def make_etag(version: str, path: str, query_string: bytes) -> str:
+    """
+    데이터 버전과 요청 URL로 strong ETag를 만든다
+
+    같은 데이터 버전에서 같은 URL의 응답은 항상 같으므로, 응답 본문을 계산하지 않고 ETag를 만들 수 있다
+
+    :param version: 데이터 버전
+    :param path: 요청 path
+    :param query_string: 요청 query string
+    :return:
+    """
+
+    digest = hashlib.blake2b(path.encode() + b"?" + query_string, digest_size=8)
+    return f'"{version}-{digest.hexdigest()}"'
+
+
+def with_encoding(etag: str, encoding: str | None) -> str:
+    """
+    압축된 응답은 압축 방식별로 다른 ETag를 사용한다(strong ETag는 응답 본문이 같아야 한다)
+
+    :param etag: 압축하지 않은 응답의 ETag
+    :param encoding: 압축 방식(Content-Encoding)
+    :return:
+    """
+
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+class ConditionalGetMiddleware:
+    """
+    데이터 버전을 기준으로 조회 API 응답에 ETag, Cache-Control을 추가하고 conditional GET을 처리한다
+
+    - If-None-Match가 현재 ETag와 같으면 API를 호출하지 않고(Database 조회 없이) 304를 반환한다
+    - 데이터 버전은 version_getter(path)로 요청 path별로 구한다(Database 데이터 버전, snapshot 버전 등)
+    - 데이터 버전을 알 수 없으면(load 이력이 없거나 조회에 실패한 경우) 아무것도 하지 않는다
+    - 200 응답에만 ETag를 추가한다
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        version_getter: Callable[[str], str | None],
+        paths: tuple[str, ...] = ("/v1/", "/v2/"),
+        exclude_paths: tuple[str, ...] = (),
+        exclude_suffixes: tuple[str, ...] = (),
+        max_age: int = 60,
+    ) -> None:
+        self.app = app
+        self.version_getter = version_getter
+        self.paths = paths
+        self.exclude_paths = exclude_paths
+        self.exclude_suffixes = exclude_suffixes
+        self.cache_control = f"public, max-age={max_age}"
+
+    def _is_target(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return False
+
+        path = scope["path"]
+        return (
+            path.startswith(self.paths)
+            and not path.startswith(self.exclude_paths)
+            and not path.endswith(self.exclude_suffixes)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        version = self.version_getter(scope["path"]) if self._is_target(scope) else None
+        if not version:
+            await self.app(scope, receive, send)
+            return
+
+        etag = make_etag(version, scope["path"], scope["query_string"])
+
+        # 압축하지 않은 응답과 요청한 압축 방식으로 압축된 응답의 ETag를 모두 확인한다
+        request_headers = Headers(scope=scope)
+        etags = {etag, with_encoding(etag, negotiate_encoding(request_headers))}
+
+        if_none_match = request_headers.get("if-none-match", "")
+        matched = next(
+            (tag.strip() for tag in if_none_match.split(",") if tag.strip() in etags),
+            etag if if_none_match.strip() == "*" else None,
+        )
+        if matched:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [
+                        (b"etag", matched.encode()),
+                        (b"cache-control", self.cache_control.encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["etag"] = with_encoding(etag, headers.get("content-encoding"))
+                headers["cache-control"] = self.cache_control
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,70 @@
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from geoalchemy2 import alembic_helpers
+from sqlalchemy.engine import Connection
+
+import models  # noqa: F401 모든 model을 metadata에 등록한다
+from connection.database import Base, SQLALCHEMY_DATABASE_URL, engine
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# autogenerate는 models의 table, index 정의와 Database를 비교한다
+target_metadata = Base.metadata
+
+CONFIGURE_OPTIONS = {
+    "target_metadata": target_metadata,
+    "compare_type": True,
+    # geometry column, spatial index를 geoalchemy2 형식으로 비교하고 생성한다
+    "include_object": alembic_helpers.include_object,
+    "process_revision_directives": alembic_helpers.writer,
+    "render_item": alembic_helpers.render_item,
+}
+
+
+def run_migrations_offline() -> None:
+    """
+    Database에 접속하지 않고 migration SQL을 출력한다(alembic upgrade head --sql)
+
+    :return:
+    """
+
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        **CONFIGURE_OPTIONS,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection, **CONFIGURE_OPTIONS)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    """
+    API 서버와 같은 engine(asyncmy)으로 Database에 접속하여 migration을 실행한다
+
+    :return:
+    """
+
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
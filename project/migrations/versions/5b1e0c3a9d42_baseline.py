@@ -0,0 +1,171 @@
+"""baseline schema
+
+sql/init.sql로 생성하던 schema. 이미 init.sql로 생성된 Database는 이 revision으로 stamp 한다
+
+$ alembic stamp 5b1e0c3a9d42
+
+Revision ID: 5b1e0c3a9d42
+Revises:
+Create Date: 2026-10-19 18:10:00.000000+09:00
+
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e0c3a9d42"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", mysql.DATETIME(fsp=6), nullable=False, comment="생성일자"),
+        sa.Column("updated_at", mysql.DATETIME(fsp=6), nullable=False, comment="변경일자"),
+    ]
+
+
+def _point(comment: str) -> sa.Column:
+    return sa.Column(
+        "location",
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=False),
+        nullable=False,
+        comment=comment,
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bus_route",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("route_id", sa.BigInteger(), nullable=False, comment="노선 ID"),
+        sa.Column("route_name", sa.String(32), nullable=False, comment="노선명"),
+        sa.Column("route_order", sa.Integer(), nullable=False, comment="노선 순번"),
+        sa.Column("node_id", sa.BigInteger(), nullable=False, comment="Node Id"),
+        sa.Column("ars_id", sa.BigInteger(), nullable=False, comment="ARS ID"),
+        sa.Column("station_name", sa.String(255), nullable=False, comment="정류소 이름"),
+        _point("정류소 위치"),
+        sa.Column("geohash", sa.CHAR(7), nullable=False, comment="정류소 위치 geohash"),
+        sa.Column("sig_code", sa.Integer(), nullable=True, comment="정류소가 포함되는 시/구 코드"),
+        *_timestamps(),
+    )
+    op.create_index("idx_route_name", "bus_route", ["route_name"])
+    op.create_index("ars_id", "bus_route", ["ars_id"])
+    op.create_index("idx_station_name", "bus_route", ["station_name"])
+    op.create_index("spx_location", "bus_route", ["location"], mysql_prefix="SPATIAL")
+    op.create_index("idx_geohash", "bus_route", ["geohash"])
+    op.create_index(
+        "idx_sig_code_station_name", "bus_route", ["sig_code", "station_name"]
+    )
+
+    op.create_table(
+        "bus_route_district",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("sig_code", sa.Integer(), nullable=False, comment="시/구 코드"),
+        sa.Column("route_id", sa.BigInteger(), nullable=False, comment="노선 ID"),
+        sa.Column("route_name", sa.String(32), nullable=False, comment="노선명"),
+        sa.Column(
+            "stop_count",
+            sa.Integer(),
+            nullable=False,
+            comment="시/구에 포함되는 노선의 정류소 수",
+        ),
+        *_timestamps(),
+    )
+    op.create_index(
+        "idx_sig_code_route_name", "bus_route_district", ["sig_code", "route_name"]
+    )
+
+    op.create_table(
+        "bus_station",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("node_id", sa.String(64), nullable=False, comment="정류장 ID"),
+        sa.Column("node_name", sa.String(128), nullable=False, comment="정류장 이름"),
+        _point("정류장 위치"),
+        sa.Column("geohash", sa.CHAR(7), nullable=False, comment="정류장 위치 geohash"),
+        sa.Column("collectd_time", sa.DATE(), nullable=False, comment="정보 수집일"),
+        sa.Column("mobile_id", sa.BigInteger(), nullable=False, comment="모바일 단축번호"),
+        sa.Column("city_code", sa.BigInteger(), nullable=False, comment="도시 코드"),
+        sa.Column("city_name", sa.String(16), nullable=False, comment="도시명"),
+        sa.Column("admin_name", sa.String(16), nullable=False, comment="관리 도시명"),
+        *_timestamps(),
+    )
+    op.create_index("idx_node_name", "bus_station", ["node_name"])
+    op.create_index("idx_mobile_id", "bus_station", ["mobile_id"])
+    op.create_index("spx_location", "bus_station", ["location"], mysql_prefix="SPATIAL")
+    op.create_index("idx_geohash", "bus_station", ["geohash"])
+
+    op.create_table(
+        "bus_station_cluster",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("zoom", sa.Integer(), nullable=False, comment="zoom level"),
+        sa.Column("cell_x", sa.Integer(), nullable=False, comment="cell x 좌표"),
+        sa.Column("cell_y", sa.Integer(), nullable=False, comment="cell y 좌표"),
+        sa.Column("count", sa.Integer(), nullable=False, comment="정류장 수"),
+        sa.Column("latitude", sa.Double(), nullable=False, comment="cluster 위치(위도)"),
+        sa.Column("longitude", sa.Double(), nullable=False, comment="cluster 위치(경도)"),
+        sa.Column(
+            "ars_id", sa.BigInteger(), nullable=True, comment="ARS ID(정류장이 하나인 경우)"
+        ),
+        sa.Column(
+            "station_name",
+            sa.String(255),
+            nullable=True,
+            comment="정류장 이름(정류장이 하나인 경우)",
+        ),
+        *_timestamps(),
+    )
+    op.create_index(
+        "idx_zoom_cell", "bus_station_cluster", ["zoom", "cell_x", "cell_y"]
+    )
+
+    op.create_table(
+        "hang_jeong_gu",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("sig_code", sa.Integer(), nullable=False, comment="시구 코드"),
+        sa.Column("sido", sa.String(32), nullable=False, comment="시도 이름"),
+        sa.Column("sig_eng_name", sa.String(64), nullable=False, comment="시구 영어 이름"),
+        sa.Column("sig_kor_name", sa.String(64), nullable=False, comment="시구 한글 이름"),
+        sa.Column(
+            "geometry",
+            Geometry(geometry_type="POLYGON", srid=4326, spatial_index=False),
+            nullable=False,
+            comment="위치(Polygon)",
+        ),
+        *_timestamps(),
+    )
+    op.create_index("idx_sig_kor_name", "hang_jeong_gu", ["sig_kor_name"])
+    op.create_index(
+        "spx_geometry", "hang_jeong_gu", ["geometry"], mysql_prefix="SPATIAL"
+    )
+
+    op.create_table(
+        "dataset_version",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("version", sa.String(64), nullable=False, comment="데이터 버전"),
+        sa.Column(
+            "content_hash", sa.String(64), nullable=False, comment="원본 데이터 파일 hash"
+        ),
+        sa.Column(
+            "loaded_at", mysql.DATETIME(fsp=6), nullable=False, comment="load 일자"
+        ),
+        *_timestamps(),
+    )
+    op.create_index("idx_version", "dataset_version", ["version"])
+
+
+def downgrade() -> None:
+    for table in (
+        "dataset_version",
+        "hang_jeong_gu",
+        "bus_station_cluster",
+        "bus_station",
+        "bus_route_district",
+        "bus_route",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,65 @@
+"""composite and covering indexes for BusDAL access paths
+
+- bus_route
+  - (route_name, route_order): 노선명 검색의 (route_name, route_order, id) 정렬을 index 순서로 읽고(filesort 제거),
+    노선명 self join(목적지를 지나가는 노선, 노선 상세)을 ref로 조회한다
+  - (route_name, route_id): 목적지를 지나가는 노선명(DISTINCT route_id)을 table을 읽지 않고 조회한다(covering)
+  - (station_name, ars_id): 정류장명 검색의 (station_name, ars_id) 정렬과 GROUP BY를 index로 처리한다(covering)
+  - (sig_code, station_name, ars_id, route_name): 시/구의 목적지 정류장을 찾고 self join 하는 데 필요한 column을 포함한다(covering)
+  - 위 index의 prefix인 단일 column index(idx_route_name, idx_station_name)는 삭제한다
+  - ars_id index의 이름을 다른 index와 같은 형식(idx_ars_id)으로 변경한다
+- hang_jeong_gu
+  - (sig_kor_name, sido, sig_code): 시/구 이름(과 시/도)으로 sig_code를 찾는다(covering)
+
+Revision ID: 9c4d7e21f0b8
+Revises: 5b1e0c3a9d42
+Create Date: 2026-10-19 18:20:00.000000+09:00
+
+"""
+from typing import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4d7e21f0b8"
+down_revision: str | None = "5b1e0c3a9d42"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.drop_index("idx_route_name", table_name="bus_route")
+    op.drop_index("idx_station_name", table_name="bus_route")
+    op.drop_index("idx_sig_code_station_name", table_name="bus_route")
+    op.execute("ALTER TABLE bus_route RENAME INDEX ars_id TO idx_ars_id")
+
+    op.create_index("idx_route_name_order", "bus_route", ["route_name", "route_order"])
+    op.create_index("idx_route_name_route_id", "bus_route", ["route_name", "route_id"])
+    op.create_index("idx_station_name_ars_id", "bus_route", ["station_name", "ars_id"])
+    op.create_index(
+        "idx_sig_code_station_name",
+        "bus_route",
+        ["sig_code", "station_name", "ars_id", "route_name"],
+    )
+
+    op.drop_index("idx_sig_kor_name", table_name="hang_jeong_gu")
+    op.create_index(
+        "idx_sig_kor_name_sido", "hang_jeong_gu", ["sig_kor_name", "sido", "sig_code"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_sig_kor_name_sido", table_name="hang_jeong_gu")
+    op.create_index("idx_sig_kor_name", "hang_jeong_gu", ["sig_kor_name"])
+
+    op.drop_index("idx_sig_code_station_name", table_name="bus_route")
+    op.drop_index("idx_station_name_ars_id", table_name="bus_route")
+    op.drop_index("idx_route_name_route_id", table_name="bus_route")
+    op.drop_index("idx_route_name_order", table_name="bus_route")
+
+    op.execute("ALTER TABLE bus_route RENAME INDEX idx_ars_id TO ars_id")
+    op.create_index(
+        "idx_sig_code_station_name", "bus_route", ["sig_code", "station_name"]
+    )
+    op.create_index("idx_station_name", "bus_route", ["station_name"])
+    op.create_index("idx_route_name", "bus_route", ["route_name"])
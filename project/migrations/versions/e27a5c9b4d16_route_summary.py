@@ -0,0 +1,61 @@
+"""bus_route_summary table
+
+노선 검색 API에서 노선 목록과 함께 반환하는 노선별 요약 정보(정류소 수, 기점/종점, 노선 길이, 영역)
+loader가 bus_route 데이터로 계산하여 저장한다
+
+Revision ID: e27a5c9b4d16
+Revises: 9c4d7e21f0b8
+Create Date: 2026-10-19 18:40:00.000000+09:00
+
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "e27a5c9b4d16"
+down_revision: str | None = "9c4d7e21f0b8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bus_route_summary",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("route_id", sa.BigInteger(), nullable=False, comment="노선 ID"),
+        sa.Column("route_name", sa.String(32), nullable=False, comment="노선명"),
+        sa.Column("stop_count", sa.Integer(), nullable=False, comment="노선의 정류소 수"),
+        sa.Column(
+            "first_ars_id", sa.BigInteger(), nullable=False, comment="기점 정류소 ARS ID"
+        ),
+        sa.Column(
+            "first_station_name",
+            sa.String(255),
+            nullable=False,
+            comment="기점 정류소 이름",
+        ),
+        sa.Column(
+            "last_ars_id", sa.BigInteger(), nullable=False, comment="종점 정류소 ARS ID"
+        ),
+        sa.Column(
+            "last_station_name",
+            sa.String(255),
+            nullable=False,
+            comment="종점 정류소 이름",
+        ),
+        sa.Column("length", sa.Double(), nullable=False, comment="노선 길이(M)"),
+        sa.Column("min_latitude", sa.Double(), nullable=False, comment="노선 영역 최소 위도"),
+        sa.Column("min_longitude", sa.Double(), nullable=False, comment="노선 영역 최소 경도"),
+        sa.Column("max_latitude", sa.Double(), nullable=False, comment="노선 영역 최대 위도"),
+        sa.Column("max_longitude", sa.Double(), nullable=False, comment="노선 영역 최대 경도"),
+        sa.Column("created_at", mysql.DATETIME(fsp=6), nullable=False, comment="생성일자"),
+        sa.Column("updated_at", mysql.DATETIME(fsp=6), nullable=False, comment="변경일자"),
+    )
+    op.create_index("idx_route_id", "bus_route_summary", ["route_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("bus_route_summary")
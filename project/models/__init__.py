@@ -1,2 +1,9 @@
-from .bus import BusRoute, BusStation
+from .bus import (
+    BusRoute,
+    BusRouteDistrict,
+    BusRouteSummary,
+    BusStation,
+    BusStationCluster,
+)
 from .address import HangJeongGu
+from .dataset import DatasetVersion
@@ -1,5 +1,5 @@
 from geoalchemy2 import Geometry
-from sqlalchemy import Column, Integer, String, BigInteger
+from sqlalchemy import Column, Integer, String, BigInteger, Index
 
 from connection.database import Base
 from models.mixin import TimestampMixin
@@ -7,10 +7,19 @@ from models.mixin import TimestampMixin
 
 class HangJeongGu(Base, TimestampMixin):
     __tablename__ = "hang_jeong_gu"
+    __table_args__ = (
+        # 시/구 이름(과 시/도)으로 sig_code를 찾는다(covering)
+        Index("idx_sig_kor_name_sido", "sig_kor_name", "sido", "sig_code"),
+        Index("spx_geometry", "geometry", mysql_prefix="SPATIAL"),
+    )
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    sig_code = Column(Integer)
-    sido = Column(String(32))
-    sig_eng_name = Column(String(64))
-    sig_kor_name = Column(String(64), index=True)
-    geometry = Column(Geometry(geometry_type="POLYGON", spatial_index=True, srid=4326))
+    id = Column(BigInteger, primary_key=True)
+    sig_code = Column(Integer, nullable=False, comment="시구 코드")
+    sido = Column(String(32), nullable=False, comment="시도 이름")
+    sig_eng_name = Column(String(64), nullable=False, comment="시구 영어 이름")
+    sig_kor_name = Column(String(64), nullable=False, comment="시구 한글 이름")
+    geometry = Column(
+        Geometry(geometry_type="POLYGON", srid=4326, spatial_index=False),
+        nullable=False,
+        comment="위치(Polygon)",
+    )
@@ -1,32 +1,121 @@
 from geoalchemy2 import Geometry
-from sqlalchemy import Column, BigInteger, String, Integer, DATE
+from sqlalchemy import Column, BigInteger, String, Integer, DATE, Double, Index, CHAR
 
 from connection.database import Base
 from models.mixin import TimestampMixin
 
+# index는 BusDAL의 조회 query(access path)에 맞추어 설계한다. 변경할 때에는 migration을 함께 추가하고,
+# script/explain_check.py로 조회 query가 full scan 하지 않는지 확인한다
+
 
 class BusRoute(Base, TimestampMixin):
     __tablename__ = "bus_route"
+    __table_args__ = (
+        # 노선명 검색의 (route_name, route_order, id) 정렬, 노선명 self join
+        Index("idx_route_name_order", "route_name", "route_order"),
+        # 목적지를 지나가는 노선명의 (route_name, route_id) 정렬(covering)
+        Index("idx_route_name_route_id", "route_name", "route_id"),
+        # 정류장명 검색의 (station_name, ars_id) 정렬(covering)
+        Index("idx_station_name_ars_id", "station_name", "ars_id"),
+        # 시/구의 목적지 정류장 검색. self join에 필요한 column을 포함한다(covering)
+        Index(
+            "idx_sig_code_station_name",
+            "sig_code",
+            "station_name",
+            "ars_id",
+            "route_name",
+        ),
+        Index("idx_ars_id", "ars_id"),
+        Index("idx_geohash", "geohash"),
+        Index("spx_location", "location", mysql_prefix="SPATIAL"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    route_id = Column(BigInteger, nullable=False, comment="노선 ID")
+    route_name = Column(String(32), nullable=False, comment="노선명")
+    route_order = Column(Integer, nullable=False, comment="노선 순번")
+    node_id = Column(BigInteger, nullable=False, comment="Node Id")
+    ars_id = Column(BigInteger, nullable=False, comment="ARS ID")
+    station_name = Column(String(255), nullable=False, comment="정류소 이름")
+    location = Column(
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=False),
+        nullable=False,
+        comment="정류소 위치",
+    )
+    geohash = Column(CHAR(7), nullable=False, comment="정류소 위치 geohash")
+    # 정류장이 포함되는 시/구(hang_jeong_gu.sig_code). loader에서 미리 계산한다
+    sig_code = Column(Integer, nullable=True, comment="정류소가 포함되는 시/구 코드")
+
+
+class BusRouteDistrict(Base, TimestampMixin):
+    __tablename__ = "bus_route_district"
+    __table_args__ = (Index("idx_sig_code_route_name", "sig_code", "route_name"),)
+
+    id = Column(BigInteger, primary_key=True)
+    sig_code = Column(Integer, nullable=False, comment="시/구 코드")
+    route_id = Column(BigInteger, nullable=False, comment="노선 ID")
+    route_name = Column(String(32), nullable=False, comment="노선명")
+    stop_count = Column(Integer, nullable=False, comment="시/구에 포함되는 노선의 정류소 수")
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    route_id = Column(BigInteger)
-    route_name = Column(String(32), index=True)
-    route_order = Column(Integer)
-    node_id = Column(BigInteger)
-    ars_id = Column(BigInteger, index=True)
-    station_name = Column(String(255), index=True)
-    location = Column(Geometry(geometry_type="POINT", srid=4326, spatial_index=True))
+
+class BusRouteSummary(Base, TimestampMixin):
+    __tablename__ = "bus_route_summary"
+    __table_args__ = (
+        # 노선명 검색 결과의 노선 ID로 요약 정보를 join 한다
+        Index("idx_route_id", "route_id", unique=True),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    route_id = Column(BigInteger, nullable=False, comment="노선 ID")
+    route_name = Column(String(32), nullable=False, comment="노선명")
+    stop_count = Column(Integer, nullable=False, comment="노선의 정류소 수")
+    first_ars_id = Column(BigInteger, nullable=False, comment="기점 정류소 ARS ID")
+    first_station_name = Column(String(255), nullable=False, comment="기점 정류소 이름")
+    last_ars_id = Column(BigInteger, nullable=False, comment="종점 정류소 ARS ID")
+    last_station_name = Column(String(255), nullable=False, comment="종점 정류소 이름")
+    length = Column(Double, nullable=False, comment="노선 길이(M)")
+    min_latitude = Column(Double, nullable=False, comment="노선 영역 최소 위도")
+    min_longitude = Column(Double, nullable=False, comment="노선 영역 최소 경도")
+    max_latitude = Column(Double, nullable=False, comment="노선 영역 최대 위도")
+    max_longitude = Column(Double, nullable=False, comment="노선 영역 최대 경도")
 
 
 class BusStation(Base, TimestampMixin):
     __tablename__ = "bus_station"
+    __table_args__ = (
+        # 정류장명 검색의 (node_name, id) 정렬(secondary index는 primary key를 포함한다)
+        Index("idx_node_name", "node_name"),
+        Index("idx_mobile_id", "mobile_id"),
+        Index("idx_geohash", "geohash"),
+        Index("spx_location", "location", mysql_prefix="SPATIAL"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    node_id = Column(String(64), nullable=False, comment="정류장 ID")
+    node_name = Column(String(128), nullable=False, comment="정류장 이름")
+    location = Column(
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=False),
+        nullable=False,
+        comment="정류장 위치",
+    )
+    geohash = Column(CHAR(7), nullable=False, comment="정류장 위치 geohash")
+    collectd_time = Column(DATE, nullable=False, comment="정보 수집일")
+    mobile_id = Column(BigInteger, nullable=False, comment="모바일 단축번호")
+    city_code = Column(BigInteger, nullable=False, comment="도시 코드")
+    city_name = Column(String(16), nullable=False, comment="도시명")
+    admin_name = Column(String(16), nullable=False, comment="관리 도시명")
+
+
+class BusStationCluster(Base, TimestampMixin):
+    __tablename__ = "bus_station_cluster"
+    __table_args__ = (Index("idx_zoom_cell", "zoom", "cell_x", "cell_y"),)
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    node_id = Column(String(64))
-    node_name = Column(String(128), index=True)
-    location = Column(Geometry(geometry_type="POINT", srid=4326, spatial_index=True))
-    collectd_time = Column(DATE)
-    mobile_id = Column(BigInteger, index=True)
-    city_code = Column(BigInteger)
-    city_name = Column(String(16))
-    admin_name = Column(String(16))
+    id = Column(BigInteger, primary_key=True)
+    zoom = Column(Integer, nullable=False, comment="zoom level")
+    cell_x = Column(Integer, nullable=False, comment="cell x 좌표")
+    cell_y = Column(Integer, nullable=False, comment="cell y 좌표")
+    count = Column(Integer, nullable=False, comment="정류장 수")
+    latitude = Column(Double, nullable=False, comment="cluster 위치(위도)")
+    longitude = Column(Double, nullable=False, comment="cluster 위치(경도)")
+    ars_id = Column(BigInteger, nullable=True, comment="ARS ID(정류장이 하나인 경우)")
+    station_name = Column(String(255), nullable=True, comment="정류장 이름(정류장이 하나인 경우)")
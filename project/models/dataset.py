@@ -0,0 +1,15 @@
+from sqlalchemy import Column, BigInteger, String, Index
+from sqlalchemy.dialects.mysql import DATETIME
+
+from connection.database import Base
+from models.mixin import TimestampMixin
+
+
+class DatasetVersion(Base, TimestampMixin):
+    __tablename__ = "dataset_version"
+    __table_args__ = (Index("idx_version", "version"),)
+
+    id = Column(BigInteger, primary_key=True)
+    version = Column(String(64), nullable=False, comment="데이터 버전")
+    content_hash = Column(String(64), nullable=False, comment="원본 데이터 파일 hash")
+    loaded_at = Column(DATETIME(fsp=6), nullable=False, comment="load 일자")
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column
+from sqlalchemy.dialects.mysql import DATETIME
 from datetime import datetime
 
 from sqlalchemy.orm import declarative_mixin
@@ -6,7 +7,13 @@ from sqlalchemy.orm import declarative_mixin
 
 @declarative_mixin
 class TimestampMixin(object):
-    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    created_at = Column(
+        DATETIME(fsp=6), default=datetime.now, nullable=False, comment="생성일자"
+    )
     updated_at = Column(
-        DateTime, default=datetime.now, onupdate=datetime.now, nullable=False
+        DATETIME(fsp=6),
+        default=datetime.now,
+        onupdate=datetime.now,
+        nullable=False,
+        comment="변경일자",
     )
@@ -1,5 +1,6 @@
 from .default import (
     DefaultResponse,
+    PageResponse,
     ErrorResponse,
     ErrorValidationResponse,
 )
@@ -16,7 +17,33 @@ from .bus import (
     BusRoutesSearch,
     BusRouteDestination,
     BusRoutesSearchResponse,
+    RouteStation,
+    RouteBounds,
+    RouteSummary,
     BusRouteName,
     BusRouteNameResponse,
     BusRouteNodeResponse,
+    StationCluster,
+    StationClusters,
+    BusStationClusterResponse,
+    FuzzyStation,
+    FuzzyStationSearchResponse,
+    Autocomplete,
+    AutocompleteResponse,
+)
+from .geo import (
+    District,
+    DistrictResponse,
+    DistrictBatchRequest,
+    DistrictBatchResponse,
+)
+from .arrival import (
+    BusArrival,
+    StationArrivals,
+    StationArrivalsResponse,
+)
+from .nearby import (
+    NearbyPosition,
+    NearbyDelta,
+    NearbyError,
 )
@@ -0,0 +1,26 @@
+import datetime
+
+from pydantic import BaseModel
+
+from schemas import DefaultResponse
+
+
+class BusArrival(BaseModel):
+    route_id: str
+    route_name: str
+    first_message: str
+    # 응답 시점 기준 도착 예정 시간(초). 도착 예정 버스가 없으면 None
+    first_seconds: int | None
+    second_message: str
+    second_seconds: int | None
+
+
+class StationArrivals(BaseModel):
+    ars_id: int
+    # upstream에서 도착 정보를 조회한 시각
+    updated_at: datetime.datetime
+    arrivals: list[BusArrival]
+
+
+class StationArrivalsResponse(DefaultResponse):
+    data: StationArrivals | None
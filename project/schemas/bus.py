@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 
-from schemas import DefaultResponse
+from schemas import DefaultResponse, PageResponse
 
 
 class Location(BaseModel):
@@ -47,7 +47,7 @@ class BusSearch(BaseModel):
     bus_route: BusRoutes
 
 
-class BusSearchResponse(DefaultResponse):
+class BusSearchResponse(PageResponse):
     data: BusSearch
 
 
@@ -56,18 +56,75 @@ class BusRoutesSearch(BaseModel):
     station_name: str
 
 
-class BusRoutesSearchResponse(DefaultResponse):
+class BusRoutesSearchResponse(PageResponse):
     data: list[BusRoutesSearch]
 
 
+class RouteStation(BaseModel):
+    ars_id: int
+    station_name: str
+
+
+class RouteBounds(BaseModel):
+    min_latitude: float
+    min_longitude: float
+    max_latitude: float
+    max_longitude: float
+
+
+class RouteSummary(BaseModel):
+    stop_count: int
+    first_station: RouteStation
+    last_station: RouteStation
+    # 정류장 사이의 직선 거리 합계(M)
+    length: float
+    bounds: RouteBounds
+
+
 class BusRouteName(BaseModel):
     route_id: int
     route_name: str
+    summary: RouteSummary | None = None
 
 
-class BusRouteNameResponse(DefaultResponse):
+class BusRouteNameResponse(PageResponse):
     data: list[BusRouteName]
 
 
 class BusRouteNodeResponse(DefaultResponse):
     data: BusRoute
+
+
+class StationCluster(BaseModel):
+    location: Location
+    count: int
+    ars_id: int | None = None
+    station_name: str | None = None
+
+
+class StationClusters(BaseModel):
+    zoom: int
+    clusters: list[StationCluster]
+
+
+class BusStationClusterResponse(DefaultResponse):
+    data: StationClusters
+
+
+class FuzzyStation(BaseModel):
+    station_name: str
+    distance: int
+    stations: list[BusStationLocation]
+
+
+class FuzzyStationSearchResponse(DefaultResponse):
+    data: list[FuzzyStation]
+
+
+class Autocomplete(BaseModel):
+    station_names: list[str]
+    route_names: list[str]
+
+
+class AutocompleteResponse(DefaultResponse):
+    data: Autocomplete
@@ -11,6 +11,16 @@ class DefaultResponse(ResponseSchemaABC):
     message: str
 
 
+class PageResponse(DefaultResponse):
+    """
+    keyset pagination 응답을 위한 스키마
+
+    다음 페이지가 있으면 next_cursor를 cursor로 사용하여 다음 페이지를 조회한다
+    """
+
+    next_cursor: str | None = None
+
+
 class ErrorMessage(BaseModel):
     message: str
     code: str
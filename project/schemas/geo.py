@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+
+from schemas import DefaultResponse
+from schemas.bus import Location
+
+
+class District(BaseModel):
+    sig_code: int
+    sido: str
+    sig_kor_name: str
+    sig_eng_name: str
+
+
+class DistrictResponse(DefaultResponse):
+    data: District | None
+
+
+class DistrictBatchRequest(BaseModel):
+    locations: list[Location] = Field(..., min_length=1, max_length=1000)
+
+
+class DistrictBatchResponse(DefaultResponse):
+    data: list[District | None]
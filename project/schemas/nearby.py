@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+
+from core.config import settings
+from schemas.bus import BusStationLocation
+
+
+class NearbyPosition(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    radius: int = Field(
+        settings.nearby_default_radius, ge=1, le=settings.nearby_max_radius
+    )
+
+
+class NearbyDelta(BaseModel):
+    type: str = "delta"
+    # 반경에 새로 들어온 정류장
+    entered: list[BusStationLocation]
+    # 반경을 벗어난 정류장의 ARS ID
+    left: list[int]
+
+
+class NearbyError(BaseModel):
+    type: str = "error"
+    message: str | list
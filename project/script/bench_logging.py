@@ -0,0 +1,145 @@
+"""
+logging 설정에 따른 event loop blocking 시간을 측정한다
+
+uvicorn access log와 같은 형식의 log를 event loop에서 기록하면서
+  - log 호출이 event loop를 점유한 시간(blocking time)
+  - event loop 지연(loop lag: 1ms sleep이 실제로 얼마나 늦게 깨어나는지)
+를 동기(sync) 방식, LOG_ASYNC(BatchingSink) 방식, LOG_ASYNC + access log sampling 방식에 대해 비교한다
+
+$ export PYTHONPATH=${PWD}/project
+$ python project/script/bench_logging.py --records 50000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from core import logging as core_logging
+from core.config import settings
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def monitor_loop_lag(lags: list[float], stop: asyncio.Event) -> None:
+    """
+    1ms sleep이 예정보다 얼마나 늦게 깨어나는지 기록한다
+
+    :param lags: 지연 시간(초)을 기록할 list
+    :param stop: 측정 종료 event
+    :return:
+    """
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def produce(records: int, burst: int) -> list[float]:
+    """
+    burst 개씩 access log를 기록하고, 각 burst가 event loop를 점유한 시간을 반환한다
+
+    :param records: 기록할 log 개수
+    :param burst: 한 번에 기록할 log 개수
+    :return:
+    """
+
+    access_logger = logging.getLogger("uvicorn.access")
+    blocking = []
+
+    for i in range(0, records, burst):
+        start = time.perf_counter()
+        for j in range(i, min(i + burst, records)):
+            access_logger.info(
+                '%s - "%s %s HTTP/%s" %d',
+                "127.0.0.1:50000",
+                "GET",
+                f"/v1/station/location?lat=37.5&lon=127.0&i={j}",
+                "1.1",
+                200,
+            )
+        blocking.append(time.perf_counter() - start)
+
+        # 다른 coroutine(요청 처리)이 실행될 수 있도록 양보한다
+        await asyncio.sleep(0)
+
+    return blocking
+
+
+async def run(records: int, burst: int) -> dict:
+    core_logging.configure_logger()
+
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lags, stop))
+
+    start = time.perf_counter()
+    blocking = await produce(records, burst)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+
+    # 비동기 모드에서 남아있는 log를 모두 기록한다
+    if core_logging._batching_sink:
+        core_logging._batching_sink.stop()
+
+    return {
+        "elapsed_s": elapsed,
+        "blocking_total_ms": sum(blocking) * 1000,
+        "blocking_per_record_us": sum(blocking) / records * 1_000_000,
+        "blocking_p99_ms": percentile(blocking, 0.99) * 1000,
+        "loop_lag_mean_ms": (statistics.mean(lags) if lags else 0) * 1000,
+        "loop_lag_max_ms": (max(lags) if lags else 0) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="logging benchmark")
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--json", action="store_true", help="JSON 형식으로 기록한다")
+    parser.add_argument(
+        "--sample-rate", type=float, default=0.1, help="sampled 모드의 access log 기록 비율"
+    )
+    args = parser.parse_args()
+
+    stdout = sys.stdout
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, "w") as devnull:
+        # log 파일은 임시 디렉터리에, stdout은 /dev/null에 기록한다
+        os.chdir(tmp_dir)
+        sys.stdout = devnull
+
+        settings.log_json = args.json
+        for mode in ("sync", "async", "sampled"):
+            settings.log_async = mode != "sync"
+            settings.log_access_sample_rate = (
+                args.sample_rate if mode == "sampled" else 1
+            )
+            results[mode] = asyncio.run(run(args.records, args.burst))
+
+        sys.stdout = stdout
+
+    print(
+        f"records: {args.records}, burst: {args.burst}, json: {args.json}, "
+        f"sample rate: {args.sample_rate}"
+    )
+    print(f"{'metric':<26}" + "".join(f"{mode:>12}" for mode in results))
+    for metric in results["sync"]:
+        print(
+            f"{metric:<26}"
+            + "".join(f"{result[metric]:>12.3f}" for result in results.values())
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+API에서 사용하는 조회 query(BusDAL)의 실행 계획(EXPLAIN)을 확인하여, index를 사용하지 않는 query가 있으면 실패한다
+
+확인하는 query는 worker warmup과 같은 query와 parameter(app/warmup.py의 query_shapes)이며, 다음의 경우 실패로 판단한다
+  - table 전체를 읽는(type=ALL) table이 있다. derived table(<derived2> 등)은 확인하지 않는다
+  - 정렬 key와 같은 순서의 index로 페이지를 찾는 query(INDEX_ORDERED)의 페이지 query(DERIVED)에서 filesort 한다
+정류장명/노선명 검색(LIKE '%...%')은 index 전체를 읽으므로(type=index) full scan으로 판단하지 않는다
+
+실행 계획은 table의 통계에 따라 달라지므로, 데이터가 load 된 Database에서 실행한다
+model의 index나 BusDAL의 query를 변경하면 migration과 함께 이 script를 실행하여 확인한다
+
+$ export PYTHONPATH=${PWD}/project
+$ ENV=local python project/script/explain_check.py
+$ ENV=local python project/script/explain_check.py --verbose
+
+같은 확인을 pytest(project/tests/test_explain.py)로도 실행한다. Database에 연결할 수 없으면 건너뛴다
+$ ENV=local pytest project/tests/test_explain.py
+"""
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy.dialects import mysql
+
+import crud
+import store
+from app.warmup import query_shapes, sample_parameters
+from connection.database import engine
+from helpers.explain import check_plan, format_plan
+
+
+class _EmptyResult:
+    def all(self) -> list:
+        return []
+
+
+class CaptureBusDAL(crud.BusDAL):
+    """
+    조회 query를 실행하지 않고 SQL로 변환하여 저장하는 BusDAL
+    """
+
+    def __init__(self) -> None:
+        super().__init__(session=None)
+        self.statements: list[str] = []
+
+    async def _execute(self, q, timeout: float, grace: float = 0.5):
+        # LIKE의 %를 escape 하지 않도록 named paramstyle로 변환한다
+        dialect = mysql.dialect(paramstyle="named")
+        self.statements.append(
+            str(q.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        )
+        return _EmptyResult()
+
+
+async def capture_queries() -> dict[str, list[str]]:
+    """
+    warmup과 같은 query와 parameter로 조회 query의 SQL을 만든다
+
+    :return: {BusDAL method 이름: SQL 목록}
+    """
+
+    queries = {}
+    for name, (args, kwargs) in query_shapes(sample_parameters()).items():
+        dal = CaptureBusDAL()
+        await getattr(dal, name)(*args, **kwargs)
+        queries[name] = dal.statements
+
+    return queries
+
+
+async def explain(connection, sql: str) -> list[dict]:
+    """
+    query의 실행 계획
+
+    :param connection: Database connection
+    :param sql: 조회 query
+    :return: EXPLAIN 결과
+    """
+
+    result = await connection.exec_driver_sql(f"EXPLAIN {sql}")
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def main(verbose: bool) -> int:
+    # sample_parameters()는 snapshot, 시/구 데이터에서 parameter를 고른다
+    store.preload()
+
+    queries = await capture_queries()
+
+    failed = 0
+    async with engine.connect() as connection:
+        for name, statements in queries.items():
+            for sql in statements:
+                plan = await explain(connection, sql)
+                problems = check_plan(name, plan)
+
+                print(f"[{'FAIL' if problems else 'ok'}] {name}")
+                for problem in problems:
+                    print(f"    - {problem}")
+                if problems or verbose:
+                    print(format_plan(plan))
+                    if verbose:
+                        print(f"    {sql}")
+
+                failed += bool(problems)
+
+    await engine.dispose()
+
+    print(f"{len(queries)} queries checked, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="BusDAL query plan check")
+    parser.add_argument(
+        "--verbose", action="store_true", help="모든 query의 실행 계획과 SQL을 출력한다"
+    )
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.verbose)))
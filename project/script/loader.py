@@ -1,15 +1,38 @@
+import argparse
 import asyncio
+import datetime
+import hashlib
 import pathlib
 import time
 
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import crud
-from connection.database import async_session
+from connection.database import async_session, create_load_data_engine
+from core.config import settings
+from helpers import geohash, load_cache, tile, transform
+from helpers.distance import haversine
+from store.snapshot import read_current_version, write_snapshot
 
 BASE_DIR = pathlib.Path(__file__).parent.parent
+# loader가 만드는 데이터(table, column, 계산 방식)가 바뀌면 올린다
+# 원본 데이터 hash 값에 포함되므로, 원본 데이터가 같아도 다음 실행에서 다시 load 하고 load cache도 다시 만든다
+LOADER_OUTPUT_VERSION = 2
+SNAPSHOT_DIR = pathlib.Path(settings.snapshot_dir)
+# 원본 데이터를 검증, 변환한 DataFrame을 저장하는 디렉터리
+LOAD_CACHE_DIR = BASE_DIR / "data" / "cache"
+LOAD_CACHE_FRAMES = (
+    "hang_jeong_gu",
+    "station",
+    "route",
+    "route_district",
+    "route_summary",
+    "station_cluster",
+)
 
 
 async def process_route_table(loader_dal: crud.LoaderDAL, df: pd.DataFrame) -> None:
@@ -27,6 +50,40 @@ async def process_route_table(loader_dal: crud.LoaderDAL, df: pd.DataFrame) -> N
     await loader_dal.bulk_insert_route(df)
 
 
+async def process_route_district_table(
+    loader_dal: crud.LoaderDAL, district_df: pd.DataFrame
+) -> None:
+    """
+    bus_route_district 테이블 데이터를 삭제하고 다시 추가한다
+
+    :param loader_dal:
+    :param district_df: 시/구별 버스 노선 DataFrame
+    :return:
+    """
+
+    # 저장되어 있는 데이터를 삭제한다
+    await loader_dal.delete_route_district()
+    # 시/구별 버스 노선 데이터를 삽입한다
+    await loader_dal.bulk_insert_route_district(district_df)
+
+
+async def process_route_summary_table(
+    loader_dal: crud.LoaderDAL, summary_df: pd.DataFrame
+) -> None:
+    """
+    bus_route_summary 테이블 데이터를 삭제하고 다시 추가한다
+
+    :param loader_dal:
+    :param summary_df: 노선별 요약 정보 DataFrame
+    :return:
+    """
+
+    # 저장되어 있는 데이터를 삭제한다
+    await loader_dal.delete_route_summary()
+    # 노선별 요약 정보를 삽입한다
+    await loader_dal.bulk_insert_route_summary(summary_df)
+
+
 async def process_station_table(loader_dal: crud.LoaderDAL, df: pd.DataFrame) -> None:
     """
     bus_station 테이블 데이터를 삭제하고 다시 추가한다
@@ -42,12 +99,125 @@ async def process_station_table(loader_dal: crud.LoaderDAL, df: pd.DataFrame) ->
     await loader_dal.bulk_insert_station(df)
 
 
+async def process_station_cluster_table(
+    loader_dal: crud.LoaderDAL, cluster_df: pd.DataFrame
+) -> None:
+    """
+    bus_station_cluster 테이블 데이터를 삭제하고 다시 추가한다
+
+    :param loader_dal:
+    :param cluster_df: zoom level별 정류장 cluster DataFrame
+    :return:
+    """
+
+    # 저장되어 있는 데이터를 삭제한다
+    await loader_dal.delete_station_cluster()
+    # 정류장 cluster 데이터를 삽입한다
+    await loader_dal.bulk_insert_station_cluster(cluster_df)
+
+
+def build_route_district_df(route_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    시/구별로 해당 시/구를 지나가는 노선과 시/구에 포함되는 노선의 정류장 수를 계산한다
+
+    :param route_df: sig_code가 계산된 bus route DataFrame
+    :return:
+    """
+
+    district_df = (
+        route_df[route_df["sig_code"].notna()]
+        .groupby(["sig_code", "route_id", "route_name"], sort=False)
+        .size()
+        .rename("stop_count")
+        .reset_index()
+    )
+    district_df["sig_code"] = district_df["sig_code"].astype(int)
+
+    return district_df
+
+
+def build_route_summary_df(route_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    노선별 정류장 수, 기점/종점 정류장, 노선 길이, 영역(bounding box)을 계산한다
+
+    노선 검색 API가 노선 목록과 함께 반환하므로, client가 노선마다 노선 정보를 다시 조회하지 않는다
+    노선 길이는 노선 순번으로 이어지는 정류장 사이의 직선 거리(haversine) 합계이며, 모든 구간을 한 번에 계산한다
+
+    :param route_df: bus route DataFrame
+    :return:
+    """
+
+    stops = route_df.sort_values(["route_id", "route_order"], kind="stable")
+    route_id = stops["route_id"].to_numpy()
+    latitude = stops["latitude"].to_numpy(dtype=np.float64)
+    longitude = stops["longitude"].to_numpy(dtype=np.float64)
+
+    # 같은 노선의 연속된 정류장 구간만 더한다(노선이 바뀌는 구간은 제외)
+    segment = haversine(latitude[:-1], longitude[:-1], latitude[1:], longitude[1:])
+    same_route = route_id[1:] == route_id[:-1]
+    length = (
+        pd.Series(segment[same_route], index=route_id[1:][same_route])
+        .groupby(level=0)
+        .sum()
+    )
+
+    grouped = stops.groupby("route_id", sort=True)
+    summary_df = grouped.agg(
+        route_name=("route_name", "first"),
+        stop_count=("route_order", "size"),
+        first_ars_id=("ars_id", "first"),
+        first_station_name=("station_name", "first"),
+        last_ars_id=("ars_id", "last"),
+        last_station_name=("station_name", "last"),
+        min_latitude=("latitude", "min"),
+        min_longitude=("longitude", "min"),
+        max_latitude=("latitude", "max"),
+        max_longitude=("longitude", "max"),
+    )
+    # 정류장이 하나인 노선의 길이는 0 이다
+    summary_df["length"] = length.reindex(summary_df.index, fill_value=0.0)
+
+    return summary_df.reset_index()
+
+
+def build_station_cluster_df(
+    station_df: pd.DataFrame, route_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    bus_station의 정류장과 bus_route의 정류장을 합쳐 zoom level별 cluster를 계산한다
+
+    :param station_df:
+    :param route_df:
+    :return:
+    """
+
+    columns = ["ars_id", "station_name", "latitude", "longitude"]
+    stops = pd.concat(
+        [
+            station_df.rename(
+                columns={"mobile_id": "ars_id", "node_name": "station_name"}
+            )[columns],
+            route_df[columns],
+        ],
+        ignore_index=True,
+    )
+    # ARS ID를 기준으로 중복된 정류장을 제거한다. ARS ID가 없는 정류장은 모두 남긴다
+    has_ars_id = stops["ars_id"].notna()
+    stops = pd.concat(
+        [stops[has_ars_id].drop_duplicates(subset=["ars_id"]), stops[~has_ars_id]],
+        ignore_index=True,
+    )
+
+    return tile.build_cluster_pyramid(stops)
+
+
 async def process_hang_jeong_gu_table(
     address_dal: crud.AddressDAL, gdf: gpd.GeoDataFrame
 ) -> None:
     """
     hang_jeong_gu 테이블에 데이터를 삭제하고 다시 추가한다
-    여기서는 모든 지역을 추가하지 않고 '서울' 지역의 시/구 데이터만 넣어서 확인한다
+    geojson 파일에 포함된 모든 시/도의 시/구 데이터를 추가한다
+    정류장이 포함되는 시/구는 load 할 때 미리 계산하므로, 지역이 늘어나도 API의 조회 비용은 늘어나지 않는다
 
     :param address_dal:
     :param gdf:
@@ -60,24 +230,154 @@ async def process_hang_jeong_gu_table(
     await address_dal.bulk_insert_hang_jeong_gu(gdf)
 
 
-async def main():
-    # 시/구 데이터를 불러온다
-    gdf = gpd.read_file(f"{BASE_DIR}/data/geo/hang_jeong_gu.geojson")
-    # 버스 정류소 데이터를 불러온다
-    station_df = pd.read_csv(f"{BASE_DIR}/data/bus/bus_station.csv", encoding="utf-8")
-    # 버스 경로 데이터를 불러온다
-    route_df = pd.read_csv(f"{BASE_DIR}/data/bus/bus_route.csv", encoding="utf-8")
+def locate_sig_code(df: pd.DataFrame, gdf: gpd.GeoDataFrame) -> pd.Series:
+    """
+    정류장 위치가 포함되는 시/구 코드(sig_code)를 계산한다
+
+    API에서 요청마다 ST_Within으로 정류장과 시/구 polygon을 join 하지 않도록 load 할 때 미리 계산한다
+    시/구에 포함되지 않는 정류장의 sig_code는 NaN 이다
+
+    :param df: 정류장 위치(latitude, longitude)를 가지고 있는 DataFrame
+    :param gdf: 시/구 GeoDataFrame
+    :return:
+    """
+
+    # Database와 같이 POINT(위도 경도) 순서로 좌표를 저장한다
+    points = gpd.GeoDataFrame(
+        geometry=gpd.points_from_xy(df["latitude"], df["longitude"]),
+        index=df.index,
+        crs=gdf.crs,
+    )
+    joined = gpd.sjoin(
+        points, gdf[["sig_code", "geometry"]], how="left", predicate="within"
+    )
+
+    # 시/구 경계가 겹치는 경우에는 처음 찾은 시/구를 사용한다
+    return joined[~joined.index.duplicated()]["sig_code"]
+
+
+def report_rejected(name: str, rejected: pd.DataFrame, swapped: int) -> None:
+    """
+    transform 단계에서 제외된 행의 사유별 개수를 기록하고, 제외된 행을 파일로 저장한다
+
+    :param name: 데이터 이름(bus_route, bus_station)
+    :param rejected: 제외된 행과 사유(reject_reason)
+    :param swapped: 위도/경도를 바로잡은 행 수
+    :return:
+    """
+
+    if swapped:
+        logger.warning(f"{name}: {swapped} rows with swapped latitude/longitude fixed")
+
+    if rejected.empty:
+        return
+
+    counts = rejected["reject_reason"].value_counts().to_dict()
+    logger.warning(f"{name}: {len(rejected)} rows rejected. {counts}")
+
+    path = BASE_DIR / "data" / "reject" / f"{name}.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rejected.to_csv(path, index=False, encoding="utf-8")
+    logger.warning(f"{name}: rejected rows are written to {path}")
+
+
+def hash_files(*paths: str, version: int = LOADER_OUTPUT_VERSION) -> str:
+    """
+    원본 데이터 파일들의 내용과 loader 출력 버전으로 hash 값을 계산한다
+
+    :param paths: 원본 데이터 파일 경로
+    :param version: loader 출력 버전
+    :return:
+    """
+
+    digest = hashlib.sha256(f"loader-v{version}".encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+async def load_with_insert(
+    gdf: gpd.GeoDataFrame,
+    station_df: pd.DataFrame,
+    route_df: pd.DataFrame,
+    district_df: pd.DataFrame,
+    summary_df: pd.DataFrame,
+    cluster_df: pd.DataFrame,
+    dataset: dict,
+) -> None:
+    """
+    insert(executemany)로 모든 table 데이터를 하나의 transaction에서 교체한다
+
+    :param dataset: 데이터 버전 정보(version, content_hash, loaded_at)
+    :return:
+    """
 
     # Database Session
     session = async_session()
 
     loader_dal = crud.LoaderDAL(session)
     address_dal = crud.AddressDAL(session)
+    dataset_dal = crud.DatasetDAL(session)
 
     try:
         await process_hang_jeong_gu_table(address_dal, gdf)
         await process_station_table(loader_dal, station_df)
         await process_route_table(loader_dal, route_df)
+        await process_route_district_table(loader_dal, district_df)
+        await process_route_summary_table(loader_dal, summary_df)
+        await process_station_cluster_table(loader_dal, cluster_df)
+
+        # 데이터와 함께 데이터 버전을 기록한다
+        await dataset_dal.insert_dataset_version(**dataset)
+
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+
+        raise Exception(e)
+    finally:
+        await session.close()
+
+
+async def load_with_load_data(
+    gdf: gpd.GeoDataFrame,
+    station_df: pd.DataFrame,
+    route_df: pd.DataFrame,
+    district_df: pd.DataFrame,
+    summary_df: pd.DataFrame,
+    cluster_df: pd.DataFrame,
+    dataset: dict,
+) -> None:
+    """
+    LOAD DATA LOCAL INFILE로 모든 table 데이터를 교체한다
+
+    staging table에 load 한 뒤 한 번에 교체(RENAME TABLE)하므로, insert 방식과 같이 API는 load 중인 데이터를 보지 않는다
+    Database 서버의 local_infile 설정이 켜져 있어야 한다
+
+    :param dataset: 데이터 버전 정보(version, content_hash, loaded_at)
+    :return:
+    """
+
+    engine = create_load_data_engine()
+    session = AsyncSession(bind=engine, expire_on_commit=False)
+
+    load_data_dal = crud.LoadDataDAL(session)
+    dataset_dal = crud.DatasetDAL(session)
+
+    try:
+        await load_data_dal.stage_hang_jeong_gu(gdf)
+        await load_data_dal.stage_station(station_df)
+        await load_data_dal.stage_route(route_df)
+        await load_data_dal.stage_route_district(district_df)
+        await load_data_dal.stage_route_summary(summary_df)
+        await load_data_dal.stage_station_cluster(cluster_df)
+        await load_data_dal.swap()
+
+        # 데이터를 교체한 뒤 데이터 버전을 기록한다
+        await dataset_dal.insert_dataset_version(**dataset)
 
         await session.commit()
     except Exception as e:
@@ -86,11 +386,131 @@ async def main():
         raise Exception(e)
     finally:
         await session.close()
+        await engine.dispose()
+
+
+def prepare_frames(geo_path: str, station_path: str, route_path: str) -> dict:
+    """
+    원본 데이터를 읽고 검증, 변환하여 load 할 DataFrame들을 만든다
+
+    :param geo_path: 시/구 geojson 파일 경로
+    :param station_path: 버스 정류소 파일 경로
+    :param route_path: 버스 경로 파일 경로
+    :return: {이름: DataFrame}(LOAD_CACHE_FRAMES)
+    """
+
+    # 시/구 데이터를 불러온다
+    gdf = gpd.read_file(geo_path)
+    # 버스 정류소 데이터를 불러온다
+    station_df = transform.read_station_csv(station_path)
+    # 버스 경로 데이터를 불러온다
+    route_df = transform.read_route_csv(route_path)
+
+    # 데이터를 검증하고 load 할 수 있는 형태(좌표 WKT 등)로 변환한다
+    station_df, rejected, swapped = transform.transform_station(station_df)
+    report_rejected("bus_station", rejected, swapped)
+    route_df, rejected, swapped = transform.transform_route(route_df)
+    report_rejected("bus_route", rejected, swapped)
+
+    # 정류장 위치의 geohash를 계산한다
+    for df in (station_df, route_df):
+        df["geohash"] = geohash.encode(
+            df["latitude"].to_numpy(), df["longitude"].to_numpy()
+        )
+
+    # 노선 정류장이 포함되는 시/구를 계산한다
+    route_df["sig_code"] = locate_sig_code(route_df, gdf)
+
+    return {
+        "hang_jeong_gu": gdf,
+        "station": station_df,
+        "route": route_df,
+        "route_district": build_route_district_df(route_df),
+        "route_summary": build_route_summary_df(route_df),
+        "station_cluster": build_station_cluster_df(station_df, route_df),
+    }
+
+
+async def get_loaded_content_hash() -> str | None:
+    """
+    마지막으로 load 된 원본 데이터의 hash 값을 조회한다
+
+    :return: load 된 데이터가 없으면 None
+    """
+
+    async with async_session() as session:
+        dataset = await crud.DatasetDAL(session).get_latest_dataset_version()
+
+    return dataset.content_hash if dataset else None
+
+
+async def main(backend: str = "insert", force: bool = False):
+    geo_path = f"{BASE_DIR}/data/geo/hang_jeong_gu.geojson"
+    station_path = f"{BASE_DIR}/data/bus/bus_station.csv"
+    route_path = f"{BASE_DIR}/data/bus/bus_route.csv"
+
+    # 데이터 버전은 원본 데이터의 hash 값과 load 시간으로 만든다
+    content_hash = hash_files(geo_path, station_path, route_path)
+    loaded_at = datetime.datetime.now()
+    version = f"{content_hash[:16]}-{loaded_at:%Y%m%d%H%M%S}"
+
+    # 원본 데이터가 마지막으로 load 된 데이터와 같으면 Database를 변경하지 않는다
+    unchanged = not force and await get_loaded_content_hash() == content_hash
+    if unchanged and read_current_version(SNAPSHOT_DIR):
+        logger.info(f"source data is unchanged. skip load. hash: {content_hash}")
+        return
+
+    # 같은 원본 데이터를 변환한 결과가 cache에 있으면 원본 데이터를 다시 읽지 않는다
+    frames = load_cache.read_load_cache(LOAD_CACHE_DIR, content_hash, LOAD_CACHE_FRAMES)
+    if frames is None:
+        frames = prepare_frames(geo_path, station_path, route_path)
+        path = load_cache.write_load_cache(LOAD_CACHE_DIR, content_hash, frames)
+        logger.info(f"load cache written. path: {path}")
+    else:
+        logger.info(f"load cache hit. hash: {content_hash}")
+
+    gdf, station_df, route_df, district_df, summary_df, cluster_df = (
+        frames[name] for name in LOAD_CACHE_FRAMES
+    )
+
+    if unchanged:
+        # Database는 최신이고 snapshot만 없는 경우(새로운 서버 등)에는 snapshot만 생성한다
+        snapshot_version = write_snapshot(station_df, route_df)
+        logger.info(f"snapshot written. snapshot: {snapshot_version}")
+        return
+
+    dataset = {"version": version, "content_hash": content_hash, "loaded_at": loaded_at}
+    if backend == "load-data":
+        await load_with_load_data(
+            gdf, station_df, route_df, district_df, summary_df, cluster_df, dataset
+        )
+    else:
+        await load_with_insert(
+            gdf, station_df, route_df, district_df, summary_df, cluster_df, dataset
+        )
+
+    # load가 완료된 데이터로 API 서버에서 사용할 snapshot을 생성한다
+    snapshot_version = write_snapshot(station_df, route_df)
+    logger.info(f"data loaded. version: {version}, snapshot: {snapshot_version}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bus data loader")
+    parser.add_argument(
+        "--backend",
+        choices=("insert", "load-data"),
+        default="insert",
+        help="insert: executemany, load-data: LOAD DATA LOCAL INFILE(대용량 전체 load)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="원본 데이터가 마지막으로 load 된 데이터와 같아도 다시 load 한다",
+    )
+    args = parser.parse_args()
+
     start_time = time.time()
-    logger.info("data load start...")
-    asyncio.run(main())
+    logger.info(f"data load start... backend: {args.backend}")
+    asyncio.run(main(args.backend, args.force))
     end_time = time.time()
     logger.info(f"data load complete. Elapsed Time is {end_time - start_time} seconds.")
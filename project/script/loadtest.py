@@ -0,0 +1,490 @@
+"""
+실행 중인 API 서버에 실제 트래픽과 비슷한 요청을 보내 처리량과 응답 시간을 측정한다
+
+요청 구성(mix)
+  - station_location: /v1/station/location. 정류장 분포 범위 안의 임의 위치, extend on/off
+  - station_search: /v1/station/search. 정류장명의 앞부분(검색어 길이 분포)
+  - route_search: /v1/route/search. 노선이 많이 지나가는 목적지
+  - route_name_search: /v2/route/search. 노선이 많이 지나가는 목적지
+  - route_node_search: /v2/route/node/search. 정류장이 많은 노선
+목적지, 노선명, 위치 범위는 버스 경로 파일(data/bus/bus_route.csv)에서 만든다
+
+측정 결과
+  - endpoint별 처리량(req/s), p50/p95/p99 응답 시간, error 비율(status code별 개수)
+  - connection pool 포화도(/health/pool): worker(pid)별 최대 사용 connection 수,
+    pool_size를 넘어 overflow를 사용한 비율, pool_size + max_overflow를 모두 사용한 비율
+
+부하 방식
+  - 기본(closed loop): concurrency 개의 client가 응답을 받는 즉시 다음 요청을 보낸다
+  - --rate(open loop): 초당 rate 개의 요청을 일정한 간격(Poisson)으로 보낸다.
+    진행 중인 요청이 concurrency 개에 도달하면 요청을 보내지 않고 dropped로 기록한다
+
+$ export PYTHONPATH=${PWD}/project
+$ python project/script/loadtest.py --base-url http://127.0.0.1:8000 --duration 60 --concurrency 100
+$ python project/script/loadtest.py --rate 500 --mix station_location:6,station_search:2,route_search:2
+"""
+import argparse
+import asyncio
+import collections
+import json
+import pathlib
+import random
+import time
+
+import httpx
+import pandas as pd
+
+BASE_DIR = pathlib.Path(__file__).parent.parent
+
+DEFAULT_MIX = (
+    "station_location:40,station_search:25,route_search:15,"
+    "route_name_search:10,route_node_search:10"
+)
+# 검색어 길이(글자 수):가중치
+DEFAULT_QUERY_LENGTHS = "1:1,2:4,3:3,4:2,6:1"
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def parse_weights(text: str) -> dict[str, float]:
+    """
+    'name:weight,name:weight' 형식의 문자열을 dict로 변환한다
+
+    :param text: 문자열
+    :return:
+    """
+
+    weights = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition(":")
+        weights[name] = float(weight or 1)
+
+    return weights
+
+
+class Workload:
+    """
+    버스 경로 파일로 요청 parameter(위치 범위, 검색어, 목적지, 노선명)를 만든다
+    """
+
+    ENDPOINTS = (
+        "station_location",
+        "station_search",
+        "route_search",
+        "route_name_search",
+        "route_node_search",
+    )
+
+    def __init__(
+        self,
+        route_path: pathlib.Path,
+        mix: dict[str, float],
+        query_lengths: dict[str, float],
+        extend_ratio: float,
+        top: int,
+        seed: int | None,
+    ) -> None:
+        unknown = set(mix) - set(self.ENDPOINTS)
+        if unknown:
+            raise ValueError(f"unknown endpoints in mix: {sorted(unknown)}")
+
+        self.random = random.Random(seed)
+        self.endpoints = list(mix)
+        self.endpoint_weights = list(mix.values())
+        self.query_lengths = [int(length) for length in query_lengths]
+        self.query_length_weights = list(query_lengths.values())
+        self.extend_ratio = extend_ratio
+
+        df = pd.read_csv(route_path, encoding="utf-8", dtype={"route_name": str})
+        df = df.dropna(subset=["station_name", "route_name", "latitude", "longitude"])
+
+        # 위치 범위는 정류장 분포의 1% ~ 99% 범위로 한다(좌표 이상치 제외)
+        self.latitude_range = tuple(df["latitude"].quantile([0.01, 0.99]))
+        self.longitude_range = tuple(df["longitude"].quantile([0.01, 0.99]))
+
+        # 목적지: 지나가는 노선이 많은 정류장과 그 위치
+        destinations = (
+            df.groupby("station_name")
+            .agg(
+                count=("route_id", "nunique"),
+                latitude=("latitude", "first"),
+                longitude=("longitude", "first"),
+            )
+            .sort_values("count", ascending=False)
+            .head(top)
+        )
+        self.destinations = list(
+            destinations[["latitude", "longitude"]].itertuples(name=None)
+        )
+        self.destination_weights = destinations["count"].tolist()
+
+        # 노선: 정류장이 많은 노선과 노선의 첫 번째 정류장 위치
+        routes = (
+            df.groupby("route_name")
+            .agg(
+                count=("route_order", "size"),
+                latitude=("latitude", "first"),
+                longitude=("longitude", "first"),
+            )
+            .sort_values("count", ascending=False)
+            .head(top)
+        )
+        self.routes = list(routes[["latitude", "longitude"]].itertuples(name=None))
+        self.route_weights = routes["count"].tolist()
+
+        # 검색어: 정류장명(노선 수로 가중치)
+        names = df["station_name"].value_counts()
+        self.station_names = names.index.tolist()
+        self.station_name_weights = names.tolist()
+
+    def _location(self) -> tuple[float, float]:
+        return (
+            round(self.random.uniform(*self.latitude_range), 6),
+            round(self.random.uniform(*self.longitude_range), 6),
+        )
+
+    def next_request(self) -> tuple[str, str, dict]:
+        """
+        mix 비율에 따라 다음 요청을 만든다
+
+        :return: (endpoint 이름, path, query parameter)
+        """
+
+        endpoint = self.random.choices(self.endpoints, self.endpoint_weights)[0]
+
+        if endpoint == "station_location":
+            latitude, longitude = self._location()
+            params = {"lat": latitude, "lon": longitude}
+            if self.random.random() < self.extend_ratio:
+                params["extend"] = "true"
+            return endpoint, "/v1/station/location", params
+
+        if endpoint == "station_search":
+            name = self.random.choices(self.station_names, self.station_name_weights)[0]
+            [length] = self.random.choices(
+                self.query_lengths, self.query_length_weights
+            )
+            return endpoint, "/v1/station/search", {"query": name[:length]}
+
+        if endpoint in ("route_search", "route_name_search"):
+            # 목적지 근처의 사용자가 검색하는 것으로 보고, 목적지 위치의 시/구에서 검색한다
+            dest, latitude, longitude = self.random.choices(
+                self.destinations, self.destination_weights
+            )[0]
+            path = (
+                "/v1/route/search" if endpoint == "route_search" else "/v2/route/search"
+            )
+            return endpoint, path, {"dest": dest, "lat": latitude, "lon": longitude}
+
+        route_name, latitude, longitude = self.random.choices(
+            self.routes, self.route_weights
+        )[0]
+        return (
+            endpoint,
+            "/v2/route/node/search",
+            {"node": route_name, "lat": latitude, "lon": longitude},
+        )
+
+
+class Stats:
+    """
+    endpoint별 응답 시간과 status code를 기록한다
+    """
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = collections.defaultdict(list)
+        self.statuses: dict[str, collections.Counter] = collections.defaultdict(
+            collections.Counter
+        )
+        self.dropped = 0
+        self.recording = False
+
+    def record(self, endpoint: str, status: str, latency: float) -> None:
+        # warmup 중의 요청은 기록하지 않는다
+        if not self.recording:
+            return
+        self.latencies[endpoint].append(latency)
+        self.statuses[endpoint][status] += 1
+
+
+async def send(
+    client: httpx.AsyncClient, workload: Workload, stats: Stats, timeout: float
+) -> None:
+    endpoint, path, params = workload.next_request()
+    start = time.perf_counter()
+    try:
+        response = await client.get(path, params=params, timeout=timeout)
+        await response.aread()
+        status = str(response.status_code)
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+
+    stats.record(endpoint, status, time.perf_counter() - start)
+
+
+async def closed_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    stats: Stats,
+    concurrency: int,
+    deadline: float,
+    timeout: float,
+) -> None:
+    async def user():
+        while time.perf_counter() < deadline:
+            await send(client, workload, stats, timeout)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def open_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    stats: Stats,
+    rate: float,
+    concurrency: int,
+    deadline: float,
+    timeout: float,
+) -> None:
+    tasks = set()
+    next_at = time.perf_counter()
+
+    while next_at < deadline:
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        next_at += workload.random.expovariate(rate)
+
+        if len(tasks) >= concurrency:
+            if stats.recording:
+                stats.dropped += 1
+            continue
+
+        task = asyncio.create_task(send(client, workload, stats, timeout))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.wait(tasks)
+
+
+async def monitor_pool(
+    base_url: str, samples: list[dict], stop: asyncio.Event, interval: float
+) -> None:
+    """
+    /health/pool을 주기적으로 조회하여 worker별 connection pool 사용 현황을 기록한다
+
+    요청마다 다른 worker가 처리할 수 있으므로 worker(pid)별로 모은다
+
+    :param base_url: API 서버 주소
+    :param samples: 조회 결과를 기록할 list
+    :param stop: 측정 종료 event
+    :param interval: 조회 주기(초)
+    :return:
+    """
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=interval * 4) as client:
+        while not stop.is_set():
+            try:
+                response = await client.get("/health/pool")
+                if response.status_code == 200:
+                    samples.append(response.json()["message"])
+            except httpx.HTTPError:
+                pass
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def summarize(stats: Stats, pool_samples: list[dict], elapsed: float) -> dict:
+    """
+    측정 결과를 요약한다
+
+    :param stats: endpoint별 응답 시간, status code
+    :param pool_samples: connection pool 사용 현황
+    :param elapsed: 측정 시간(초)
+    :return:
+    """
+
+    endpoints = {}
+    total, total_errors = 0, 0
+    for endpoint, latencies in sorted(stats.latencies.items()):
+        statuses = stats.statuses[endpoint]
+        # 2xx, 304(Not Modified)를 제외한 응답과 요청 실패를 error로 본다
+        errors = sum(
+            count
+            for status, count in statuses.items()
+            if not (status.startswith("2") or status == "304")
+        )
+        total += len(latencies)
+        total_errors += errors
+        endpoints[endpoint] = {
+            "requests": len(latencies),
+            "throughput": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "error_rate": errors / len(latencies),
+            "statuses": dict(statuses),
+        }
+
+    workers = {}
+    for sample in pool_samples:
+        workers.setdefault(sample["pid"], []).append(sample)
+
+    pool = {}
+    for pid, samples in sorted(workers.items()):
+        size = samples[-1]["size"]
+        limit = size + samples[-1]["max_overflow"]
+        checked_out = [s["checked_out"] for s in samples]
+        pool[pid] = {
+            "samples": len(samples),
+            "pool_size": size,
+            "max_checked_out": max(checked_out),
+            "mean_checked_out": sum(checked_out) / len(checked_out),
+            # pool_size를 넘어 overflow connection을 사용한 비율
+            "overflow_ratio": sum(c > size for c in checked_out) / len(samples),
+            # 모든 connection을 사용하여 요청이 pool_timeout 동안 대기할 수 있는 비율
+            "exhausted_ratio": sum(c >= limit for c in checked_out) / len(samples),
+        }
+
+    return {
+        "elapsed": elapsed,
+        "requests": total,
+        "throughput": total / elapsed,
+        "error_rate": total_errors / total if total else 0.0,
+        "dropped": stats.dropped,
+        "endpoints": endpoints,
+        "pool": pool,
+    }
+
+
+def print_summary(summary: dict) -> None:
+    print(
+        f"\nelapsed: {summary['elapsed']:.1f}s, requests: {summary['requests']}, "
+        f"throughput: {summary['throughput']:.1f} req/s, "
+        f"error rate: {summary['error_rate']:.2%}, dropped: {summary['dropped']}\n"
+    )
+
+    print(
+        f"{'endpoint':<20}{'req':>8}{'req/s':>10}{'p50(ms)':>10}"
+        f"{'p95(ms)':>10}{'p99(ms)':>10}{'error':>8}  statuses"
+    )
+    for endpoint, s in summary["endpoints"].items():
+        print(
+            f"{endpoint:<20}{s['requests']:>8}{s['throughput']:>10.1f}"
+            f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}"
+            f"{s['error_rate']:>8.2%}  {s['statuses']}"
+        )
+
+    if not summary["pool"]:
+        print("\nconnection pool: no samples(/health/pool)")
+        return
+
+    print(
+        f"\n{'worker(pid)':<14}{'samples':>8}{'size':>6}{'max':>6}{'mean':>8}"
+        f"{'overflow':>10}{'exhausted':>11}"
+    )
+    for pid, p in summary["pool"].items():
+        print(
+            f"{pid:<14}{p['samples']:>8}{p['pool_size']:>6}{p['max_checked_out']:>6}"
+            f"{p['mean_checked_out']:>8.1f}{p['overflow_ratio']:>10.1%}"
+            f"{p['exhausted_ratio']:>11.1%}"
+        )
+
+
+async def main(args: argparse.Namespace) -> dict:
+    workload = Workload(
+        pathlib.Path(args.route_path),
+        parse_weights(args.mix),
+        parse_weights(args.query_lengths),
+        args.extend_ratio,
+        args.top,
+        args.seed,
+    )
+    stats = Stats()
+
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits) as client:
+        start = time.perf_counter()
+        deadline = start + args.warmup + args.duration
+
+        if args.rate:
+            load = open_loop(
+                client,
+                workload,
+                stats,
+                args.rate,
+                args.concurrency,
+                deadline,
+                args.timeout,
+            )
+        else:
+            load = closed_loop(
+                client, workload, stats, args.concurrency, deadline, args.timeout
+            )
+        load_task = asyncio.create_task(load)
+
+        # warmup(connection 생성, cache 적재) 이후부터 기록한다
+        await asyncio.sleep(args.warmup)
+        stats.recording = True
+        recording_start = time.perf_counter()
+
+        pool_samples: list[dict] = []
+        stop = asyncio.Event()
+        monitor_task = asyncio.create_task(
+            monitor_pool(args.base_url, pool_samples, stop, args.pool_interval)
+        )
+
+        await load_task
+        stop.set()
+        await monitor_task
+
+        elapsed = time.perf_counter() - recording_start
+
+    return summarize(stats, pool_samples, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API load test")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=30, help="측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=5, help="측정 전 warmup 시간(초)")
+    parser.add_argument("--concurrency", type=int, default=50, help="동시에 진행하는 최대 요청 수")
+    parser.add_argument(
+        "--rate", type=float, default=None, help="초당 요청 수(open loop). 없으면 closed loop"
+    )
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help="endpoint:가중치 목록(예: station_location:4,route_search:1)",
+    )
+    parser.add_argument(
+        "--query-lengths", default=DEFAULT_QUERY_LENGTHS, help="정류장 검색어 길이:가중치 목록"
+    )
+    parser.add_argument(
+        "--extend-ratio", type=float, default=0.3, help="위치 검색에서 extend=true 비율"
+    )
+    parser.add_argument(
+        "--top", type=int, default=200, help="목적지, 노선으로 사용할 상위 정류장/노선 수"
+    )
+    parser.add_argument("--route-path", default=f"{BASE_DIR}/data/bus/bus_route.csv")
+    parser.add_argument("--timeout", type=float, default=10, help="요청 timeout(초)")
+    parser.add_argument(
+        "--pool-interval", type=float, default=0.5, help="/health/pool 조회 주기(초)"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main(args))
+    print_summary(summary)
+
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(summary, indent=2))
@@ -0,0 +1,113 @@
+"""
+서울시 버스 도착 정보 API(stationinfo/getStationByUid)와 같은 형식으로 임의의 도착 정보를 반환하는 mock server
+
+실제 API는 외부 서비스이므로, local 환경과 부하 테스트에서는 이 server를 upstream으로 사용한다
+  - 정류장(arsId)마다 고정된 노선 목록을 만들고, 도착 예정 시간은 요청 시각에 따라 줄어들다가 다시 늘어난다
+  - --latency, --error-rate, --throttle-rate로 upstream의 지연, 장애(500), 요청 제한(429)을 흉내낸다
+
+$ export PYTHONPATH=${PWD}/project
+$ python project/script/mock_bis.py --port 8100 --latency 0.2 --error-rate 0.05 --throttle-rate 0.01
+$ ARRIVAL_ENABLED=true ARRIVAL_API_URL=http://127.0.0.1:8100/api/rest/stationinfo/getStationByUid ...
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+# 정류장별 노선 수 범위와 버스 배차 간격 범위(초)
+ROUTES_PER_STATION = (1, 12)
+HEADWAY_RANGE = (300, 1200)
+
+
+def arrival_message(seconds: int) -> str:
+    if seconds < 60:
+        return "곧 도착"
+    return f"{seconds // 60}분{seconds % 60}초후[{max(1, seconds // 120)}번째 전]"
+
+
+def station_items(ars_id: str, now: float) -> list[dict]:
+    """
+    정류장의 도착 정보 목록. 같은 정류장은 항상 같은 노선, 배차 간격을 사용한다
+
+    :param ars_id: 정류장 ARS ID
+    :param now: 현재 시각(epoch)
+    :return:
+    """
+
+    rng = random.Random(ars_id)
+    items = []
+    for _ in range(rng.randint(*ROUTES_PER_STATION)):
+        route_number = rng.randint(100, 9999)
+        headway = rng.randint(*HEADWAY_RANGE)
+        phase = rng.randint(0, headway)
+        first = int(headway - (now + phase) % headway)
+        second = first + headway
+
+        items.append(
+            {
+                "arsId": ars_id,
+                "busRouteId": str(100_000_000 + route_number),
+                "rtNm": str(route_number),
+                "arrmsg1": arrival_message(first),
+                "traTime1": str(first),
+                "arrmsg2": arrival_message(second),
+                "traTime2": str(second),
+            }
+        )
+
+    return items
+
+
+def create_mock_app(latency: float, error_rate: float, throttle_rate: float) -> FastAPI:
+    app = FastAPI(title="mock BIS API")
+
+    @app.get("/api/rest/stationinfo/getStationByUid")
+    async def get_station_by_uid(ars_id: str = Query(..., alias="arsId")):
+        if latency:
+            # 지연 시간은 평균이 latency인 지수 분포를 따른다
+            await asyncio.sleep(random.expovariate(1 / latency))
+
+        r = random.random()
+        if r < throttle_rate:
+            return JSONResponse(
+                {"msgHeader": {"headerCd": "7", "headerMsg": "too many requests"}},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        if r < throttle_rate + error_rate:
+            return JSONResponse(
+                {"msgHeader": {"headerCd": "1", "headerMsg": "system error"}},
+                status_code=500,
+            )
+
+        items = station_items(ars_id, time.time())
+        return {
+            "msgHeader": {
+                "headerCd": "0" if items else "4",
+                "headerMsg": "정상적으로 처리되었습니다.",
+                "itemCount": len(items),
+            },
+            "msgBody": {"itemList": items},
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="mock BIS arrival API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.1, help="평균 응답 지연 시간(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 응답 비율")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_mock_app(args.latency, args.error_rate, args.throttle_rate),
+        host=args.host,
+        port=args.port,
+    )
@@ -0,0 +1,53 @@
+from loguru import logger
+
+from core.config import settings
+from .abstract import PreloadStoreABC
+from .arrival import ArrivalStore
+from .autocomplete import AutocompleteStore
+from .dataset import DatasetVersionStore
+from .district import DistrictStore
+from .fuzzy import FuzzyStationStore
+from .nearby import NearbyStationStore
+from .route import RouteStore
+from .snapshot import SnapshotStore
+
+snapshot_store = SnapshotStore()
+dataset_version = DatasetVersionStore()
+district = DistrictStore()
+autocomplete = AutocompleteStore()
+fuzzy_station = FuzzyStationStore()
+nearby_station = NearbyStationStore()
+route = RouteStore(district)
+arrival = ArrivalStore(
+    path=settings.arrival_shared_dir,
+    ttl=settings.arrival_ttl,
+    history_size=settings.arrival_history_size,
+    max_stations=settings.arrival_max_stations,
+)
+
+# snapshot이 (다시) load 되면 snapshot으로 만든 index를 갱신한다
+snapshot_store.subscribe(autocomplete.build)
+snapshot_store.subscribe(fuzzy_station.build)
+snapshot_store.subscribe(nearby_station.build)
+snapshot_store.subscribe(arrival.build)
+snapshot_store.subscribe(route.build)
+
+# 서버 시작 시에 미리 load 할 저장소 목록
+# 노선 index는 시/구 저장소를 사용하므로 시/구 저장소를 snapshot보다 먼저 load 한다
+preload_stores: list[PreloadStoreABC] = [district, snapshot_store]
+
+
+def preload() -> None:
+    """
+    등록된 모든 저장소를 메모리에 적재한다
+
+    create_app()에서 호출되므로 gunicorn preload_app 설정 시에는 master process에서 한 번만 실행된다
+    일부 저장소의 load가 실패하더라도 API 서버는 Database를 사용하여 동작할 수 있으므로 예외를 전파하지 않는다
+    """
+
+    for store in preload_stores:
+        try:
+            store.preload()
+        except Exception as e:
+            logger.exception(e)
+            logger.warning(f"failed to preload store: {store.name}")
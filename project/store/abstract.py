@@ -0,0 +1,38 @@
+from abc import ABCMeta, abstractmethod
+
+
+class PreloadStoreABC(metaclass=ABCMeta):
+    """
+    API 서버에서 사용하는 읽기 전용 in-memory 데이터 저장소
+
+    - gunicorn(preload_app)으로 실행하면 master process에서 한 번만 load 되고,
+      fork 된 worker들은 같은 메모리 페이지를 copy-on-write로 공유한다
+    - master에서 load 되므로 load() 안에서는 Database connection을 열지 않는다
+      (fork 이전에 열린 connection은 worker 간에 공유되어 문제가 생긴다)
+    """
+
+    name: str = ""
+
+    def __init__(self) -> None:
+        self.loaded = False
+
+    @abstractmethod
+    def load(self) -> None:
+        """
+        데이터를 메모리에 적재한다
+
+        :return:
+        """
+
+    def preload(self) -> None:
+        """
+        이미 load 된 저장소는 다시 load 하지 않는다
+
+        :return:
+        """
+
+        if self.loaded:
+            return
+
+        self.load()
+        self.loaded = True
@@ -0,0 +1,510 @@
+import asyncio
+import dataclasses
+import datetime
+import fcntl
+import json
+import os
+import pathlib
+import random
+import time
+
+import numpy as np
+from loguru import logger
+
+from connection.bis import Arrival, ArrivalClientABC, UpstreamError
+from store.snapshot import Snapshot
+
+# poller가 갱신할 정류장을 고르는 주기(초)
+POLL_TICK = 1.0
+# poller의 heartbeat가 이 시간(초) 동안 갱신되지 않으면 poller가 실행 중이 아닌 것으로 판단한다
+# poller worker가 재시작되어도 다른 worker가 lock을 얻는 동안(LEADER_RETRY) 503을 반환하지 않도록 더 길게 설정한다
+HEARTBEAT_TIMEOUT = 10.0
+# 같은 정류장의 요청 기록(파일)을 갱신하는 최소 간격(초)
+TOUCH_INTERVAL = 1.0
+# poller를 실행하지 않는 worker가 lock을 다시 얻으려고 시도하는 주기(초)
+LEADER_RETRY = 5.0
+
+
+class ArrivalRecord:
+    """
+    정류장의 도착 정보 한 번의 조회 결과
+    """
+
+    __slots__ = ("fetched_at", "updated_at", "arrivals")
+
+    def __init__(
+        self, arrivals: list[Arrival], fetched_at: float | None = None
+    ) -> None:
+        # 여러 process가 같은 결과를 읽으므로 TTL 계산에도 wall clock(epoch seconds)을 사용한다
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.updated_at = datetime.datetime.fromtimestamp(
+            self.fetched_at, datetime.timezone.utc
+        )
+        self.arrivals = arrivals
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def dump(self) -> dict:
+        return {
+            "fetched_at": self.fetched_at,
+            "arrivals": [dataclasses.asdict(i) for i in self.arrivals],
+        }
+
+    @classmethod
+    def load(cls, value: dict) -> "ArrivalRecord":
+        return cls([Arrival(**i) for i in value["arrivals"]], value["fetched_at"])
+
+
+class ArrivalStore:
+    """
+    정류장별 실시간 도착 정보
+
+    gunicorn worker들이 같은 도착 정보를 보도록, 모든 상태를 host의 공유 디렉터리(path, tmpfs 권장)에 파일로 저장한다
+    - requests/{ars_id}: 정류장의 마지막 요청 시각(mtime). API 요청(touch)마다 갱신한다
+    - arrivals/{ars_id}.json: 정류장의 최근 history_size 개의 조회 결과. poller만 쓰며, 임시 파일을 교체(rename)하여 저장한다
+    - poller: poller의 heartbeat(mtime). 최근에 갱신되지 않았으면 poller가 실행 중이 아닌 것으로 판단한다
+    API 요청은 이 저장소만 조회하고, 도착 정보는 host에서 하나만 실행되는 ArrivalPoller가 background에서 upstream API로 갱신한다
+    최근에 요청된 정류장만 갱신하므로 upstream 호출 수는 전체 정류장 수가 아니라 요청되는 정류장 수에 비례한다
+    snapshot의 정류장 ARS ID 목록으로 존재하지 않는 정류장의 요청을 거절한다
+    """
+
+    def __init__(
+        self, path: str, ttl: float, history_size: int, max_stations: int
+    ) -> None:
+        self.path = pathlib.Path(path)
+        self.requests_dir = self.path / "requests"
+        self.arrivals_dir = self.path / "arrivals"
+        self.heartbeat_file = self.path / "poller"
+        self.lock_file = self.path / "poller.lock"
+        self.ttl = ttl
+        self.history_size = history_size
+        self.max_stations = max_stations
+        self.ars_ids: np.ndarray | None = None
+        # 이 process에서 정류장의 요청 파일을 마지막으로 갱신한 시각. 요청마다 파일을 갱신하지 않도록 사용한다
+        self._touched_at: dict[int, float] = {}
+        # 이 process에서 읽은 조회 결과. 파일이 바뀌지 않았으면(mtime) 다시 읽지 않는다
+        self._cache: dict[int, tuple[int, list[ArrivalRecord]]] = {}
+
+    def prepare(self) -> None:
+        """
+        공유 디렉터리를 생성한다
+
+        :return:
+        """
+
+        self.requests_dir.mkdir(parents=True, exist_ok=True)
+        self.arrivals_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def running(self) -> bool:
+        """
+        host의 poller가 실행 중인지 여부. 실행 중이 아니면 API는 503을 반환한다
+        """
+
+        try:
+            return time.time() - self.heartbeat_file.stat().st_mtime < HEARTBEAT_TIMEOUT
+        except OSError:
+            return False
+
+    def heartbeat(self) -> None:
+        self.heartbeat_file.touch()
+
+    def build(self, snapshot: Snapshot) -> None:
+        """
+        snapshot으로 정류장 ARS ID 목록을 갱신한다. SnapshotStore의 listener로 등록한다
+
+        :param snapshot: 정류장/노선 snapshot
+        :return:
+        """
+
+        self.ars_ids = np.union1d(snapshot.station_ars_id, snapshot.stop_ars_id)
+        logger.info(f"arrival station ids built. stations: {len(self.ars_ids)}")
+
+    def is_known(self, ars_id: int) -> bool:
+        """
+        정류장이 존재하는지 확인한다. snapshot이 없으면 모든 정류장을 허용한다
+
+        :param ars_id: 정류장 ARS ID
+        :return:
+        """
+
+        if self.ars_ids is None:
+            return True
+
+        i = np.searchsorted(self.ars_ids, ars_id)
+        return i < len(self.ars_ids) and self.ars_ids[i] == ars_id
+
+    def touch(self, ars_id: int) -> None:
+        """
+        정류장이 요청되었음을 기록한다. 같은 process에서는 TOUCH_INTERVAL 초에 한 번만 파일을 갱신한다
+
+        :param ars_id: 정류장 ARS ID
+        :return:
+        """
+
+        now = time.time()
+        if now - self._touched_at.get(ars_id, 0.0) < TOUCH_INTERVAL:
+            return
+
+        if len(self._touched_at) >= self.max_stations:
+            self._touched_at.clear()
+        self._touched_at[ars_id] = now
+        (self.requests_dir / str(ars_id)).touch()
+
+    def _requested(self) -> list[tuple[float, int]]:
+        # (마지막 요청 시각, 정류장 ARS ID) 목록
+        requested = []
+        with os.scandir(self.requests_dir) as entries:
+            for entry in entries:
+                try:
+                    requested.append((entry.stat().st_mtime, int(entry.name)))
+                except (OSError, ValueError):
+                    continue
+        return requested
+
+    def active(self, window: float) -> list[int]:
+        """
+        최근 window 초 안에 요청된 정류장 목록. 최근에 요청된 max_stations 개의 정류장만 반환한다
+
+        :param window: 시간(초)
+        :return:
+        """
+
+        since = time.time() - window
+        requested = sorted(
+            (item for item in self._requested() if item[0] >= since), reverse=True
+        )
+        return [ars_id for _, ars_id in requested[: self.max_stations]]
+
+    def evict(self, window: float) -> list[int]:
+        """
+        최근 window 초 동안 요청되지 않은 정류장의 요청 기록과 도착 정보를 삭제한다
+
+        :param window: 시간(초)
+        :return: 삭제한 정류장 목록
+        """
+
+        since = time.time() - window
+        evicted = [ars_id for at, ars_id in self._requested() if at < since]
+        for ars_id in evicted:
+            (self.requests_dir / str(ars_id)).unlink(missing_ok=True)
+            self._arrivals_file(ars_id).unlink(missing_ok=True)
+            self._cache.pop(ars_id, None)
+
+        return evicted
+
+    def _arrivals_file(self, ars_id: int) -> pathlib.Path:
+        return self.arrivals_dir / f"{ars_id}.json"
+
+    def put(self, ars_id: int, arrivals: list[Arrival]) -> None:
+        """
+        정류장의 도착 정보 조회 결과를 저장한다. 더 이상 요청되지 않는 정류장이면 저장하지 않는다
+
+        :param ars_id: 정류장 ARS ID
+        :param arrivals: 도착 정보 목록
+        :return:
+        """
+
+        if not (self.requests_dir / str(ars_id)).exists():
+            return
+
+        history = (self.history(ars_id) + [ArrivalRecord(arrivals)])[
+            -self.history_size :
+        ]
+
+        # 읽는 쪽에서 쓰는 중인 파일을 보지 않도록 임시 파일에 쓴 뒤 교체한다
+        path = self._arrivals_file(ars_id)
+        tmp_path = self.arrivals_dir / f".{ars_id}.json.tmp"
+        tmp_path.write_text(json.dumps([r.dump() for r in history]))
+        os.replace(tmp_path, path)
+
+    def history(self, ars_id: int) -> list[ArrivalRecord]:
+        """
+        정류장의 최근 조회 결과 목록(오래된 순서)
+
+        :param ars_id: 정류장 ARS ID
+        :return:
+        """
+
+        path = self._arrivals_file(ars_id)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            self._cache.pop(ars_id, None)
+            return []
+
+        cached = self._cache.get(ars_id)
+        if cached and cached[0] == mtime:
+            return list(cached[1])
+
+        try:
+            history = [ArrivalRecord.load(i) for i in json.loads(path.read_text())]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"failed to read arrivals. ars_id: {ars_id}, error: {e!r}")
+            return []
+
+        if len(self._cache) >= self.max_stations:
+            self._cache.clear()
+        self._cache[ars_id] = (mtime, history)
+        return list(history)
+
+    def last(self, ars_id: int) -> ArrivalRecord | None:
+        """
+        정류장의 가장 최근 조회 결과. ttl과 관계없이 반환한다
+
+        :param ars_id: 정류장 ARS ID
+        :return:
+        """
+
+        history = self.history(ars_id)
+        return history[-1] if history else None
+
+    def latest(self, ars_id: int) -> ArrivalRecord | None:
+        """
+        정류장의 가장 최근 조회 결과. ttl이 지났으면 None을 반환한다
+
+        :param ars_id: 정류장 ARS ID
+        :return:
+        """
+
+        record = self.last(ars_id)
+        if record is None or record.age > self.ttl:
+            return None
+        return record
+
+
+class HostLock:
+    """
+    같은 host의 process 중 하나만 얻을 수 있는 lock(flock)
+
+    lock을 얻은 process가 종료되면(worker 재시작, 비정상 종료 포함) OS가 lock을 해제하므로, 다른 process가 이어서 얻는다
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self.fd: int | None = None
+
+    def acquire(self) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+
+        self.fd = fd
+        return True
+
+    def release(self) -> None:
+        if self.fd is None:
+            return
+
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+
+class TokenBucket:
+    """
+    초당 rate 개의 요청을 허용하고, 최대 burst 개까지 한 번에 허용하는 rate limiter
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ArrivalPoller:
+    """
+    최근에 요청된 정류장의 도착 정보를 upstream API에서 주기적으로 조회하여 ArrivalStore에 저장한다
+
+    - 정류장별로 interval 초마다 갱신하며, 가장 오래전에 갱신된(처음 요청된) 정류장부터 조회한다
+    - worker마다 실행하지만 host lock(HostLock)을 얻은 하나의 worker만 조회하고, 나머지는 lock을 얻을 때까지 기다린다
+    - 동시 요청 수(concurrency)와 초당 요청 수(rate)를 제한한다. 조회는 host에서 하나의 poller만 하므로 rate는 host별 값이다
+    - 조회에 실패한 정류장은 exponential backoff(최대 backoff_max 초) 후에 다시 조회한다
+    - upstream이 요청 제한(429)으로 응답하면 Retry-After 동안 모든 조회를 멈춘다
+    """
+
+    def __init__(
+        self,
+        store: ArrivalStore,
+        client: ArrivalClientABC,
+        interval: float,
+        active_window: float,
+        concurrency: int,
+        rate: float,
+        backoff_base: float,
+        backoff_max: float,
+    ) -> None:
+        self.store = store
+        self.client = client
+        self.interval = interval
+        self.active_window = active_window
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = TokenBucket(rate, burst=max(1, concurrency))
+        # 한 번에 조회를 시작하는 최대 정류장 수
+        self.batch_size = max(1, int(rate * POLL_TICK))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.paused_until = 0.0
+        self.in_flight: set[int] = set()
+        self.failures: dict[int, int] = {}
+        self.retry_at: dict[int, float] = {}
+        self.tasks: set[asyncio.Task] = set()
+
+    def due(self) -> list[int]:
+        """
+        갱신할 정류장 목록. 가장 오래전에 갱신된 정류장부터 반환한다
+
+        :return:
+        """
+
+        now = time.monotonic()
+        due = []
+        for ars_id in self.store.active(self.active_window):
+            if ars_id in self.in_flight or self.retry_at.get(ars_id, 0) > now:
+                continue
+
+            record = self.store.last(ars_id)
+            if record is None:
+                due.append((-1.0, ars_id))
+            elif record.age >= self.interval:
+                due.append((record.fetched_at, ars_id))
+
+        due.sort()
+        return [ars_id for _, ars_id in due]
+
+    def backoff(self, ars_id: int) -> float:
+        """
+        조회에 실패한 정류장의 다음 조회까지 기다리는 시간(초). 실패할 때마다 두 배로 늘어난다
+
+        :param ars_id: 정류장 ARS ID
+        :return:
+        """
+
+        failures = self.failures[ars_id] = self.failures.get(ars_id, 0) + 1
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - 1))
+        # 여러 정류장이 같은 시각에 다시 조회하지 않도록 jitter를 추가한다
+        return delay * random.uniform(0.5, 1.0)
+
+    async def fetch(self, ars_id: int) -> None:
+        """
+        정류장의 도착 정보를 조회하여 저장한다
+
+        :param ars_id: 정류장 ARS ID
+        :return:
+        """
+
+        try:
+            arrivals = await self.client.fetch(ars_id)
+            self.store.put(ars_id, arrivals)
+        except Exception as e:
+            # UpstreamError가 아닌 예외(client, 저장 오류)도 같은 정류장을 매 주기마다 다시 조회하지 않도록 backoff 한다
+            delay = self.backoff(ars_id)
+            self.retry_at[ars_id] = time.monotonic() + delay
+            if isinstance(e, UpstreamError):
+                logger.warning(
+                    f"failed to fetch arrivals. ars_id: {ars_id}, error: {e}, "
+                    f"retry after {delay:.1f} seconds"
+                )
+            else:
+                logger.exception(
+                    f"unexpected error while fetching arrivals. ars_id: {ars_id}, "
+                    f"retry after {delay:.1f} seconds"
+                )
+            if isinstance(e, UpstreamError) and e.retry_after:
+                self.paused_until = max(
+                    self.paused_until, time.monotonic() + e.retry_after
+                )
+            return
+        finally:
+            self.in_flight.discard(ars_id)
+            self.semaphore.release()
+
+        self.failures.pop(ars_id, None)
+        self.retry_at.pop(ars_id, None)
+
+    async def poll(self) -> int:
+        """
+        갱신할 정류장의 조회를 시작한다. 조회는 background task로 실행되며 끝날 때까지 기다리지 않는다
+
+        :return: 조회를 시작한 정류장 수
+        """
+
+        started = 0
+        for ars_id in self.due()[: self.batch_size]:
+            await self.limiter.acquire()
+            await self.semaphore.acquire()
+            if time.monotonic() < self.paused_until:
+                self.semaphore.release()
+                break
+
+            self.in_flight.add(ars_id)
+            task = asyncio.create_task(self.fetch(ars_id))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            started += 1
+
+        return started
+
+    def evict(self) -> None:
+        for ars_id in self.store.evict(self.active_window):
+            self.failures.pop(ars_id, None)
+            self.retry_at.pop(ars_id, None)
+
+    async def heartbeat(self) -> None:
+        # poll()이 upstream 응답을 기다리는 동안에도 heartbeat를 갱신하도록 별도의 task로 실행한다
+        while True:
+            try:
+                self.store.heartbeat()
+            except OSError as e:
+                logger.warning(f"failed to update arrival poller heartbeat: {e!r}")
+            await asyncio.sleep(POLL_TICK)
+
+    async def run(self) -> None:
+        """
+        host lock을 얻은 뒤 도착 정보를 계속 갱신한다. 취소되면 실행 중인 조회를 모두 취소하고 lock을 해제한다
+
+        :return:
+        """
+
+        self.store.prepare()
+        lock = HostLock(self.store.lock_file)
+        while not lock.acquire():
+            await asyncio.sleep(LEADER_RETRY)
+
+        heartbeat = asyncio.create_task(self.heartbeat())
+        logger.info(f"arrival poller started. pid: {os.getpid()}")
+        try:
+            while True:
+                try:
+                    self.evict()
+                    if time.monotonic() >= self.paused_until:
+                        await self.poll()
+                except Exception as e:
+                    logger.exception(e)
+
+                await asyncio.sleep(POLL_TICK)
+        finally:
+            heartbeat.cancel()
+            for task in self.tasks:
+                task.cancel()
+            lock.release()
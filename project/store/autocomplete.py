@@ -0,0 +1,164 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from store.snapshot import Snapshot
+
+# prefix 범위의 끝을 찾기 위한 가장 큰 문자
+MAX_CHAR = chr(0x10FFFF)
+
+
+def normalize(text: str) -> str:
+    """
+    검색어와 이름을 비교할 수 있도록 공백을 제거하고 소문자로 변환한다
+
+    :param text: 문자열
+    :return:
+    """
+
+    return "".join(text.split()).lower()
+
+
+class PrefixIndex:
+    """
+    정렬된 이름 배열에서 binary search로 prefix 범위를 찾는 index
+
+    - 이름은 normalize 된 key 순서로 정렬되어 있으므로 prefix가 같은 이름은 연속된 범위에 있다
+    - prefix 범위 안에서 인기도(score)가 높은 순서로 limit 개를 반환한다
+    """
+
+    __slots__ = ("keys", "names", "scores")
+
+    def __init__(self, counts: pd.Series) -> None:
+        """
+        :param counts: 이름별 인기도
+        """
+
+        counts = counts[counts.index.str.strip() != ""]
+        keys = counts.index.map(normalize)
+        order = np.argsort(keys.to_numpy(dtype=object), kind="stable")
+
+        self.keys: list[str] = keys[order].tolist()
+        self.names: list[str] = counts.index[order].tolist()
+        self.scores: np.ndarray = counts.to_numpy(dtype=np.int64)[order]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, prefix: str, limit: int) -> list[str]:
+        """
+        prefix로 시작하는 이름을 인기도 순서로 반환한다
+
+        :param prefix: normalize 된 검색어
+        :param limit: 최대 개수
+        :return:
+        """
+
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_right(self.keys, prefix + MAX_CHAR, lo)
+        if lo == hi:
+            return []
+
+        scores = self.scores[lo:hi]
+        if len(scores) > limit:
+            # 전체를 정렬하지 않고 상위 limit 개만 고른다
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+
+        # 인기도가 같으면 이름 순서로 정렬한다
+        top = sorted(top.tolist(), key=lambda i: (-scores[i], i))
+        return [self.names[lo + i] for i in top]
+
+
+def station_name_counts(snapshot: Snapshot) -> pd.Series:
+    """
+    정류장명별 인기도(해당 이름의 정류장을 지나가는 노선 수)를 계산한다
+
+    bus_station.node_name과 bus_route.station_name을 합친다
+
+    :param snapshot: 정류장/노선 snapshot
+    :return:
+    """
+
+    stations = pd.Series(list(snapshot.station_name), dtype=object)
+    stops = pd.Series(list(snapshot.stop_station_name), dtype=object)
+
+    # 노선이 지나가지 않는 정류장도 검색될 수 있도록 인기도 0으로 포함한다
+    counts = stops.value_counts()
+    return counts.reindex(counts.index.union(pd.Index(stations.unique())), fill_value=0)
+
+
+def build_autocomplete_index(snapshot: Snapshot) -> tuple[PrefixIndex, PrefixIndex]:
+    """
+    snapshot으로 (정류장명, 노선명) prefix index를 생성한다
+
+    - 정류장명은 bus_station.node_name과 bus_route.station_name을 합친다.
+      인기도는 해당 이름의 정류장을 지나가는 노선 수이다
+    - 노선명은 bus_route.route_name이다. 인기도는 노선이 지나가는 정류장 수이다
+
+    :param snapshot: 정류장/노선 snapshot
+    :return:
+    """
+
+    route_counts = (
+        pd.Series(np.diff(snapshot.route_offsets), index=list(snapshot.route_name))
+        .groupby(level=0)
+        .sum()
+    )
+
+    return PrefixIndex(station_name_counts(snapshot)), PrefixIndex(route_counts)
+
+
+class AutocompleteStore:
+    """
+    검색창 자동완성을 위한 in-memory 정류장명/노선명 index
+
+    snapshot이 (다시) load 될 때마다 index를 새로 만들어 교체하므로, 요청 처리 중에는 Database를 조회하지 않는다
+    """
+
+    def __init__(self) -> None:
+        self.version: str | None = None
+        self._index: tuple[PrefixIndex, PrefixIndex] | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    def build(self, snapshot: Snapshot) -> None:
+        """
+        snapshot으로 index를 생성한다. SnapshotStore의 listener로 등록한다
+
+        :param snapshot: 정류장/노선 snapshot
+        :return:
+        """
+
+        self._index = build_autocomplete_index(snapshot)
+        self.version = snapshot.version
+
+        stations, routes = self._index
+        logger.info(
+            f"autocomplete index built. version: {self.version}, "
+            f"stations: {len(stations)}, routes: {len(routes)}"
+        )
+
+    def search(self, query: str, limit: int) -> tuple[list[str], list[str]]:
+        """
+        검색어로 시작하는 정류장명, 노선명을 인기도 순서로 반환한다
+
+        :param query: 검색어
+        :param limit: 종류별 최대 개수
+        :return: (정류장명 목록, 노선명 목록)
+        """
+
+        if self._index is None:
+            raise RuntimeError("autocomplete index is not ready")
+
+        prefix = normalize(query)
+        if not prefix:
+            return [], []
+
+        stations, routes = self._index
+        return stations.search(prefix, limit), routes.search(prefix, limit)
@@ -0,0 +1,49 @@
+import asyncio
+
+from loguru import logger
+
+import crud
+from connection.database import async_session
+
+
+class DatasetVersionStore:
+    """
+    현재 Database에 load 된 데이터의 버전
+
+    데이터는 loader를 실행할 때만 변경되므로, 요청마다 Database를 조회하지 않고 주기적으로 버전을 갱신한다
+    """
+
+    def __init__(self) -> None:
+        self.version: str | None = None
+
+    async def refresh(self) -> None:
+        """
+        가장 최근에 load 된 데이터의 버전을 조회한다
+
+        :return:
+        """
+
+        async with async_session() as session:
+            dataset_dal = crud.DatasetDAL(session=session)
+            dataset = await dataset_dal.get_latest_dataset_version()
+
+        version = dataset.version if dataset else None
+        if version != self.version:
+            logger.info(f"dataset version changed: {self.version} -> {version}")
+            self.version = version
+
+    async def watch(self, interval: float) -> None:
+        """
+        주기적으로 데이터 버전을 갱신한다
+
+        :param interval: 갱신 주기(초)
+        :return:
+        """
+
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.exception(e)
+
+            await asyncio.sleep(interval)
@@ -0,0 +1,97 @@
+import dataclasses
+import pathlib
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from loguru import logger
+
+from core.config import settings
+from store.abstract import PreloadStoreABC
+
+
+@dataclasses.dataclass(frozen=True)
+class District:
+    sig_code: int
+    sido: str
+    sig_kor_name: str
+    sig_eng_name: str
+
+
+class DistrictStore(PreloadStoreABC):
+    """
+    위치(위도, 경도)가 포함되는 시/구를 찾는 in-memory reverse geocoding 저장소
+
+    - 시/구 polygon(hang_jeong_gu.geojson)을 STR-tree에 넣고 prepared geometry로 만들어 두므로,
+      Database(ST_Within)를 조회하지 않고 위치를 시/구로 변환한다
+    - 여러 위치는 한 번의 STR-tree bulk query로 처리한다
+    """
+
+    name = "district"
+
+    def __init__(self, path: str = settings.district_geojson_path) -> None:
+        super().__init__()
+        self.path = pathlib.Path(path)
+        self.districts: list[District] = []
+        self.tree: shapely.STRtree | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.tree is not None
+
+    def load(self) -> None:
+        gdf = gpd.read_file(self.path)
+
+        geometries = gdf.geometry.to_numpy()
+        # 같은 polygon에 반복해서 포함 여부를 확인하므로 미리 prepared geometry로 만든다
+        shapely.prepare(geometries)
+
+        self.districts = [
+            District(
+                sig_code=int(row["sig_code"]),
+                sido=row["sido"],
+                sig_kor_name=row["sig_kor_name"],
+                sig_eng_name=row["sig_eng_name"],
+            )
+            for row in gdf.drop(columns="geometry").to_dict(orient="records")
+        ]
+        self.tree = shapely.STRtree(geometries)
+
+        logger.info(f"district loaded. districts: {len(self.districts)}")
+
+    def locate(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        """
+        위치 배열이 포함되는 시/구 index 배열을 반환한다
+
+        :param latitude: 위도 배열
+        :param longitude: 경도 배열
+        :return: self.districts의 index 배열. 시/구에 포함되지 않는 위치는 -1
+        """
+
+        if self.tree is None:
+            raise RuntimeError("district store is not loaded")
+
+        # Database, geojson과 같이 POINT(위도 경도) 순서로 좌표를 사용한다
+        points = shapely.points(
+            np.asarray(latitude, dtype=np.float64),
+            np.asarray(longitude, dtype=np.float64),
+        )
+        point_index, district_index = self.tree.query(points, predicate="within")
+
+        result = np.full(len(points), -1, dtype=np.int64)
+        # 시/구 경계가 겹치는 경우에는 처음 찾은 시/구를 사용한다
+        result[point_index[::-1]] = district_index[::-1]
+
+        return result
+
+    def district_of(self, latitude: float, longitude: float) -> District | None:
+        """
+        위치가 포함되는 시/구를 반환한다
+
+        :param latitude: 위도
+        :param longitude: 경도
+        :return: 시/구. 시/구에 포함되지 않으면 None
+        """
+
+        i = int(self.locate(np.array([latitude]), np.array([longitude]))[0])
+        return self.districts[i] if i >= 0 else None
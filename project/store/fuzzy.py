@@ -0,0 +1,258 @@
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from store.autocomplete import normalize, station_name_counts
+from store.snapshot import Snapshot
+
+# index에 저장하는 최대 편집 거리(자모 단위)
+MAX_EDIT_DISTANCE = 2
+# 삭제 변형(deletion)은 key의 앞부분(prefix_length)에 대해서만 만든다(SymSpell prefix)
+# 정류장명이 길어져도 이름당 삭제 변형 개수가 일정하므로 index 크기가 이름 수에 비례한다
+PREFIX_LENGTH = 7
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+
+
+def decompose(text: str) -> str:
+    """
+    문자열을 normalize 한 뒤 한글 음절을 자모(초성, 중성, 종성)로 분해한다
+
+    '성수역' -> 'ㅅㅓㅇㅅㅜㅇㅕㄱ' (조합형 자모)
+    음절 단위로 비교하면 받침 하나만 틀려도 한 글자가 모두 다르므로, 자모 단위로 편집 거리를 계산한다
+
+    :param text: 문자열
+    :return:
+    """
+
+    result = []
+    for c in normalize(text):
+        code = ord(c)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            code -= HANGUL_BASE
+            result.append(chr(0x1100 + code // 588))
+            result.append(chr(0x1161 + code % 588 // 28))
+            if code % 28:
+                result.append(chr(0x11A7 + code % 28))
+        else:
+            result.append(c)
+
+    return "".join(result)
+
+
+def deletes(key: str, max_distance: int) -> set[str]:
+    """
+    key에서 최대 max_distance개의 문자를 삭제한 모든 변형을 반환한다(key 자신을 포함한다)
+
+    :param key: 문자열
+    :param max_distance: 최대 삭제 개수
+    :return:
+    """
+
+    result = {key}
+    queue = [key]
+    for _ in range(max_distance):
+        next_queue = []
+        for word in queue:
+            for i in range(len(word)):
+                deleted = word[:i] + word[i + 1 :]
+                if deleted not in result:
+                    result.add(deleted)
+                    next_queue.append(deleted)
+        queue = next_queue
+
+    return result
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    두 문자열의 편집 거리(삽입, 삭제, 교체, 인접한 문자의 교환)를 계산한다
+
+    계산 중에 max_distance를 넘으면 더 계산하지 않고 max_distance + 1을 반환한다
+
+    :param a: 문자열
+    :param b: 문자열
+    :param max_distance: 최대 편집 거리
+    :return:
+    """
+
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    before = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+
+        if min(current) > max_distance:
+            return max_distance + 1
+        before, previous = previous, current
+
+    return min(previous[-1], max_distance + 1)
+
+
+class FuzzyIndex:
+    """
+    정류장명의 SymSpell 방식 삭제 변형(deletion) index
+
+    - 정류장명과 검색어를 자모로 분해한 뒤, 최대 편집 거리만큼 문자를 삭제한 변형을 만들어 비교한다
+      두 문자열의 편집 거리가 d 이하라면 각각에서 d개 이하를 삭제하여 같은 문자열을 만들 수 있다
+    - 검색 시에는 검색어의 삭제 변형으로 후보를 찾고 후보에 대해서만 편집 거리를 계산하므로,
+      모든 정류장명과 비교하지 않고 검색 시간이 정류장명 수와 관계없이 일정하다
+    - 정류장명별 정류장(ars_id, 위치)은 offsets로 index 된 배열로 저장한다
+    """
+
+    def __init__(self, stations: pd.DataFrame, counts: pd.Series) -> None:
+        """
+        :param stations: 정류장(station_name, ars_id, latitude, longitude) DataFrame
+        :param counts: 정류장명별 인기도
+        """
+
+        stations = stations.sort_values(["station_name", "ars_id"]).reset_index(
+            drop=True
+        )
+        names = stations["station_name"].to_numpy(dtype=object)
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+
+        self.names: list[str] = names[starts].tolist()
+        self.keys: list[str] = [decompose(name) for name in self.names]
+        self.scores: np.ndarray = counts.reindex(self.names, fill_value=0).to_numpy(
+            dtype=np.int64
+        )
+
+        self.offsets = np.r_[starts, len(stations)].astype(np.int64)
+        self.ars_id = stations["ars_id"].to_numpy(dtype=np.int64)
+        self.latitude = stations["latitude"].to_numpy(dtype=np.float64)
+        self.longitude = stations["longitude"].to_numpy(dtype=np.float64)
+
+        self.deletes: dict[str, list[int]] = {}
+        for i, key in enumerate(self.keys):
+            for deleted in deletes(key[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self.deletes.setdefault(deleted, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def stations(self, i: int) -> slice:
+        """
+        i번째 정류장명의 정류장 범위를 반환한다
+
+        :param i: 정류장명 index
+        :return:
+        """
+
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def search(
+        self, query: str, max_distance: int, limit: int
+    ) -> list[tuple[int, int]]:
+        """
+        검색어와 편집 거리가 max_distance 이하인 정류장명을 찾는다
+
+        편집 거리가 가까운 순서, 인기도가 높은 순서로 정렬한다
+
+        :param query: 검색어
+        :param max_distance: 최대 편집 거리(MAX_EDIT_DISTANCE 이하)
+        :param limit: 최대 개수
+        :return: (정류장명 index, 편집 거리) 목록
+        """
+
+        key = decompose(query)
+        if not key:
+            return []
+
+        max_distance = min(max_distance, MAX_EDIT_DISTANCE)
+
+        candidates = set()
+        for deleted in deletes(key[:PREFIX_LENGTH], max_distance):
+            candidates.update(self.deletes.get(deleted, ()))
+
+        matches = []
+        for i in candidates:
+            distance = edit_distance(key, self.keys[i], max_distance)
+            if distance <= max_distance:
+                matches.append((i, distance))
+
+        matches.sort(key=lambda x: (x[1], -self.scores[x[0]], self.names[x[0]]))
+        return matches[:limit]
+
+
+def build_fuzzy_index(snapshot: Snapshot) -> FuzzyIndex:
+    """
+    snapshot의 정류장(bus_station)과 노선의 정류장(bus_route)으로 정류장명 index를 생성한다
+
+    :param snapshot: 정류장/노선 snapshot
+    :return:
+    """
+
+    stations = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "station_name": list(snapshot.station_name),
+                    "ars_id": snapshot.station_ars_id,
+                    "latitude": snapshot.station_latitude,
+                    "longitude": snapshot.station_longitude,
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "station_name": list(snapshot.stop_station_name),
+                    "ars_id": snapshot.stop_ars_id,
+                    "latitude": snapshot.stop_latitude,
+                    "longitude": snapshot.stop_longitude,
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+    # 같은 정류장은 bus_station과 bus_route에 모두 있고, 노선마다 중복된다
+    stations = stations[
+        (stations["station_name"].str.strip() != "") & (stations["ars_id"] >= 0)
+    ].drop_duplicates(["station_name", "ars_id"])
+
+    return FuzzyIndex(stations, station_name_counts(snapshot))
+
+
+class FuzzyStationStore:
+    """
+    오타를 허용하는 정류장명 검색을 위한 in-memory index
+
+    snapshot이 (다시) load 될 때마다 index를 새로 만들어 교체한다
+    """
+
+    def __init__(self) -> None:
+        self.version: str | None = None
+        self.index: FuzzyIndex | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    def build(self, snapshot: Snapshot) -> None:
+        """
+        snapshot으로 index를 생성한다. SnapshotStore의 listener로 등록한다
+
+        :param snapshot: 정류장/노선 snapshot
+        :return:
+        """
+
+        self.index = build_fuzzy_index(snapshot)
+        self.version = snapshot.version
+
+        logger.info(
+            f"fuzzy station index built. version: {self.version}, "
+            f"names: {len(self.index)}, deletes: {len(self.index.deletes)}"
+        )
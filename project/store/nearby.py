@@ -0,0 +1,203 @@
+import math
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from helpers.distance import haversine
+from helpers.geohash import METERS_PER_DEGREE
+from store.snapshot import Snapshot
+
+# grid cell 크기(도). 위도 약 222m, 경도 약 176m(서울 기준)
+CELL_DEGREES = 0.002
+# 경도 방향 cell 개수. cell key = 위도 cell index * LONGITUDE_CELLS + 경도 cell index
+LONGITUDE_CELLS = math.ceil(360 / CELL_DEGREES)
+
+
+def _cell(latitude, longitude) -> tuple[np.ndarray, np.ndarray]:
+    lat_i = np.floor((np.asarray(latitude) + 90) / CELL_DEGREES).astype(np.int64)
+    lon_i = np.floor((np.asarray(longitude) + 180) / CELL_DEGREES).astype(np.int64)
+    return lat_i, lon_i
+
+
+class NearbyIndex:
+    """
+    위치 반경 안의 정류장을 찾는 grid index
+
+    - 정류장을 (위도 cell, 경도 cell) 순서의 cell key로 정렬해 두므로, 같은 위도 cell 줄의 연속된 경도 cell은 배열의 한 구간이다
+    - 반경을 포함하는 위도 cell 줄마다 searchsorted로 구간을 찾고, 후보 정류장의 실제 거리(haversine)로 걸러낸다
+    - 반경 150m 조회는 위도 cell 2~3줄, 수십 개의 후보만 확인하므로 Database를 조회하지 않고 수십 μs 안에 끝난다
+    """
+
+    def __init__(self, stations: pd.DataFrame) -> None:
+        lat_i, lon_i = _cell(stations["latitude"], stations["longitude"])
+        keys = lat_i * LONGITUDE_CELLS + lon_i
+        order = np.argsort(keys, kind="stable")
+
+        self.keys = keys[order]
+        self.latitude = stations["latitude"].to_numpy(np.float64)[order]
+        self.longitude = stations["longitude"].to_numpy(np.float64)[order]
+        self.ars_id = stations["ars_id"].to_numpy(np.int64)[order]
+        self.station_name = stations["station_name"].to_numpy(object)[order]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def within(self, latitude: float, longitude: float, radius: float) -> np.ndarray:
+        """
+        위치 반경 안에 있는 정류장의 index 배열
+
+        :param latitude: 위도
+        :param longitude: 경도
+        :param radius: 반경 거리(M)
+        :return:
+        """
+
+        d_lat = radius / METERS_PER_DEGREE
+        d_lon = radius / (
+            METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6)
+        )
+
+        (lat_min, lat_max), (lon_min, lon_max) = _cell(
+            [latitude - d_lat, latitude + d_lat], [longitude - d_lon, longitude + d_lon]
+        )
+        rows = np.arange(lat_min, lat_max + 1) * LONGITUDE_CELLS
+        starts = np.searchsorted(self.keys, rows + lon_min, side="left")
+        ends = np.searchsorted(self.keys, rows + lon_max, side="right")
+
+        candidates = np.concatenate(
+            [np.arange(s, e) for s, e in zip(starts.tolist(), ends.tolist())]
+        )
+        distance = haversine(
+            latitude,
+            longitude,
+            self.latitude[candidates],
+            self.longitude[candidates],
+        )
+        return candidates[distance <= radius]
+
+
+def build_nearby_index(snapshot: Snapshot) -> NearbyIndex:
+    """
+    snapshot의 정류장(bus_station)과 노선의 정류장(bus_route)으로 grid index를 생성한다
+
+    위치 검색 API의 확장 검색(extend)과 같이 두 데이터를 합치고, ARS ID를 기준으로 중복된 정류장을 제거한다
+
+    :param snapshot: 정류장/노선 snapshot
+    :return:
+    """
+
+    stations = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "station_name": list(snapshot.station_name),
+                    "ars_id": snapshot.station_ars_id,
+                    "latitude": snapshot.station_latitude,
+                    "longitude": snapshot.station_longitude,
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "station_name": list(snapshot.stop_station_name),
+                    "ars_id": snapshot.stop_ars_id,
+                    "latitude": snapshot.stop_latitude,
+                    "longitude": snapshot.stop_longitude,
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+    stations = stations[stations["ars_id"] >= 0].drop_duplicates("ars_id")
+
+    return NearbyIndex(stations)
+
+
+class NearbySubscription:
+    """
+    이동하는 client 하나의 주변 정류장 구독 상태
+
+    client가 보낸 위치로 반경 안의 정류장을 다시 계산하고, 이전 결과와 비교하여 변경된 정류장만 반환한다
+    """
+
+    __slots__ = ("ars_ids", "latitude", "longitude", "radius")
+
+    def __init__(self) -> None:
+        # 현재 반경 안에 있는 정류장의 ARS ID(정렬된 배열)
+        self.ars_ids = np.empty(0, dtype=np.int64)
+        self.latitude: float | None = None
+        self.longitude: float | None = None
+        self.radius: float | None = None
+
+    def moved(
+        self, latitude: float, longitude: float, radius: float, min_move: float
+    ) -> bool:
+        """
+        마지막으로 계산한 위치에서 min_move(M) 이상 이동했거나 반경이 변경되었는지 확인한다
+
+        :return:
+        """
+
+        if self.latitude is None or radius != self.radius:
+            return True
+
+        distance = haversine(self.latitude, self.longitude, latitude, longitude)
+        return float(distance) >= min_move
+
+    def update(
+        self, index: NearbyIndex, latitude: float, longitude: float, radius: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        위치를 갱신하고 반경에 새로 들어온 정류장과 반경을 벗어난 정류장을 반환한다
+
+        :param index: 정류장 grid index
+        :param latitude: 위도
+        :param longitude: 경도
+        :param radius: 반경 거리(M)
+        :return: (새로 들어온 정류장의 index 배열, 벗어난 정류장의 ARS ID 배열)
+        """
+
+        found = index.within(latitude, longitude, radius)
+        ars_ids = index.ars_id[found]
+
+        entered = found[~np.isin(ars_ids, self.ars_ids, assume_unique=True)]
+        left = self.ars_ids[~np.isin(self.ars_ids, ars_ids, assume_unique=True)]
+
+        self.ars_ids = np.sort(ars_ids)
+        self.latitude, self.longitude, self.radius = latitude, longitude, radius
+
+        return entered, left
+
+
+class NearbyStationStore:
+    """
+    이동하는 client에게 주변 정류장의 변경 사항을 보내기 위한 in-memory index
+
+    snapshot이 (다시) load 될 때마다 index를 새로 만들어 교체한다
+    """
+
+    def __init__(self) -> None:
+        self.version: str | None = None
+        self.index: NearbyIndex | None = None
+        # 현재 연결된 구독(WebSocket) 수
+        self.subscribers = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    def build(self, snapshot: Snapshot) -> None:
+        """
+        snapshot으로 index를 생성한다. SnapshotStore의 listener로 등록한다
+
+        :param snapshot: 정류장/노선 snapshot
+        :return:
+        """
+
+        self.index = build_nearby_index(snapshot)
+        self.version = snapshot.version
+
+        logger.info(
+            f"nearby station index built. version: {self.version}, "
+            f"stations: {len(self.index)}"
+        )
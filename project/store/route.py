@@ -0,0 +1,195 @@
+import json
+
+import numpy as np
+from loguru import logger
+
+from store.district import DistrictStore
+from store.snapshot import Snapshot
+
+
+def _dumps(value) -> bytes:
+    # starlette JSONResponse와 같은 형식으로 encode 한다
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class RouteRecord:
+    """
+    노선 하나의 정보
+
+    정류장 좌표, ARS ID는 snapshot 배열의 stops 구간이며, 노선 정보 API 응답의 정류장 목록은 JSON으로 미리 encode 해 둔다
+    """
+
+    __slots__ = ("route_id", "route_name", "stops", "sig_codes", "fragment")
+
+    def __init__(
+        self,
+        route_id: int,
+        route_name: str,
+        stops: slice,
+        sig_codes: frozenset[int],
+        fragment: bytes,
+    ) -> None:
+        self.route_id = route_id
+        self.route_name = route_name
+        # snapshot의 정류장 배열(stop_*)에서 노선의 정류장 구간
+        self.stops = stops
+        # 노선의 정류장이 포함되는 시/구 코드
+        self.sig_codes = sig_codes
+        # 정류장 목록(schemas.Route)을 JSON 배열의 대괄호 없이 encode 한 값
+        self.fragment = fragment
+
+
+class RouteIndex:
+    """
+    노선명으로 노선의 정류장 목록을 찾는 in-memory index
+
+    - 정류장 좌표, ARS ID, 노선 순번은 snapshot의 배열(mmap)을 그대로 사용하고, 노선별 구간은 route_offsets로 찾는다
+    - 노선 정보 API 응답은 미리 encode 한 노선별 JSON 조각을 이어 붙여서 만들므로, Database와 schema 변환 없이 정류장 수에 비례하는 시간에 만든다
+    """
+
+    def __init__(self, snapshot: Snapshot, district: DistrictStore) -> None:
+        self.latitude = snapshot.stop_latitude
+        self.longitude = snapshot.stop_longitude
+        self.ars_id = snapshot.stop_ars_id
+        self.order = snapshot.stop_order
+        self.districts = district.districts
+
+        # 모든 정류장의 시/구를 한 번에 찾는다
+        stop_district = district.locate(self.latitude, self.longitude)
+        sig_codes = np.array([d.sig_code for d in self.districts] + [-1], np.int64)
+        stop_sig_code = sig_codes[stop_district]
+
+        self.routes: list[RouteRecord] = []
+        self.by_name: dict[str, list[RouteRecord]] = {}
+        for i in range(snapshot.route_count):
+            stops = snapshot.route_stops(i)
+            record = RouteRecord(
+                route_id=int(snapshot.route_id[i]),
+                route_name=snapshot.route_name[i],
+                stops=stops,
+                sig_codes=frozenset(
+                    int(c) for c in np.unique(stop_sig_code[stops]) if c >= 0
+                ),
+                fragment=self._encode(snapshot, stops),
+            )
+            self.routes.append(record)
+            self.by_name.setdefault(record.route_name, []).append(record)
+
+    @staticmethod
+    def _encode(snapshot: Snapshot, stops: slice) -> bytes:
+        route = [
+            {
+                "order": order,
+                "ars_id": ars_id,
+                "station_name": snapshot.stop_station_name[i],
+                "location": {"latitude": latitude, "longitude": longitude},
+            }
+            for i, order, ars_id, latitude, longitude in zip(
+                range(stops.start, stops.stop),
+                snapshot.stop_order[stops].tolist(),
+                snapshot.stop_ars_id[stops].tolist(),
+                snapshot.stop_latitude[stops].tolist(),
+                snapshot.stop_longitude[stops].tolist(),
+            )
+        ]
+        return _dumps(route)[1:-1]
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def sig_codes_of(self, hang_jeong_gu: str, sido: str | None) -> set[int]:
+        """
+        시/구 이름(과 시/도)의 시/구 코드
+
+        :param hang_jeong_gu: 지역 '구'의 이름
+        :param sido: 시/도 이름
+        :return:
+        """
+
+        return {
+            d.sig_code
+            for d in self.districts
+            if d.sig_kor_name == hang_jeong_gu and (not sido or d.sido == sido)
+        }
+
+    def find(
+        self, route_name: str, hang_jeong_gu: str, sido: str | None = None
+    ) -> list[RouteRecord]:
+        """
+        특정 시/구를 지나가는 버스 노선명의 노선 목록
+
+        BusDAL.get_bus_route_by_route_name_filter_hang_jeong_gu()와 같이
+        노선명이 같은 노선 중 하나라도 시/구를 지나가면 노선명이 같은 모든 노선을 반환한다
+
+        :param route_name: 버스 노선명
+        :param hang_jeong_gu: 지역 '구'의 이름
+        :param sido: 시/도 이름
+        :return:
+        """
+
+        records = self.by_name.get(route_name, [])
+        sig_codes = self.sig_codes_of(hang_jeong_gu, sido)
+        if any(r.sig_codes & sig_codes for r in records):
+            return records
+
+        return []
+
+    @staticmethod
+    def render(route_name: str, records: list[RouteRecord]) -> bytes:
+        """
+        노선 정보 API(schemas.BusRouteNodeResponse) 응답 body
+
+        :param route_name: 요청한 버스 노선명
+        :param records: 노선 목록
+        :return:
+        """
+
+        route = b",".join(r.fragment for r in records if r.fragment)
+        return b"".join(
+            (
+                b'{"message":"ok","data":{"route_name":',
+                _dumps(route_name),
+                b',"route":[',
+                route,
+                b"]}}",
+            )
+        )
+
+
+class RouteStore:
+    """
+    노선 정보 API에서 사용하는 in-memory 노선 저장소
+
+    snapshot이 (다시) load 될 때마다 index를 새로 만들어 교체한다
+    노선의 시/구를 계산하기 위해 시/구 저장소(DistrictStore)가 먼저 load 되어 있어야 한다
+    """
+
+    def __init__(self, district: DistrictStore) -> None:
+        self.district = district
+        self.version: str | None = None
+        self.index: RouteIndex | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    def build(self, snapshot: Snapshot) -> None:
+        """
+        snapshot으로 index를 생성한다. SnapshotStore의 listener로 등록한다
+
+        :param snapshot: 정류장/노선 snapshot
+        :return:
+        """
+
+        if not self.district.ready:
+            logger.warning("district store is not loaded. skip building route index")
+            return
+
+        self.index = RouteIndex(snapshot, self.district)
+        self.version = snapshot.version
+
+        logger.info(
+            f"route index built. version: {self.version}, routes: {len(self.index)}"
+        )
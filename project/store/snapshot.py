@@ -0,0 +1,362 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from core.config import settings
+from store.abstract import PreloadStoreABC
+
+# snapshot 파일 형식이 변경되면 버전을 올린다. 버전이 다른 snapshot은 읽지 않는다
+SNAPSHOT_FORMAT_VERSION = 1
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+# 가장 최근 snapshot을 포함하여 보관할 snapshot 개수
+KEEP_SNAPSHOTS = 2
+
+# 숫자형 column (이름, dtype)
+ARRAY_COLUMNS = {
+    # bus_station
+    "station_latitude": np.float64,
+    "station_longitude": np.float64,
+    "station_ars_id": np.int64,
+    # bus_route: 노선 단위
+    "route_id": np.int64,
+    "route_offsets": np.int64,
+    # bus_route: 노선의 정류장 단위(노선명, 노선 ID, 노선 순번으로 정렬)
+    "stop_order": np.int32,
+    "stop_node_id": np.int64,
+    "stop_ars_id": np.int64,
+    "stop_latitude": np.float64,
+    "stop_longitude": np.float64,
+}
+# 문자열 column
+STRING_COLUMNS = ("station_node_id", "station_name", "route_name", "stop_station_name")
+
+
+class StringTable:
+    """
+    offsets로 index 된 UTF-8 문자열 테이블
+
+    i번째 문자열은 data[offsets[i]:offsets[i + 1]] 이다
+    문자열을 Python 객체로 가지고 있지 않으므로 mmap 된 페이지를 그대로 공유할 수 있다
+    """
+
+    __slots__ = ("offsets", "data")
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray) -> None:
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return (
+            self.data[self.offsets[i] : self.offsets[i + 1]].tobytes().decode("utf-8")
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @staticmethod
+    def build(values: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        문자열 목록을 (offsets, data) 배열로 변환한다
+
+        :param values: 문자열 목록
+        :return:
+        """
+
+        encoded = [str(v).encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        return offsets, data
+
+
+class Snapshot:
+    """
+    loader가 생성한 정류장/노선 데이터의 columnar snapshot
+
+    모든 배열은 np.load(mmap_mode="r")로 열리므로 읽기 전용이며, 같은 파일을 여는 process들은 페이지를 공유한다
+    """
+
+    def __init__(self, path: pathlib.Path, manifest: dict) -> None:
+        self.path = path
+        self.manifest = manifest
+
+        for name in ARRAY_COLUMNS:
+            setattr(self, name, self._load(name))
+        for name in STRING_COLUMNS:
+            table = StringTable(
+                self._load(f"{name}.offsets"), self._load(f"{name}.data")
+            )
+            setattr(self, name, table)
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(self.path / f"{name}.npy", mmap_mode="r")
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def created_at(self) -> str:
+        return self.manifest["created_at"]
+
+    @property
+    def station_count(self) -> int:
+        return len(self.station_ars_id)
+
+    @property
+    def route_count(self) -> int:
+        return len(self.route_id)
+
+    def route_stops(self, i: int) -> slice:
+        """
+        i번째 노선의 정류장 범위를 반환한다
+
+        :param i: 노선 index
+        :return:
+        """
+
+        return slice(int(self.route_offsets[i]), int(self.route_offsets[i + 1]))
+
+    @classmethod
+    def open(cls, path: pathlib.Path) -> "Snapshot":
+        """
+        snapshot 디렉터리를 연다
+
+        :param path: snapshot 디렉터리
+        :return:
+        """
+
+        manifest = json.loads((path / MANIFEST_FILE).read_text())
+        if manifest.get("format") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format: {manifest.get('format')}")
+
+        return cls(path, manifest)
+
+
+def _int_column(s: pd.Series, dtype) -> np.ndarray:
+    # 값이 없는 ID는 -1로 저장한다
+    return pd.to_numeric(s, errors="coerce").fillna(-1).to_numpy(dtype=dtype)
+
+
+def build_snapshot_arrays(
+    station_df: pd.DataFrame, route_df: pd.DataFrame
+) -> dict[str, np.ndarray]:
+    """
+    bus_station, bus_route DataFrame을 snapshot 배열로 변환한다
+
+    :param station_df: bus station 정보를 가지고 있는 DataFrame
+    :param route_df: bus route 정보를 가지고 있는 DataFrame
+    :return:
+    """
+
+    arrays = {
+        "station_latitude": station_df["latitude"].to_numpy(dtype=np.float64),
+        "station_longitude": station_df["longitude"].to_numpy(dtype=np.float64),
+        "station_ars_id": _int_column(station_df["mobile_id"], np.int64),
+    }
+
+    # 노선의 정류장은 (노선명, 노선 ID, 노선 순번)으로 정렬하여 노선별로 연속된 구간에 저장한다
+    stops = route_df.sort_values(
+        ["route_name", "route_id", "route_order"], kind="stable"
+    ).reset_index(drop=True)
+    route_id = stops["route_id"].to_numpy(dtype=np.int64)
+    # 노선 ID가 바뀌는 위치가 노선의 시작 위치이다
+    starts = np.flatnonzero(np.r_[True, route_id[1:] != route_id[:-1]])
+
+    arrays.update(
+        {
+            "route_id": route_id[starts],
+            "route_offsets": np.r_[starts, len(stops)].astype(np.int64),
+            "stop_order": stops["route_order"].to_numpy(dtype=np.int32),
+            "stop_node_id": _int_column(stops["node_id"], np.int64),
+            "stop_ars_id": _int_column(stops["ars_id"], np.int64),
+            "stop_latitude": stops["latitude"].to_numpy(dtype=np.float64),
+            "stop_longitude": stops["longitude"].to_numpy(dtype=np.float64),
+        }
+    )
+
+    strings = {
+        "station_node_id": station_df["node_id"],
+        "station_name": station_df["node_name"],
+        "route_name": stops["route_name"].iloc[starts],
+        "stop_station_name": stops["station_name"],
+    }
+    for name, values in strings.items():
+        offsets, data = StringTable.build(values)
+        arrays[f"{name}.offsets"] = offsets
+        arrays[f"{name}.data"] = data
+
+    return arrays
+
+
+def read_current_version(base_dir: pathlib.Path) -> str | None:
+    """
+    현재 snapshot 버전을 반환한다
+
+    :param base_dir: snapshot 저장 디렉터리
+    :return:
+    """
+
+    try:
+        return (base_dir / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshot(
+    station_df: pd.DataFrame,
+    route_df: pd.DataFrame,
+    base_dir: pathlib.Path = pathlib.Path(settings.snapshot_dir),
+) -> str:
+    """
+    snapshot을 생성하고 현재 snapshot으로 설정한다
+
+    - 버전은 snapshot 배열 내용의 hash 값이므로 같은 데이터는 같은 버전을 가진다
+    - 배열을 모두 저장한 뒤에 CURRENT 파일을 교체(rename)하므로, 읽는 쪽에서 쓰는 중인 snapshot을 보지 않는다
+
+    :param station_df: bus station 정보를 가지고 있는 DataFrame
+    :param route_df: bus route 정보를 가지고 있는 DataFrame
+    :param base_dir: snapshot 저장 디렉터리
+    :return: snapshot 버전
+    """
+
+    arrays = build_snapshot_arrays(station_df, route_df)
+
+    digest = hashlib.sha256(str(SNAPSHOT_FORMAT_VERSION).encode())
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    version = digest.hexdigest()[:16]
+
+    path = base_dir / version
+    if not (path / MANIFEST_FILE).exists():
+        tmp_path = base_dir / f".{version}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        for name, array in arrays.items():
+            np.save(tmp_path / f"{name}.npy", array, allow_pickle=False)
+
+        manifest = {
+            "format": SNAPSHOT_FORMAT_VERSION,
+            "version": version,
+            "created_at": datetime.datetime.now().isoformat(),
+            "station_count": len(arrays["station_ars_id"]),
+            "route_count": len(arrays["route_id"]),
+            "stop_count": len(arrays["stop_ars_id"]),
+        }
+        (tmp_path / MANIFEST_FILE).write_text(json.dumps(manifest))
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(tmp_path, path)
+
+    current_tmp = base_dir / f".{CURRENT_FILE}.tmp"
+    current_tmp.write_text(version)
+    os.replace(current_tmp, base_dir / CURRENT_FILE)
+
+    _remove_old_snapshots(base_dir, version)
+
+    return version
+
+
+def _remove_old_snapshots(base_dir: pathlib.Path, current: str) -> None:
+    # 이미 snapshot을 mmap 하고 있는 process는 파일이 삭제되어도 계속 읽을 수 있다
+    snapshots = sorted(
+        (
+            p
+            for p in base_dir.iterdir()
+            if p.is_dir() and not p.name.startswith(".") and p.name != current
+        ),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for path in snapshots[KEEP_SNAPSHOTS - 1 :]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class SnapshotStore(PreloadStoreABC):
+    """
+    현재 snapshot을 가지고 있는 저장소
+
+    CURRENT 파일의 버전이 바뀌면 새로운 snapshot을 다시 열고(hot reload), 등록된 listener에게 알린다
+    """
+
+    name = "snapshot"
+
+    def __init__(self, base_dir: str = settings.snapshot_dir) -> None:
+        super().__init__()
+        self.base_dir = pathlib.Path(base_dir)
+        self.snapshot: Snapshot | None = None
+        self._listeners: list[Callable[[Snapshot], None]] = []
+
+    @property
+    def version(self) -> str | None:
+        return self.snapshot.version if self.snapshot else None
+
+    def subscribe(self, listener: Callable[[Snapshot], None]) -> None:
+        """
+        snapshot이 (다시) load 될 때마다 호출될 listener를 등록한다
+
+        :param listener: 새로운 snapshot을 인자로 받는 함수
+        :return:
+        """
+
+        self._listeners.append(listener)
+        if self.snapshot:
+            listener(self.snapshot)
+
+    def load(self) -> None:
+        if not self.reload():
+            logger.warning(f"snapshot not found: {self.base_dir}")
+
+    def reload(self) -> bool:
+        """
+        snapshot 버전이 바뀌었다면 새로운 snapshot을 연다
+
+        :return: snapshot을 새로 열었는지 여부
+        """
+
+        version = read_current_version(self.base_dir)
+        if not version or version == self.version:
+            return False
+
+        snapshot = Snapshot.open(self.base_dir / version)
+        for listener in self._listeners:
+            listener(snapshot)
+        self.snapshot = snapshot
+
+        logger.info(
+            f"snapshot loaded. version: {snapshot.version}, "
+            f"stations: {snapshot.station_count}, routes: {snapshot.route_count}"
+        )
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """
+        주기적으로 snapshot 버전을 확인하여 hot reload 한다
+
+        :param interval: 확인 주기(초)
+        :return:
+        """
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reload()
+            except Exception as e:
+                logger.exception(e)
@@ -0,0 +1,103 @@
+"""
+API에서 사용하는 조회 query(BusDAL)의 실행 계획(EXPLAIN) 확인
+
+script/explain_check.py와 같은 query와 기준(helpers/explain.py)으로 확인하며, 데이터가 load 된 Database가 필요하다
+Database 설정이 없거나 Database에 연결할 수 없으면 test_query_plans만 건너뛴다
+
+$ ENV=local pytest project/tests/test_explain.py
+"""
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
+
+from helpers.explain import check_plan, format_plan
+
+
+async def _explain_queries(engine) -> list[tuple[str, str, list[dict]]]:
+    import store
+    from script.explain_check import capture_queries, explain
+
+    # sample_parameters()는 snapshot, 시/구 데이터에서 parameter를 고른다
+    store.preload()
+    queries = await capture_queries()
+
+    plans = []
+    try:
+        async with engine.connect() as connection:
+            for name, statements in queries.items():
+                for sql in statements:
+                    plans.append((name, sql, await explain(connection, sql)))
+    finally:
+        await engine.dispose()
+
+    return plans
+
+
+@pytest.fixture(scope="module")
+def plans() -> list[tuple[str, str, list[dict]]]:
+    # Database 설정(settings)을 읽는 module은 Database가 필요한 test에서만 import 한다
+    try:
+        from connection.database import engine
+    except ValidationError as e:
+        pytest.skip(f"database is not configured: {e}")
+
+    try:
+        return asyncio.run(_explain_queries(engine))
+    except (OSError, DBAPIError) as e:
+        pytest.skip(f"database is not available: {e}")
+
+
+def test_full_table_scan_is_rejected():
+    plan = [
+        {
+            "select_type": "SIMPLE",
+            "table": "bus_station",
+            "type": "ALL",
+            "Extra": "Using where",
+        }
+    ]
+
+    assert check_plan("get_bus_stations_by_location", plan) == [
+        "full table scan: bus_station"
+    ]
+
+
+def test_full_index_scan_is_allowed():
+    # 정류장명/노선명 검색(LIKE '%...%')은 index 전체를 읽을 수밖에 없으므로(type=index) full scan으로 판단하지 않는다
+    plan = [
+        {
+            "select_type": "DERIVED",
+            "table": "bus_station",
+            "type": "index",
+            "Extra": "Using where; Using index",
+        }
+    ]
+
+    assert check_plan("get_bus_stations_by_node_name", plan) == []
+
+
+def test_filesort_in_page_query_is_rejected():
+    plan = [
+        {
+            "select_type": "DERIVED",
+            "table": "bus_route",
+            "type": "index",
+            "Extra": "Using where; Using index; Using filesort",
+        }
+    ]
+
+    assert check_plan("get_bus_routes_by_route_name", plan) == [
+        "filesort in page query: bus_route"
+    ]
+
+
+def test_query_plans(plans):
+    failures = []
+    for name, sql, plan in plans:
+        problems = check_plan(name, plan)
+        if problems:
+            failures.append(f"{name}: {', '.join(problems)}\n{format_plan(plan)}")
+
+    assert not failures, "\n".join(failures)
@@ -1,63 +1,168 @@
-CREATE TABLE IF NOT EXISTS bus_route
-(
-    id           bigint primary key auto_increment,
-    route_id     bigint       not null comment '노선 ID',
-    route_name   varchar(32)  not null comment '노선명',
-    route_order  int          not null comment '노선 순번',
-    node_id      bigint       not null comment 'Node Id',
-    ars_id       bigint       not null comment 'ARS ID',
-    station_name varchar(255) not null comment '정류소 이름',
-    location     point        not null SRID 4326 comment '정류소 위치',
-    created_at   datetime(6)  not null comment '생성일자',
-    updated_at   datetime(6)  not null comment '변경일자'
-);
-
-CREATE INDEX idx_route_name
-    ON bus_route (route_name);
-CREATE INDEX ars_id
-    ON bus_route (ars_id);
-CREATE INDEX idx_station_name
-    ON bus_route (station_name);
-CREATE SPATIAL INDEX spx_location
-    ON bus_route (location);
-
-CREATE TABLE IF NOT EXISTS bus_station
-(
-    id            bigint primary key auto_increment,
-    node_id       varchar(64)  not null comment '정류장 ID',
-    node_name     varchar(128) not null comment '정류장 이름',
-    location      point        not null SRID 4326 not null comment '정류장 위치',
-    collectd_time date         not null comment '정보 수집일',
-    mobile_id     bigint       not null comment '모바일 단축번호',
-    city_code     bigint       not null comment '도시 코드',
-    city_name     varchar(16)  not null comment '도시명',
-    admin_name    varchar(16)  not null comment '관리 도시명',
-    created_at    datetime(6)  not null comment '생성일자',
-    updated_at    datetime(6)  not null comment '변경일자'
-);
-
-CREATE INDEX idx_node_name
-    ON bus_station (node_name);
-CREATE INDEX idx_mobile_id
-    ON bus_station (mobile_id);
-CREATE SPATIAL INDEX spx_location
-    ON bus_station (location);
-
-
-CREATE TABLE IF NOT EXISTS hang_jeong_gu
-(
-    id           bigint primary key auto_increment,
-    sig_code     int         not null comment '시구 코드',
-    sido         varchar(32) not null comment '시도 이름',
-    sig_eng_name varchar(64) not null comment '시구 영어 이름',
-    sig_kor_name varchar(64) not null comment '시구 한글 이름',
-    geometry     POLYGON     SRID 4326 not null comment '위치(Polygon)',
-    created_at   datetime(6) not null comment '생성일자',
-    updated_at   datetime(6) not null comment '변경일자'
-);
-
-CREATE INDEX idx_sig_kor_name
-    ON hang_jeong_gu (sig_kor_name);
-
-CREATE SPATIAL INDEX spx_geometry
-    ON hang_jeong_gu (geometry);
+CREATE TABLE alembic_version (
+    version_num VARCHAR(32) NOT NULL, 
+    CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num)
+);
+
+-- Running upgrade  -> 5b1e0c3a9d42
+
+CREATE TABLE bus_route (
+    id BIGINT NOT NULL AUTO_INCREMENT, 
+    route_id BIGINT NOT NULL COMMENT '노선 ID', 
+    route_name VARCHAR(32) NOT NULL COMMENT '노선명', 
+    route_order INTEGER NOT NULL COMMENT '노선 순번', 
+    node_id BIGINT NOT NULL COMMENT 'Node Id', 
+    ars_id BIGINT NOT NULL COMMENT 'ARS ID', 
+    station_name VARCHAR(255) NOT NULL COMMENT '정류소 이름', 
+    location POINT NOT NULL SRID 4326 NOT NULL COMMENT '정류소 위치', 
+    geohash CHAR(7) NOT NULL COMMENT '정류소 위치 geohash', 
+    sig_code INTEGER COMMENT '정류소가 포함되는 시/구 코드', 
+    created_at DATETIME(6) NOT NULL COMMENT '생성일자', 
+    updated_at DATETIME(6) NOT NULL COMMENT '변경일자', 
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX idx_route_name ON bus_route (route_name);
+
+CREATE INDEX ars_id ON bus_route (ars_id);
+
+CREATE INDEX idx_station_name ON bus_route (station_name);
+
+CREATE SPATIAL INDEX spx_location ON bus_route (location);
+
+CREATE INDEX idx_geohash ON bus_route (geohash);
+
+CREATE INDEX idx_sig_code_station_name ON bus_route (sig_code, station_name);
+
+CREATE TABLE bus_route_district (
+    id BIGINT NOT NULL AUTO_INCREMENT, 
+    sig_code INTEGER NOT NULL COMMENT '시/구 코드', 
+    route_id BIGINT NOT NULL COMMENT '노선 ID', 
+    route_name VARCHAR(32) NOT NULL COMMENT '노선명', 
+    stop_count INTEGER NOT NULL COMMENT '시/구에 포함되는 노선의 정류소 수', 
+    created_at DATETIME(6) NOT NULL COMMENT '생성일자', 
+    updated_at DATETIME(6) NOT NULL COMMENT '변경일자', 
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX idx_sig_code_route_name ON bus_route_district (sig_code, route_name);
+
+CREATE TABLE bus_station (
+    id BIGINT NOT NULL AUTO_INCREMENT, 
+    node_id VARCHAR(64) NOT NULL COMMENT '정류장 ID', 
+    node_name VARCHAR(128) NOT NULL COMMENT '정류장 이름', 
+    location POINT NOT NULL SRID 4326 NOT NULL COMMENT '정류장 위치', 
+    geohash CHAR(7) NOT NULL COMMENT '정류장 위치 geohash', 
+    collectd_time DATE NOT NULL COMMENT '정보 수집일', 
+    mobile_id BIGINT NOT NULL COMMENT '모바일 단축번호', 
+    city_code BIGINT NOT NULL COMMENT '도시 코드', 
+    city_name VARCHAR(16) NOT NULL COMMENT '도시명', 
+    admin_name VARCHAR(16) NOT NULL COMMENT '관리 도시명', 
+    created_at DATETIME(6) NOT NULL COMMENT '생성일자', 
+    updated_at DATETIME(6) NOT NULL COMMENT '변경일자', 
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX idx_node_name ON bus_station (node_name);
+
+CREATE INDEX idx_mobile_id ON bus_station (mobile_id);
+
+CREATE SPATIAL INDEX spx_location ON bus_station (location);
+
+CREATE INDEX idx_geohash ON bus_station (geohash);
+
+CREATE TABLE bus_station_cluster (
+    id BIGINT NOT NULL AUTO_INCREMENT, 
+    zoom INTEGER NOT NULL COMMENT 'zoom level', 
+    cell_x INTEGER NOT NULL COMMENT 'cell x 좌표', 
+    cell_y INTEGER NOT NULL COMMENT 'cell y 좌표', 
+    count INTEGER NOT NULL COMMENT '정류장 수', 
+    latitude DOUBLE NOT NULL COMMENT 'cluster 위치(위도)', 
+    longitude DOUBLE NOT NULL COMMENT 'cluster 위치(경도)', 
+    ars_id BIGINT COMMENT 'ARS ID(정류장이 하나인 경우)', 
+    station_name VARCHAR(255) COMMENT '정류장 이름(정류장이 하나인 경우)', 
+    created_at DATETIME(6) NOT NULL COMMENT '생성일자', 
+    updated_at DATETIME(6) NOT NULL COMMENT '변경일자', 
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX idx_zoom_cell ON bus_station_cluster (zoom, cell_x, cell_y);
+
+CREATE TABLE hang_jeong_gu (
+    id BIGINT NOT NULL AUTO_INCREMENT, 
+    sig_code INTEGER NOT NULL COMMENT '시구 코드', 
+    sido VARCHAR(32) NOT NULL COMMENT '시도 이름', 
+    sig_eng_name VARCHAR(64) NOT NULL COMMENT '시구 영어 이름', 
+    sig_kor_name VARCHAR(64) NOT NULL COMMENT '시구 한글 이름', 
+    geometry POLYGON NOT NULL SRID 4326 NOT NULL COMMENT '위치(Polygon)', 
+    created_at DATETIME(6) NOT NULL COMMENT '생성일자', 
+    updated_at DATETIME(6) NOT NULL COMMENT '변경일자', 
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX idx_sig_kor_name ON hang_jeong_gu (sig_kor_name);
+
+CREATE SPATIAL INDEX spx_geometry ON hang_jeong_gu (geometry);
+
+CREATE TABLE dataset_version (
+    id BIGINT NOT NULL AUTO_INCREMENT, 
+    version VARCHAR(64) NOT NULL COMMENT '데이터 버전', 
+    content_hash VARCHAR(64) NOT NULL COMMENT '원본 데이터 파일 hash', 
+    loaded_at DATETIME(6) NOT NULL COMMENT 'load 일자', 
+    created_at DATETIME(6) NOT NULL COMMENT '생성일자', 
+    updated_at DATETIME(6) NOT NULL COMMENT '변경일자', 
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX idx_version ON dataset_version (version);
+
+INSERT INTO alembic_version (version_num) VALUES ('5b1e0c3a9d42');
+
+-- Running upgrade 5b1e0c3a9d42 -> 9c4d7e21f0b8
+
+DROP INDEX idx_route_name ON bus_route;
+
+DROP INDEX idx_station_name ON bus_route;
+
+DROP INDEX idx_sig_code_station_name ON bus_route;
+
+ALTER TABLE bus_route RENAME INDEX ars_id TO idx_ars_id;
+
+CREATE INDEX idx_route_name_order ON bus_route (route_name, route_order);
+
+CREATE INDEX idx_route_name_route_id ON bus_route (route_name, route_id);
+
+CREATE INDEX idx_station_name_ars_id ON bus_route (station_name, ars_id);
+
+CREATE INDEX idx_sig_code_station_name ON bus_route (sig_code, station_name, ars_id, route_name);
+
+DROP INDEX idx_sig_kor_name ON hang_jeong_gu;
+
+CREATE INDEX idx_sig_kor_name_sido ON hang_jeong_gu (sig_kor_name, sido, sig_code);
+
+UPDATE alembic_version SET version_num='9c4d7e21f0b8' WHERE alembic_version.version_num = '5b1e0c3a9d42';
+
+-- Running upgrade 9c4d7e21f0b8 -> e27a5c9b4d16
+
+CREATE TABLE bus_route_summary (
+    id BIGINT NOT NULL AUTO_INCREMENT, 
+    route_id BIGINT NOT NULL COMMENT '노선 ID', 
+    route_name VARCHAR(32) NOT NULL COMMENT '노선명', 
+    stop_count INTEGER NOT NULL COMMENT '노선의 정류소 수', 
+    first_ars_id BIGINT NOT NULL COMMENT '기점 정류소 ARS ID', 
+    first_station_name VARCHAR(255) NOT NULL COMMENT '기점 정류소 이름', 
+    last_ars_id BIGINT NOT NULL COMMENT '종점 정류소 ARS ID', 
+    last_station_name VARCHAR(255) NOT NULL COMMENT '종점 정류소 이름', 
+    length DOUBLE NOT NULL COMMENT '노선 길이(M)', 
+    min_latitude DOUBLE NOT NULL COMMENT '노선 영역 최소 위도', 
+    min_longitude DOUBLE NOT NULL COMMENT '노선 영역 최소 경도', 
+    max_latitude DOUBLE NOT NULL COMMENT '노선 영역 최대 위도', 
+    max_longitude DOUBLE NOT NULL COMMENT '노선 영역 최대 경도', 
+    created_at DATETIME(6) NOT NULL COMMENT '생성일자', 
+    updated_at DATETIME(6) NOT NULL COMMENT '변경일자', 
+    PRIMARY KEY (id)
+);
+
+CREATE UNIQUE INDEX idx_route_id ON bus_route_summary (route_id);
+
+UPDATE alembic_version SET version_num='e27a5c9b4d16' WHERE alembic_version.version_num = '9c4d7e21f0b8';
+